@@ -1,10 +1,32 @@
-from typing import Optional
-from passlib.context import CryptContext
+from asyncio import get_running_loop
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from hashlib import sha256
+from multiprocessing import get_context
+from threading import Lock
+import time
+from typing import Any, Callable, Optional, Tuple
 from datetime import datetime, timedelta
 from passlib.context import CryptContext
 from jose import jwt
 
-from core.model.token import Token, TokenData
+from core.model.token import PasswordPoolStats, Token, TokenCacheStats, TokenData
+
+# crypt context of a password worker process, created when the process starts
+_worker_pwd_context: Optional[CryptContext] = None
+
+
+def _start_password_worker(context_scheme: str, deprecated: str) -> None:
+    global _worker_pwd_context
+    _worker_pwd_context = CryptContext(schemes=[context_scheme], deprecated=deprecated)
+
+
+def _hash_password(plain_password: str) -> str:
+    return _worker_pwd_context.hash(plain_password)
+
+
+def _verify_password(plain_password: str, user_password: str) -> bool:
+    return _worker_pwd_context.verify(plain_password, user_password)
 
 
 class AuthenticationAdapter:
@@ -16,6 +38,10 @@ class AuthenticationAdapter:
         algorithm (str) : algorithm used to generate token
         context_scheme (str) : encryption context scheme
         deprecated (str) : encryption context parameter
+        token_cache_size (int) : maximum number of decoded tokens kept, 0 disables it
+        token_cache_ttl (float) : maximum time in seconds a decoded token is kept
+        password_workers (int) : number of processes hashing and verifying passwords,
+            0 runs them in the calling thread
 
     """
 
@@ -26,6 +52,9 @@ class AuthenticationAdapter:
         algorithm: str,
         context_scheme: str,
         deprecated: str,
+        token_cache_size: int = 1024,
+        token_cache_ttl: float = 300,
+        password_workers: int = 2,
     ):
         self._pwd_context = CryptContext(
             schemes=[context_scheme], deprecated=deprecated
@@ -33,9 +62,28 @@ class AuthenticationAdapter:
         self._expire_time = expire_time
         self._key = key
         self._algorithm = algorithm
+        self._token_cache_size = token_cache_size
+        self._token_cache_ttl = token_cache_ttl
+        # token hash -> (decoded token data, time in seconds it stops being valid)
+        self._token_cache: "OrderedDict[str, Tuple[TokenData, float]]" = OrderedDict()
+        self._token_cache_lock = Lock()
+        self._token_cache_hits = 0
+        self._token_cache_misses = 0
+        self._password_workers = password_workers
+        self._password_pool: Optional[ProcessPoolExecutor] = None
+        if password_workers > 0:
+            # spawned, so the workers do not inherit the threads of the application
+            self._password_pool = ProcessPoolExecutor(
+                max_workers=password_workers,
+                mp_context=get_context("spawn"),
+                initializer=_start_password_worker,
+                initargs=(context_scheme, deprecated),
+            )
+        # password jobs submitted and not finished yet, running or queued
+        self._pending_password_jobs = 0
 
-    def get_password_hash(self, plain_password: str) -> str:
-        """gets the plain password hash value
+    async def get_password_hash(self, plain_password: str) -> str:
+        """gets the plain password hash value in a password worker
 
         Args:
             plain_password (str) : plain password
@@ -44,10 +92,13 @@ class AuthenticationAdapter:
             hashed password
 
         """
-        return self._pwd_context.hash(plain_password)
+        return await self._run_password_job(
+            self._pwd_context.hash, _hash_password, plain_password
+        )
 
-    def verify_password(self, plain_password: str, user_password: str) -> bool:
-        """verifies if the plain password matches with the user hashed password
+    async def verify_password(self, plain_password: str, user_password: str) -> bool:
+        """verifies if the plain password matches with the user hashed password,
+        in a password worker
 
         Args:
             plain_password (str) : plain password
@@ -57,7 +108,53 @@ class AuthenticationAdapter:
             True if they match. False otherwise
 
         """
-        return self._pwd_context.verify(plain_password, user_password)
+        return await self._run_password_job(
+            self._pwd_context.verify, _verify_password, plain_password, user_password
+        )
+
+    def get_password_pool_stats(self) -> PasswordPoolStats:
+        """gets the number of password workers and of the jobs running and queued
+
+        Args:
+            None
+
+        Returns:
+            password pool stats
+
+        """
+        running = min(self._pending_password_jobs, self._password_workers)
+        return PasswordPoolStats(
+            workers=self._password_workers,
+            running=running,
+            queued=self._pending_password_jobs - running,
+        )
+
+    async def _run_password_job(
+        self,
+        inline_function: Callable[..., Any],
+        worker_function: Callable[..., Any],
+        *args: str,
+    ) -> Any:
+        """runs a password job in the password pool, or inline if there is no pool
+
+        Args:
+            inline_function (Callable[..., Any]) : function run without pool
+            worker_function (Callable[..., Any]) : function run by a password worker
+            args (str) : arguments of the job
+
+        Returns:
+            the result of the job
+
+        """
+        if self._password_pool is None:
+            return inline_function(*args)
+        self._pending_password_jobs += 1
+        try:
+            return await get_running_loop().run_in_executor(
+                self._password_pool, worker_function, *args
+            )
+        finally:
+            self._pending_password_jobs -= 1
 
     def generate_token(self, data: TokenData) -> Token:
         """generates the jwt token
@@ -90,11 +187,7 @@ class AuthenticationAdapter:
 
         """
         try:
-            jwt.decode(
-                token.content,
-                self._key,
-                algorithms=[self._algorithm],
-            )
+            self._decode(token)
         except:
             return False
         return True
@@ -112,13 +205,66 @@ class AuthenticationAdapter:
             invalid token exception, if it is not valid.
 
         """
-        try:
-            payload = jwt.decode(
-                token.content,
-                self._key,
-                algorithms=[self._algorithm],
+        return self._decode(token)
+
+    def get_token_cache_stats(self) -> TokenCacheStats:
+        """gets the hit and miss counts and the size of the decoded token cache
+
+        Args:
+            None
+
+        Returns:
+            token cache stats
+
+        """
+        with self._token_cache_lock:
+            return TokenCacheStats(
+                hits=self._token_cache_hits,
+                misses=self._token_cache_misses,
+                size=len(self._token_cache),
             )
-            username: str = payload.get("username")
-        except:
-            raise
-        return TokenData(username=username)
+
+    def _decode(self, token: Token) -> TokenData:
+        """decodes the token, reusing the last decodings of the same token.
+        a decoded token is kept for token_cache_ttl seconds at most,
+        and never after its exp claim
+
+        Args:
+            token (Token) : token object
+
+        Returns:
+            returns the decoded token data, if it is valid.
+
+        Raises:
+            invalid token exception, if it is not valid.
+
+        """
+        key = sha256(token.content.encode()).hexdigest()
+        now = time.time()
+        with self._token_cache_lock:
+            cached = self._token_cache.get(key)
+            if cached is not None and cached[1] > now:
+                self._token_cache.move_to_end(key)
+                self._token_cache_hits += 1
+                return cached[0]
+            self._token_cache_misses += 1
+
+        payload = jwt.decode(
+            token.content,
+            self._key,
+            algorithms=[self._algorithm],
+        )
+        token_data = TokenData(
+            username=payload.get("username"), user_id=payload.get("user_id")
+        )
+
+        if self._token_cache_size > 0:
+            valid_until = now + self._token_cache_ttl
+            if payload.get("exp") is not None:
+                valid_until = min(valid_until, float(payload["exp"]))
+            with self._token_cache_lock:
+                self._token_cache[key] = (token_data, valid_until)
+                self._token_cache.move_to_end(key)
+                while len(self._token_cache) > self._token_cache_size:
+                    self._token_cache.popitem(last=False)
+        return token_data
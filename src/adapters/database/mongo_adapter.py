@@ -1,4 +1,7 @@
-from pymongo import MongoClient
+from typing import Dict, List, Optional, Tuple
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, IndexModel, UpdateOne
+from pymongo.errors import OperationFailure
 from bson import ObjectId
 
 from core.model.inference import InferenceCreation
@@ -7,7 +10,9 @@ from core.model.user import UserCreation
 
 
 class MongoAdapter:
-    """Adapter for the mongoDB database
+    """Asynchronous adapter for the mongoDB database.
+    the motor client binds to the event loop of its first operation,
+    so an adapter instance must only be used from one event loop
 
     Args:
         mongo_conn_url (str) : connection url to mongoDB container
@@ -16,6 +21,8 @@ class MongoAdapter:
         inference_collection_name (str) : name of the collection referring to inferences
         model_collection_name (str) : name of the collection referring to models
         result_collection_name (str) : : name of the collection referring to results
+        outbox_collection_name (str) : name of the collection holding the messages
+            waiting to be sent to the message service
 
     """
 
@@ -27,17 +34,100 @@ class MongoAdapter:
         inference_collection_name: str,
         model_collection_name: str,
         result_collection_name: str,
+        outbox_collection_name: str = "outbox",
     ):
-        self._conn: MongoClient = MongoClient(conn_url)
+        self._conn: AsyncIOMotorClient = AsyncIOMotorClient(conn_url)
         self._db = getattr(self._conn, database_name)
         self._users = getattr(self._db, user_collection_name)
         self._inferences = getattr(self._db, inference_collection_name)
         self._models = getattr(self._db, model_collection_name)
         self._results = getattr(self._db, result_collection_name)
+        self._outbox = getattr(self._db, outbox_collection_name)
+
+    # index methods
+
+    def get_required_indexes(self) -> Dict[str, List[IndexModel]]:
+        """gets the indexes the adapter queries rely on
+
+        Args:
+            None
+
+        Returns:
+            the index models by collection name
+
+        """
+        return {
+            self._users.name: [
+                IndexModel([("username", ASCENDING)], unique=True),
+                IndexModel([("email", ASCENDING)], unique=True),
+            ],
+            self._inferences.name: [
+                IndexModel([("user_id", ASCENDING), ("created_in", ASCENDING)]),
+                IndexModel([("user_id", ASCENDING), ("_id", ASCENDING)]),
+            ],
+            self._results.name: [
+                IndexModel([("inference_id", ASCENDING)]),
+            ],
+            self._outbox.name: [
+                IndexModel([("available_at", ASCENDING)]),
+                IndexModel([("claim", ASCENDING)]),
+            ],
+        }
+
+    async def ensure_indexes(self):
+        """creates the required indexes that do not exist yet.
+        existing indexes are left untouched, so it is safe to call on every startup
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        """
+        for collection_name, index_models in self.get_required_indexes().items():
+            collection = getattr(self._db, collection_name)
+            for index_model in index_models:
+                try:
+                    await collection.create_indexes([index_model])
+                except OperationFailure as e:
+                    # e.g. duplicated values for a unique index, reported as missing
+                    print(
+                        "could not create index",
+                        collection_name,
+                        index_model.document["name"],
+                        e,
+                        flush=True,
+                    )
+
+    async def get_missing_indexes(self) -> Dict[str, List[str]]:
+        """gets the names of the required indexes that do not exist
+
+        Args:
+            None
+
+        Returns:
+            the missing index names by collection name.
+            collections without missing indexes are not included
+
+        """
+        missing_indexes = {}
+        for collection_name, index_models in self.get_required_indexes().items():
+            existing_names = await getattr(
+                self._db, collection_name
+            ).index_information()
+            missing_names = [
+                index_model.document["name"]
+                for index_model in index_models
+                if index_model.document["name"] not in existing_names
+            ]
+            if missing_names:
+                missing_indexes[collection_name] = missing_names
+        return missing_indexes
 
     # user methods
 
-    def get_user_by_id(self, user_id: str):
+    async def get_user_by_id(self, user_id: str):
         """gets the user document by the user id
 
         Args:
@@ -48,9 +138,9 @@ class MongoAdapter:
             if no user is found, None is returned.
 
         """
-        return self._users.find_one({"_id": ObjectId(user_id)})
+        return await self._users.find_one({"_id": ObjectId(user_id)})
 
-    def get_user_by_username(self, username: str):
+    async def get_user_by_username(self, username: str):
         """gets the user document by the username
 
         Args:
@@ -61,9 +151,9 @@ class MongoAdapter:
             if no user is found, None is returned.
 
         """
-        return self._users.find_one({"username": username})
+        return await self._users.find_one({"username": username})
 
-    def get_user_by_email(self, email: str):
+    async def get_user_by_email(self, email: str):
         """gets the user document by the email
 
         Args:
@@ -74,9 +164,24 @@ class MongoAdapter:
             if no user is found, None is returned.
 
         """
-        return self._users.find_one({"email": email})
+        return await self._users.find_one({"email": email})
 
-    def insert_user(self, new_user: UserCreation):
+    async def is_user_enabled(self, user_id: str) -> bool:
+        """checks whether the user exists and was not disabled
+
+        Args:
+            user_id (str) : user id
+
+        Returns:
+            True if the user exists and is not disabled. False otherwise
+
+        """
+        user = await self._users.find_one(
+            {"_id": ObjectId(user_id), "disabled": {"$ne": True}}, {"_id": 1}
+        )
+        return user is not None
+
+    async def insert_user(self, new_user: UserCreation):
         """inserts a new user document in the users collection
 
         Args:
@@ -86,11 +191,11 @@ class MongoAdapter:
             None
 
         """
-        self._users.insert_one(new_user.dict())
+        await self._users.insert_one(new_user.dict())
 
     # model methods
 
-    def get_model_by_id(self, model_id: str):
+    async def get_model_by_id(self, model_id: str):
         """gets the model document by the model id
 
         Args:
@@ -101,23 +206,38 @@ class MongoAdapter:
             if no model is found, None is returned.
 
         """
-        return self._models.find_one({"_id": ObjectId(model_id)})
+        return await self._models.find_one({"_id": ObjectId(model_id)})
 
-    def get_model_list(self):
+    async def get_model_list(self):
         """gets all model documents
 
         Args:
             None
 
         Returns:
-            an iterator in the model documents
+            the list of model documents
+
+        """
+        return await self._models.find().to_list(length=None)
+
+    async def watch_model_changes(self):
+        """yields the change events of the models collection as they happen.
+        change streams are only available when mongoDB runs as a replica set
+
+        Args:
+            None
+
+        Returns:
+            asynchronous iterator over the change events
 
         """
-        return self._models.find()
+        async with self._models.watch() as change_stream:
+            async for change in change_stream:
+                yield change
 
     # inference methods
 
-    def get_inference_by_id(self, inference_id: str, user_id: str):
+    async def get_inference_by_id(self, inference_id: str, user_id: str):
         """gets the inference document by the inference id and user id
 
         Args:
@@ -129,23 +249,33 @@ class MongoAdapter:
             if no inference is found, None is returned.
 
         """
-        return self._inferences.find_one(
+        return await self._inferences.find_one(
             {"_id": ObjectId(inference_id), "user_id": user_id}
         )
 
-    def get_inference_list(self, user_id: str):
-        """gets all inference documents of the user
+    async def get_inference_page(
+        self, user_id: str, limit: int, after: Optional[str] = None
+    ):
+        """gets inference documents of the user in ascending id order,
+        starting right after the given inference id
 
         Args:
             user_id (str) : user id
+            limit (int) : maximum number of documents returned
+            after (Optional[str]) : id of the last inference of the previous page,
+                if None the first page is returned
 
         Returns:
-            an iterator in the inference documents
+            the list of inference documents
 
         """
-        return self._inferences.find({"user_id": user_id})
+        query = {"user_id": user_id}
+        if after is not None:
+            query["_id"] = {"$gt": ObjectId(after)}
+        cursor = self._inferences.find(query).sort("_id", ASCENDING).limit(limit)
+        return await cursor.to_list(length=limit)
 
-    def insert_inference(self, new_inference: InferenceCreation):
+    async def insert_inference(self, new_inference: InferenceCreation):
         """inserts a new inference document in the inferences collection
 
         Args:
@@ -155,11 +285,74 @@ class MongoAdapter:
             The ObjectId of the new document
 
         """
-        _id = self._inferences.insert_one(new_inference.dict())
+        _id = await self._inferences.insert_one(new_inference.dict())
         return _id.inserted_id
 
-    def update_inference_status(self, inference_id: str, new_status: str):
-        """updates the status of an inference document
+    def create_id(self) -> str:
+        """creates a new document id, unique without reading the database
+
+        Args:
+            None
+
+        Returns:
+            the new id
+
+        """
+        return str(ObjectId())
+
+    async def insert_inference_with_outbox(
+        self,
+        inference_id: str,
+        new_inference: InferenceCreation,
+        new_result: ResultCreation,
+        publishing_channel: str,
+        available_at: float,
+    ):
+        """inserts a new inference document, with the given id, together with
+        its result document and the outbox document of its message, which has
+        the same id. the result document is written first, so it exists before
+        the message can be claimed and its update always finds it. the outbox
+        document is written before the inference, so if the inference insertion
+        fails no inference is left without its message; a message left without
+        its inference is removed here or, if the process stops, sent to no effect
+
+        Args:
+            inference_id (str) : id of the new inference
+            new_inference (InferenceCreation) : new inference form
+            new_result (ResultCreation) : result form the model output is written to
+            publishing_channel (str) : channel the message is sent to
+            available_at (float) : time in seconds since the epoch from which
+                the message can be sent
+
+        Returns:
+            None
+
+        """
+        _id = ObjectId(inference_id)
+        result = await self._results.insert_one(new_result.dict())
+        try:
+            await self._outbox.insert_one(
+                {
+                    "_id": _id,
+                    "publishing_channel": publishing_channel,
+                    "content": new_inference.dict(),
+                    "attempts": 0,
+                    "available_at": available_at,
+                }
+            )
+        except:
+            await self._results.delete_one({"_id": result.inserted_id})
+            raise
+        try:
+            await self._inferences.insert_one({"_id": _id, **new_inference.dict()})
+        except:
+            await self._outbox.delete_one({"_id": _id})
+            await self._results.delete_one({"_id": result.inserted_id})
+            raise
+
+    async def update_inference_status(self, inference_id: str, new_status: str):
+        """updates the status of an inference document,
+        if it does not have the new status already
 
         Args:
             inference_id (str) : inference id
@@ -169,13 +362,117 @@ class MongoAdapter:
             None
 
         """
-        self._inferences.update_one(
-            {"_id": ObjectId(inference_id)}, {"$set": {"status": new_status}}
+        await self._inferences.update_one(
+            {"_id": ObjectId(inference_id), "status": {"$ne": new_status}},
+            {"$set": {"status": new_status}},
+        )
+
+    async def update_inference_statuses(
+        self, inference_ids: List[str], new_status: str
+    ):
+        """updates the status of several inference documents in one write,
+        skipping the ones that have the new status already
+
+        Args:
+            inference_ids (List[str]) : inference ids
+            new_status (str) : new inference status
+
+        Returns:
+            None
+
+        """
+        await self._inferences.update_many(
+            {
+                "_id": {
+                    "$in": [ObjectId(inference_id) for inference_id in inference_ids]
+                },
+                "status": {"$ne": new_status},
+            },
+            {"$set": {"status": new_status}},
+        )
+
+    # outbox methods
+
+    async def claim_outbox_messages(self, limit: int, now: float, lease_until: float):
+        """claims the outbox documents available at the given time, oldest first,
+        making them unavailable to the other dispatchers until lease_until
+
+        Args:
+            limit (int) : maximum number of documents claimed
+            now (float) : current time in seconds since the epoch
+            lease_until (float) : time in seconds since the epoch when the claimed
+                documents are available again, if they are still in the outbox
+
+        Returns:
+            the list of claimed outbox documents
+
+        """
+        available = await (
+            self._outbox.find({"available_at": {"$lte": now}}, {"_id": 1})
+            .sort("available_at", ASCENDING)
+            .limit(limit)
+            .to_list(length=limit)
+        )
+        if not available:
+            return []
+        claim = ObjectId()
+        # documents claimed by another dispatcher meanwhile are not available anymore
+        await self._outbox.update_many(
+            {
+                "_id": {"$in": [document["_id"] for document in available]},
+                "available_at": {"$lte": now},
+            },
+            {"$set": {"available_at": lease_until, "claim": claim}},
+        )
+        return await self._outbox.find({"claim": claim}).to_list(length=limit)
+
+    async def delete_outbox_messages(self, message_ids: List[str]):
+        """deletes outbox documents by their ids
+
+        Args:
+            message_ids (List[str]) : outbox document ids
+
+        Returns:
+            None
+
+        """
+        if not message_ids:
+            return
+        await self._outbox.delete_many(
+            {"_id": {"$in": [ObjectId(message_id) for message_id in message_ids]}}
+        )
+
+    async def reschedule_outbox_messages(
+        self, reschedules: List[Tuple[str, int, float]]
+    ):
+        """sets the attempt count and the time the outbox documents are
+        available again, in one bulk write
+
+        Args:
+            reschedules (List[Tuple[str, int, float]]) : outbox document id,
+                number of attempts and time in seconds since the epoch
+                it is available again, for every document
+
+        Returns:
+            None
+
+        """
+        if not reschedules:
+            return
+        await self._outbox.bulk_write(
+            [
+                UpdateOne(
+                    {"_id": ObjectId(message_id)},
+                    {"$set": {"attempts": attempts, "available_at": available_at}},
+                )
+                for message_id, attempts, available_at in reschedules
+            ],
+            ordered=False,
         )
 
     # result methods
 
-    def get_result_by_inference_id(self, inference_id: str):
+    async def get_result_by_inference_id(self, inference_id: str):
         """gets the result document of an inference by the inference id
 
         Args:
@@ -186,9 +483,98 @@ class MongoAdapter:
             if no result is found, None is returned.
 
         """
-        return self._results.find_one({"inference_id": inference_id})
+        return await self._results.find_one({"inference_id": inference_id})
+
+    async def get_inference_with_result(self, inference_id: str, user_id: str):
+        """gets the inference document by the inference id and user id
+        together with its result, in a single aggregation
 
-    def insert_result(self, new_result: ResultCreation):
+        Args:
+            inference_id (str) : inference id
+            user_id (str) : user id
+
+        Returns:
+            inference document with the fields of an inference and a result
+            list holding its result document, empty if there is no result.
+            if no inference is found, None is returned.
+
+        """
+        pipeline = [
+            {"$match": {"_id": ObjectId(inference_id), "user_id": user_id}},
+            {"$limit": 1},
+            # results reference the inference by the string form of its id
+            {"$addFields": {"_inference_id": {"$toString": "$_id"}}},
+            {
+                "$lookup": {
+                    "from": self._results.name,
+                    "localField": "_inference_id",
+                    "foreignField": "inference_id",
+                    "as": "result",
+                }
+            },
+            {
+                "$project": {
+                    "age": 1,
+                    "sex": 1,
+                    "rgh": 1,
+                    "covid_status": 1,
+                    "mask_type": 1,
+                    "user_id": 1,
+                    "model_id": 1,
+                    "status": 1,
+                    "created_in": 1,
+                    "result._id": 1,
+                    "result.inference_id": 1,
+                    "result.output": 1,
+                    "result.diagnosis": 1,
+                }
+            },
+        ]
+        inferences = await self._inferences.aggregate(pipeline).to_list(length=1)
+        return inferences[0] if inferences else None
+
+    async def get_results_by_inference_ids(
+        self, inference_ids: List[str], user_id: str
+    ):
+        """gets the inference documents of the user by their ids together
+        with their results, in one query per collection
+
+        Args:
+            inference_ids (List[str]) : inference ids
+            user_id (str) : user id
+
+        Returns:
+            the list of inference documents found, each one with the fields of
+            an inference and a result list holding its result document,
+            empty if there is no result
+
+        """
+        inferences = await self._inferences.find(
+            {
+                "_id": {
+                    "$in": [ObjectId(inference_id) for inference_id in inference_ids]
+                },
+                "user_id": user_id,
+            }
+        ).to_list(length=None)
+        if not inferences:
+            return []
+
+        # results reference the inference by the string form of its id
+        results: Dict[str, list] = {}
+        async for result in self._results.find(
+            {
+                "inference_id": {
+                    "$in": [str(inference["_id"]) for inference in inferences]
+                }
+            }
+        ):
+            results.setdefault(result["inference_id"], []).append(result)
+        for inference in inferences:
+            inference["result"] = results.get(str(inference["_id"]), [])
+        return inferences
+
+    async def insert_result(self, new_result: ResultCreation):
         """inserts a new result document in the results collection
 
         Args:
@@ -198,10 +584,10 @@ class MongoAdapter:
             None
 
         """
-        self._results.insert_one(new_result.dict())
+        await self._results.insert_one(new_result.dict())
 
-    def update_result(self, result_update: ResultUpdate):
-        """updates a result document
+    async def update_result(self, result_update: ResultUpdate):
+        """updates a result document, if it does not hold the update already
 
         Args:
             result_update (ResultUpdate) : result update form
@@ -210,6 +596,51 @@ class MongoAdapter:
             None
 
         """
-        self._results.update_one(
-            {"inference_id": result_update.inference_id}, {"$set": result_update.dict()}
+        await self._results.update_one(
+            self._get_result_update_filter(result_update),
+            {"$set": result_update.dict()},
         )
+
+    async def update_results(self, result_updates: List[ResultUpdate]):
+        """updates several result documents in one ordered bulk write,
+        skipping the ones that hold their update already
+
+        Args:
+            result_updates (List[ResultUpdate]) : result update forms
+
+        Returns:
+            None
+
+        """
+        if not result_updates:
+            return
+        await self._results.bulk_write(
+            [
+                UpdateOne(
+                    self._get_result_update_filter(result_update),
+                    {"$set": result_update.dict()},
+                )
+                for result_update in result_updates
+            ],
+            ordered=True,
+        )
+
+    def _get_result_update_filter(self, result_update: ResultUpdate) -> dict:
+        """gets the filter matching the result document of the update only if
+        the update would change it, so repeated updates do not write anything
+
+        Args:
+            result_update (ResultUpdate) : result update form
+
+        Returns:
+            the query filter
+
+        """
+        return {
+            "inference_id": result_update.inference_id,
+            "$or": [
+                {field: {"$ne": value}}
+                for field, value in result_update.dict().items()
+                if field != "inference_id"
+            ],
+        }
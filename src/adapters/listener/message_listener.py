@@ -1,14 +1,13 @@
-from asyncio import sleep, get_event_loop
+from asyncio import Event, sleep
 import asyncio
+from typing import Optional
+from core.model.message_service import DurableSubscription
 from core.ports.database_port import DatabasePort
 from core.ports.message_service_port import MessageServicePort
 from core.ports.ports import Ports
 from core.ports.simple_storage_port import SimpleStoragePort
 
-from core.services.message_listener_service import (
-    listen_for_messages_and_update,
-    subscribe_to_channel,
-)
+from core.services.message_listener_service import listen_for_messages_and_update
 from settings import Settings
 
 
@@ -17,7 +16,8 @@ async def listen_for_messages_loop(
     message_service_port: MessageServicePort,
     database_port: DatabasePort,
 ):
-    """continuously listens for messages and updates the database
+    """subscribes to the central channel and keeps updating the database
+    as the messages are pushed by the message service
 
     Args:
         simple_storage_port (SimpleStoragePort) : port for simple storage
@@ -28,24 +28,52 @@ async def listen_for_messages_loop(
         None
 
     """
-    try:
-        await subscribe_to_channel(
-            message_service_port, Settings.message_listener_settings.central_channel
-        )
-    except Exception as e:
-        print(e, flush=True)
-
     while True:
-        await sleep(Settings.message_listener_settings.loop_interval)
         try:
             await listen_for_messages_and_update(
                 simple_storage_port,
                 message_service_port,
                 database_port,
                 Settings.message_listener_settings.central_channel,
+                Settings.message_listener_settings.max_concurrent_updates,
+                Settings.message_listener_settings.update_batch_size,
+                Settings.message_listener_settings.update_batch_window,
+                Settings.message_listener_settings.queue_group,
+                _get_durable_subscription(),
+                Settings.message_service_settings.result_update_channel,
             )
+            break
         except Exception as e:
             print(e, flush=True)
+            await sleep(Settings.message_listener_settings.subscribe_retry_interval)
+
+    # messages are handled by the subscription, the loop only has to stay alive
+    await Event().wait()
+
+
+def _get_durable_subscription() -> Optional[DurableSubscription]:
+    """gets the durable subscription form from the listener settings
+
+    Args:
+        None
+
+    Returns:
+        the durable subscription form, or None if durable delivery is disabled
+
+    """
+    listener_settings = Settings.message_listener_settings
+    if not listener_settings.durable_delivery:
+        return None
+    return DurableSubscription(
+        stream_name=listener_settings.stream_name,
+        # the durable consumer is shared by the replicas, so it needs a name
+        durable_name=listener_settings.queue_group or "result_listeners",
+        max_deliveries=listener_settings.max_deliveries,
+        ack_wait=listener_settings.ack_wait,
+        max_ack_pending=listener_settings.max_concurrent_updates,
+        dead_letter_channel=listener_settings.dead_letter_channel,
+        stream_max_age=listener_settings.stream_max_age,
+    )
 
 
 def run_listener(ports: Ports):
@@ -1,6 +1,18 @@
 import asyncio
+import json
+from typing import Awaitable, Callable, List, Optional, Set
 import nats
 from nats.aio.client import Client
+from nats.aio.msg import Msg
+from nats.js.api import AckPolicy, ConsumerConfig, RetentionPolicy
+from nats.js.client import JetStreamContext
+from nats.js.errors import NotFoundError
+
+CONTENT_TYPE_HEADER = "Content-Type"
+# advisory the server sends when a message of a consumer reached its maximum deliveries
+MAX_DELIVERIES_ADVISORY = (
+    "$JS.EVENT.ADVISORY.CONSUMER.MAX_DELIVERIES.{stream}.{consumer}"
+)
 
 
 class NATSAdapter:
@@ -8,67 +20,339 @@ class NATSAdapter:
 
     Args:
         nats_conn_url (str) : connection url to NATS server container
+        publisher_pool_size (int) : number of long-lived publishing connections
 
     """
 
-    def __init__(self, conn_url: str):
+    def __init__(self, conn_url: str, publisher_pool_size: int = 1):
         self._conn_url = conn_url
-        self._nc = Client()
+        self._publishers: List[Client] = [Client() for _ in range(publisher_pool_size)]
+        self._next_publisher = 0
+        self._connect_lock: Optional[asyncio.Lock] = None
         self._receiving_nc = Client()
         self._subs: dict = {}
+        # tasks handling the durable messages that are not acknowledged yet
+        self._durable_handlers: Set[asyncio.Future] = set()
+
+    async def connect(self):
+        """opens the publishing connections that are not open yet.
+        the connections stay open and reconnect automatically, so this only
+        does network work the first time it is called
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        """
+        if self._publishers_ready():
+            return
+        # the lock is created lazily so it belongs to the running event loop
+        if self._connect_lock is None:
+            self._connect_lock = asyncio.Lock()
+        async with self._connect_lock:
+            for publisher in self._publishers:
+                if publisher.is_connected or publisher.is_reconnecting:
+                    continue
+                await publisher.connect(
+                    self._conn_url,
+                    ping_interval=1,
+                    allow_reconnect=True,
+                    max_reconnect_attempts=-1,
+                )
+
+    async def close(self):
+        """flushes and closes the publishing connections
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        """
+        for publisher in self._publishers:
+            if publisher.is_connected:
+                await publisher.drain()
 
-    async def send_message(self, message: str, publishing_topic: str):
-        """sends a message in the given topic
+    async def send_message(
+        self,
+        message: bytes,
+        publishing_topic: str,
+        content_type: Optional[str] = None,
+    ):
+        """sends a message in the given topic through one of the
+        publishing connections, picked in round robin
 
         Args:
-            message (str) : message to be sent
+            message (bytes) : message to be sent
             publishing_topic (str) : publishing topic
+            content_type (Optional[str]) : content type of the message,
+                sent in the Content-Type header if given
 
         Returns:
             None
 
         """
-        await self._nc.connect(
-            self._conn_url,
-            ping_interval=1,
-            allow_reconnect=True,
-        )
-        await self._nc.publish(publishing_topic, str.encode(message, encoding="utf-8"))
-        await self._nc.close()
+        await self.connect()
+        publisher = self._publishers[self._next_publisher]
+        self._next_publisher = (self._next_publisher + 1) % len(self._publishers)
+        headers = None
+        if content_type is not None:
+            headers = {CONTENT_TYPE_HEADER: content_type}
+        await publisher.publish(publishing_topic, message, headers=headers)
 
-    async def subscribe(self, receiving_topic: str):
-        """subscribes to a topic
+    async def subscribe(
+        self,
+        receiving_topic: str,
+        callback: Callable[[bytes, Optional[str]], Awaitable[None]],
+        queue: str = "",
+    ):
+        """subscribes to a topic. the messages are pushed to the callback
+        as soon as they arrive, one after the other.
+        subscribers in the same queue group share the messages of the topic,
+        each message is delivered to only one of them
 
         Args:
             receiving_topic (str) : topic to subscribe in
+            callback (Callable[[bytes, Optional[str]], Awaitable[None]]) :
+                coroutine function called with the content and the content type
+                of every message
+            queue (str) : queue group of the subscription, if empty
+                every message is delivered to this subscriber
 
         Returns:
             None
 
         """
-        await self._receiving_nc.connect(
-            self._conn_url,
-            ping_interval=1,
-            allow_reconnect=True,
-        )
+        await self._connect_receiving()
+
+        async def message_handler(msg: Msg):
+            await callback(msg.data, _get_content_type(msg))
+
         self._subs[receiving_topic] = await self._receiving_nc.subscribe(
-            receiving_topic
+            receiving_topic, queue=queue, cb=message_handler
         )
         await self._receiving_nc.flush(timeout=5)
 
-    async def wait_for_message(self, receiving_topic: str):
-        """waits until a message arrives in the given topic
+    async def subscribe_durable(
+        self,
+        receiving_topic: str,
+        callback: Callable[[bytes, Optional[str]], Awaitable[None]],
+        stream_name: str,
+        durable_name: str,
+        max_deliveries: int,
+        ack_wait: float,
+        max_ack_pending: int,
+        dead_letter_topic: str,
+        stream_max_age: float,
+    ):
+        """subscribes to a topic through a jetstream durable consumer, so the
+        messages published while nobody is subscribed are kept and delivered later.
+
+        a message is acknowledged once the callback returns. if the callback
+        raises, the message is delivered again, up to max_deliveries times,
+        and then published in the dead letter topic. a message whose last
+        delivery is not acknowledged in time is published there too, when the
+        server advises that it reached max_deliveries. subscribers with the
+        same durable name share the messages of the consumer.
+
+        the stream is a work queue, so acknowledged messages are removed from it,
+        and messages older than stream_max_age are discarded
+
+        Args:
+            receiving_topic (str) : topic to subscribe in
+            callback (Callable[[bytes, Optional[str]], Awaitable[None]]) :
+                coroutine function called with the content and the content type
+                of every message
+            stream_name (str) : stream storing the topic messages, created if missing
+            durable_name (str) : name of the durable consumer
+            max_deliveries (int) : maximum number of deliveries of a message
+            ack_wait (float) : time in seconds a delivered message waits for its
+                acknowledgement before being delivered again
+            max_ack_pending (int) : maximum number of messages delivered and
+                not acknowledged yet
+            dead_letter_topic (str) : topic receiving the messages that were
+                delivered max_deliveries times without being processed
+            stream_max_age (float) : maximum time in seconds a message is kept
+                in the stream, if the stream is created
+
+        Returns:
+            None
+
+        """
+        await self._connect_receiving()
+        js = self._receiving_nc.jetstream()
+        try:
+            await js.stream_info(stream_name)
+        except NotFoundError:
+            await js.add_stream(
+                name=stream_name,
+                subjects=[receiving_topic],
+                retention=RetentionPolicy.WORK_QUEUE,
+                max_age=stream_max_age,
+            )
+
+        async def message_handler(msg: Msg):
+            # handled in its own task, so the messages are processed concurrently
+            # while the server limits how many are pending acknowledgement
+            handler = asyncio.ensure_future(
+                self._handle_durable_message(
+                    msg, callback, max_deliveries, dead_letter_topic
+                )
+            )
+            self._durable_handlers.add(handler)
+            handler.add_done_callback(self._durable_handlers.discard)
+
+        self._subs[receiving_topic] = await js.subscribe(
+            receiving_topic,
+            queue=durable_name,
+            durable=durable_name,
+            stream=stream_name,
+            cb=message_handler,
+            manual_ack=True,
+            config=ConsumerConfig(
+                ack_policy=AckPolicy.EXPLICIT,
+                max_deliver=max_deliveries,
+                ack_wait=ack_wait,
+                max_ack_pending=max_ack_pending,
+            ),
+        )
+
+        async def advisory_handler(msg: Msg):
+            await self._handle_max_deliveries_advisory(
+                js, msg, stream_name, dead_letter_topic
+            )
+
+        # the advisories are shared by the replicas like the messages
+        advisory_topic = MAX_DELIVERIES_ADVISORY.format(
+            stream=stream_name, consumer=durable_name
+        )
+        self._subs[advisory_topic] = await self._receiving_nc.subscribe(
+            advisory_topic, queue=durable_name, cb=advisory_handler
+        )
+
+    async def _handle_durable_message(
+        self,
+        msg: Msg,
+        callback: Callable[[bytes, Optional[str]], Awaitable[None]],
+        max_deliveries: int,
+        dead_letter_topic: str,
+    ):
+        """pushes a durable message to the callback, and acknowledges it if the
+        callback succeeds. otherwise asks for a new delivery or, at the last
+        delivery, publishes it in the dead letter topic
+
+        Args:
+            msg (Msg) : jetstream message
+            callback (Callable[[bytes, Optional[str]], Awaitable[None]]) :
+                coroutine function called with the content and the content type
+                of the message
+            max_deliveries (int) : maximum number of deliveries of a message
+            dead_letter_topic (str) : topic receiving the unprocessed messages
+
+        Returns:
+            None
+
+        """
+        try:
+            await callback(msg.data, _get_content_type(msg))
+        except Exception as e:
+            if msg.metadata.num_delivered < max_deliveries:
+                await msg.nak()
+                return
+            print(
+                "message sent to the dead letter topic after",
+                msg.metadata.num_delivered,
+                "deliveries",
+                e,
+                flush=True,
+            )
+            await self._receiving_nc.publish(dead_letter_topic, msg.data)
+            await msg.term()
+            return
+        await msg.ack()
+
+    async def _handle_max_deliveries_advisory(
+        self,
+        js: JetStreamContext,
+        advisory: Msg,
+        stream_name: str,
+        dead_letter_topic: str,
+    ):
+        """publishes in the dead letter topic the message whose last delivery
+        was not acknowledged in time, and removes it from the stream.
+        messages acknowledged or terminated in the meantime are not in the
+        stream anymore and are skipped
+
+        Args:
+            js (JetStreamContext) : jetstream context of the stream
+            advisory (Msg) : max deliveries advisory of the consumer
+            stream_name (str) : stream storing the message
+            dead_letter_topic (str) : topic receiving the unprocessed messages
+
+        Returns:
+            None
+
+        """
+        stream_seq = json.loads(advisory.data)["stream_seq"]
+        try:
+            msg = await js.get_msg(stream_name, stream_seq)
+        except NotFoundError:
+            return
+        print(
+            "message sent to the dead letter topic after its last delivery timed out",
+            stream_seq,
+            flush=True,
+        )
+        await self._receiving_nc.publish(dead_letter_topic, msg.data)
+        await js.delete_msg(stream_name, stream_seq)
+
+    async def _connect_receiving(self):
+        """opens the connection used to receive messages, if it is not open
 
         Args:
-            receiving_topic (str) : topic to listen
+            None
 
         Returns:
-            serialized json of the arrived message
+            None
 
         """
-        while True:
-            try:
-                msg = await self._subs[receiving_topic].next_msg()
-                return msg.data.decode("utf-8")
-            except:
-                continue
+        if not (self._receiving_nc.is_connected or self._receiving_nc.is_reconnecting):
+            await self._receiving_nc.connect(
+                self._conn_url,
+                ping_interval=1,
+                allow_reconnect=True,
+                max_reconnect_attempts=-1,
+            )
+
+    def _publishers_ready(self) -> bool:
+        """checks if every publishing connection is open or reconnecting
+
+        Args:
+            None
+
+        Returns:
+            True if no publishing connection has to be opened. False otherwise
+
+        """
+        return all(
+            publisher.is_connected or publisher.is_reconnecting
+            for publisher in self._publishers
+        )
+
+
+def _get_content_type(msg: Msg) -> Optional[str]:
+    """gets the content type header of a message
+
+    Args:
+        msg (Msg) : received message
+
+    Returns:
+        the content type, or None if the message has no content type header
+
+    """
+    if not msg.headers:
+        return None
+    return msg.headers.get(CONTENT_TYPE_HEADER)
@@ -1,23 +1,113 @@
+import asyncio
+from typing import Optional
 from fastapi import FastAPI
 from fastapi.security import OAuth2PasswordBearer
-import uvicorn
 
 from adapters.routers.v1.result_router import create_result_router
 from adapters.routers.v1.inference_router import create_inference_router
 from adapters.routers.v1.model_router import create_model_router
 from adapters.routers.v1.user_router import create_user_router
+from core.model.message_service import OutboxDispatch
+from core.model.result import InferenceUpdate, ResultUpdate
 from core.ports.ports import Ports
+from core.services.outbox_dispatcher_service import run_outbox_dispatcher
+from core.services.result_hub import ResultHub
 
 
-def create_app(ports: Ports) -> FastAPI:
+def create_app(
+    ports: Ports,
+    model_update_channel: Optional[str] = None,
+    watch_model_changes: bool = False,
+    outbox_dispatch: Optional[OutboxDispatch] = None,
+    result_update_channel: Optional[str] = None,
+) -> FastAPI:
     app: FastAPI = FastAPI()
 
     oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
+    background_tasks = []
+    result_hub = ResultHub()
+
+    @app.on_event("startup")
+    async def connect_message_service():
+        try:
+            await ports.message_service_port.connect()
+        except Exception as e:
+            # the connection is retried on the first message sent
+            print("could not connect to the message service", e, flush=True)
+
+    @app.on_event("startup")
+    async def load_model_registry():
+        try:
+            await ports.database_port.refresh_models()
+        except Exception as e:
+            # the registry is loaded again on the first model read
+            print("could not load the model registry", e, flush=True)
+
+        if model_update_channel is not None:
+            try:
+                await ports.message_service_port.subscribe_notifications(
+                    model_update_channel, invalidate_model_registry
+                )
+            except Exception as e:
+                print("could not subscribe to model updates", e, flush=True)
+
+        if watch_model_changes:
+            background_tasks.append(asyncio.create_task(watch_model_registry()))
+
+    @app.on_event("startup")
+    async def start_outbox_dispatcher():
+        if outbox_dispatch is not None:
+            background_tasks.append(
+                asyncio.create_task(
+                    run_outbox_dispatcher(
+                        ports.message_service_port,
+                        ports.database_port,
+                        outbox_dispatch,
+                        result_update_channel,
+                    )
+                )
+            )
+
+    @app.on_event("startup")
+    async def subscribe_result_hub():
+        if result_update_channel is None:
+            return
+        try:
+            # not in a queue group, every server updates its own cache and clients
+            await ports.message_service_port.subscribe_inference_updates(
+                result_update_channel, publish_result_update
+            )
+        except Exception as e:
+            print("could not subscribe to result updates", e, flush=True)
+
+    async def publish_result_update(inference_update: InferenceUpdate):
+        # the cache is updated first, so the woken up requests read the result.
+        # the writes of the other servers only reach this cache through here
+        if isinstance(inference_update, ResultUpdate):
+            ports.database_port.cache_result_update(inference_update)
+        else:
+            ports.database_port.cache_status_update(inference_update)
+        await result_hub.publish(inference_update)
+
+    async def invalidate_model_registry():
+        ports.database_port.invalidate_models()
+
+    async def watch_model_registry():
+        try:
+            await ports.database_port.watch_model_changes()
+        except Exception as e:
+            # the registry is still reloaded when it expires
+            print("stopped watching model changes", e, flush=True)
+
+    @app.on_event("shutdown")
+    async def close_message_service():
+        for task in background_tasks:
+            task.cancel()
+        await ports.message_service_port.close()
 
     app.include_router(
         create_inference_router(
             ports.simple_storage_port,
-            ports.message_service_port,
             ports.authentication_port,
             ports.database_port,
             oauth2_scheme,
@@ -35,20 +125,10 @@ def create_app(ports: Ports) -> FastAPI:
     )
     app.include_router(
         create_result_router(
-            ports.authentication_port, ports.database_port, oauth2_scheme
+            ports.authentication_port,
+            ports.database_port,
+            oauth2_scheme,
+            result_hub,
         )
     )
     return app
-
-
-def run_app(ports: dict):
-    app = create_app(ports)
-    uvicorn.run(
-        app,
-        host="0.0.0.0",
-        port=8000,
-        reload=False,
-        log_level="debug",
-        debug=True,
-        workers=1,
-    )
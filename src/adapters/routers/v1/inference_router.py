@@ -2,89 +2,103 @@ from typing import List, Optional
 from fastapi import (
     APIRouter,
     Depends,
+    Header,
     HTTPException,
+    Query,
+    Response,
 )
 from fastapi.encoders import jsonable_encoder
 from fastapi.security import OAuth2PasswordBearer
+from adapters.routers.v1.utils.etag import (
+    get_inference_etag,
+    is_not_modified,
+    not_modified_response,
+)
 from adapters.routers.v1.utils.form_helpers import (
     get_inference_form_files,
     get_inference_form_model,
 )
+from adapters.routers.v1.utils.request_context import (
+    create_request_context_dependency,
+)
 
 from core.ports.authentication_port import AuthenticationPort
 from core.ports.database_port import DatabasePort
-from core.model.token import Token
 from core.model.inference import Inference, InferenceCreationForm, InferenceFiles
 from core.model.exception import LogicException
-from core.ports.message_service_port import MessageServicePort
 from core.ports.simple_storage_port import SimpleStoragePort
 from core.services.inference_service import create_new_inference, get_by_id, get_list
-from core.services.result_service import create_inference_result
+from core.services.request_context import RequestContext
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+# inference ids, and so the page cursors, are mongoDB object ids
+OBJECT_ID_PATTERN = "^[0-9a-fA-F]{24}$"
 
 
 def create_inference_router(
     simple_storage_port: SimpleStoragePort,
-    message_service_port: MessageServicePort,
     authentication_port: AuthenticationPort,
     database_port: DatabasePort,
     oauth2_scheme: OAuth2PasswordBearer,
 ):
     router: APIRouter = APIRouter(prefix="/v1/users")
+    get_request_context = create_request_context_dependency(
+        authentication_port, database_port, oauth2_scheme
+    )
 
     @router.get("/{user_id}/inferences/{inference_id}", response_model=Inference)
-    def get_inference_by_id(
-        inference_id: str, user_id: str, token_content: str = Depends(oauth2_scheme)
+    async def get_inference_by_id(
+        inference_id: str,
+        user_id: str,
+        response: Response,
+        if_none_match: Optional[str] = Header(None),
+        context: RequestContext = Depends(get_request_context),
     ):
         try:
-            inference = get_by_id(
-                authentication_port,
-                database_port,
-                inference_id,
-                user_id,
-                Token(content=token_content),
-            )
+            inference = await get_by_id(context, database_port, inference_id, user_id)
         except LogicException as e:
             raise HTTPException(e.error_status, e.message)
+
+        etag = get_inference_etag(inference)
+        if is_not_modified(if_none_match, etag):
+            return not_modified_response(etag)
+        response.headers["ETag"] = etag
         return inference
 
     @router.get("/{user_id}/inferences")
-    def get_inference_list(user_id: str, token_content: str = Depends(oauth2_scheme)):
+    async def get_inference_list(
+        user_id: str,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        after: Optional[str] = Query(None, regex=OBJECT_ID_PATTERN),
+        context: RequestContext = Depends(get_request_context),
+    ):
         try:
-            inference_list = get_list(
-                authentication_port,
-                database_port,
-                user_id,
-                Token(content=token_content),
+            inference_page = await get_list(
+                context, database_port, user_id, limit, after
             )
         except LogicException as e:
             raise HTTPException(e.error_status, e.message)
-        return {"inferences": jsonable_encoder(inference_list)}
+        return {
+            "inferences": jsonable_encoder(inference_page.inferences),
+            "next_cursor": inference_page.next_cursor,
+        }
 
     @router.post("/{user_id}/inferences")
     async def create_inference(
         user_id: str,
         inference_form: InferenceCreationForm = Depends(get_inference_form_model),
         inference_files: InferenceFiles = Depends(get_inference_form_files),
-        token_content: str = Depends(oauth2_scheme),
+        context: RequestContext = Depends(get_request_context),
     ):
         try:
-            inference_id = await create_new_inference(
+            await create_new_inference(
                 simple_storage_port,
-                message_service_port,
-                authentication_port,
+                context,
                 database_port,
                 user_id,
                 inference_form,
                 inference_files,
-                Token(content=token_content),
-            )
-
-            create_inference_result(
-                authentication_port,
-                database_port,
-                user_id,
-                inference_id,
-                Token(content=token_content),
             )
         except LogicException as e:
             raise HTTPException(e.error_status, e.message)
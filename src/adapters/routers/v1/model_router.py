@@ -1,7 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
 from fastapi.encoders import jsonable_encoder
 from fastapi.security import OAuth2PasswordBearer
 
+from adapters.routers.v1.utils.etag import (
+    get_models_etag,
+    is_not_modified,
+    not_modified_response,
+)
+
 from core.model.token import Token
 from core.model.user import User
 from core.services.model_service import get_by_id, get_list
@@ -9,6 +16,9 @@ from core.model.exception import LogicException
 from core.ports.authentication_port import AuthenticationPort
 from core.ports.database_port import DatabasePort
 
+# models are private to the authenticated users and change with deployments only
+MODEL_CACHE_CONTROL = "private, max-age=60"
+
 
 def create_model_router(
     authentication_port: AuthenticationPort,
@@ -18,9 +28,14 @@ def create_model_router(
     router: APIRouter = APIRouter(prefix="/v1/models")
 
     @router.get("/{model_id}")
-    def get_model_by_id(model_id: str, token_content: str = Depends(oauth2_scheme)):
+    async def get_model_by_id(
+        model_id: str,
+        response: Response,
+        if_none_match: Optional[str] = Header(None),
+        token_content: str = Depends(oauth2_scheme),
+    ):
         try:
-            model = get_by_id(
+            model = await get_by_id(
                 authentication_port,
                 database_port,
                 model_id,
@@ -28,16 +43,32 @@ def create_model_router(
             )
         except LogicException as e:
             raise HTTPException(e.error_status, e.message)
+
+        etag = get_models_etag([model])
+        if is_not_modified(if_none_match, etag):
+            return not_modified_response(etag, MODEL_CACHE_CONTROL)
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = MODEL_CACHE_CONTROL
         return jsonable_encoder(model.dict())
 
     @router.get("/")
-    def get_model_list(token_content: str = Depends(oauth2_scheme)):
+    async def get_model_list(
+        response: Response,
+        if_none_match: Optional[str] = Header(None),
+        token_content: str = Depends(oauth2_scheme),
+    ):
         try:
-            model_list = get_list(
+            model_list = await get_list(
                 authentication_port, database_port, Token(content=token_content)
             )
         except LogicException as e:
             raise HTTPException(e.error_status, e.message)
+
+        etag = get_models_etag(model_list)
+        if is_not_modified(if_none_match, etag):
+            return not_modified_response(etag, MODEL_CACHE_CONTROL)
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = MODEL_CACHE_CONTROL
         return {"models": jsonable_encoder(model_list)}
 
     return router
@@ -1,38 +1,178 @@
-from fastapi import APIRouter, Depends, HTTPException, Request, status
+import json
+from typing import List, Optional
+from fastapi import (
+    APIRouter,
+    Body,
+    Depends,
+    Header,
+    HTTPException,
+    Path,
+    Query,
+    Response,
+)
 from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from fastapi.security import OAuth2PasswordBearer
 
+from adapters.routers.v1.utils.etag import (
+    get_result_etag,
+    is_not_modified,
+    not_modified_response,
+)
+from adapters.routers.v1.utils.request_context import (
+    create_request_context_dependency,
+)
+from core.model.constants import Status
 from core.model.exception import LogicException
-from core.model.token import Token
+from core.model.result import InferenceStatusUpdate, InferenceUpdate, ResultUpdate
 from core.ports.authentication_port import AuthenticationPort
 from core.ports.database_port import DatabasePort
-from core.services.result_service import get_inference_result
+from core.services.request_context import RequestContext
+from core.services.result_hub import ResultHub
+from core.services.result_service import (
+    batch_get_inference_results,
+    get_inference_result,
+    subscribe_to_inference_results,
+)
+
+# maximum number of inferences read by a batch result request
+MAX_BATCH_INFERENCES = 200
+# maximum number of inferences followed by a result event stream
+MAX_STREAMED_INFERENCES = 50
+# maximum time in seconds a result request waits for the result update
+MAX_RESULT_WAIT = 60
+# time in seconds without events after which a comment is sent,
+# so proxies keep the stream open and closed clients are noticed
+KEEPALIVE_INTERVAL = 15
 
 
 def create_result_router(
     authentication_port: AuthenticationPort,
     database_port: DatabasePort,
     oauth2_scheme: OAuth2PasswordBearer,
+    result_hub: ResultHub,
 ):
     router: APIRouter = APIRouter(prefix="/v1/users")
+    get_request_context = create_request_context_dependency(
+        authentication_port, database_port, oauth2_scheme
+    )
 
     @router.get("/{user_id}/inferences/{inference_id}/result")
-    def get_result(
-        inference_id: str, user_id: str, token_content: str = Depends(oauth2_scheme)
+    async def get_result(
+        inference_id: str,
+        user_id: str,
+        response: Response,
+        wait: float = Query(0, ge=0, le=MAX_RESULT_WAIT),
+        if_none_match: Optional[str] = Header(None),
+        context: RequestContext = Depends(get_request_context),
     ):
         try:
-            inference, result = get_inference_result(
-                authentication_port,
-                database_port,
-                inference_id,
-                user_id,
-                Token(content=token_content),
+            inference, result = await get_inference_result(
+                context, database_port, inference_id, user_id, result_hub, wait
             )
         except LogicException as e:
             raise HTTPException(e.error_status, e.message)
 
+        etag = get_result_etag(inference, result)
+        if is_not_modified(if_none_match, etag):
+            return not_modified_response(etag)
+        response.headers["ETag"] = etag
+
         return jsonable_encoder(
             {"inference": inference.dict(), "result": result.dict()}
         )
 
+    # starlette drops what follows a colon in the last path segment,
+    # so the custom method is matched as a path parameter
+    @router.post("/{user_id}/results:{custom_method}")
+    async def batch_get_results(
+        user_id: str,
+        custom_method: str = Path(..., regex="^batchGet$"),
+        inference_ids: List[str] = Body(
+            ..., embed=True, min_items=1, max_items=MAX_BATCH_INFERENCES
+        ),
+        context: RequestContext = Depends(get_request_context),
+    ):
+        try:
+            inference_results = await batch_get_inference_results(
+                context, database_port, user_id, inference_ids
+            )
+        except LogicException as e:
+            raise HTTPException(e.error_status, e.message)
+
+        return {
+            "results": jsonable_encoder(
+                [
+                    {"inference": inference.dict(), "result": result.dict()}
+                    for inference, result in inference_results
+                ]
+            )
+        }
+
+    @router.get("/{user_id}/results/events")
+    async def stream_results(
+        user_id: str,
+        inference_id: List[str] = Query(..., max_items=MAX_STREAMED_INFERENCES),
+        context: RequestContext = Depends(get_request_context),
+    ):
+        try:
+            subscription, finished = await subscribe_to_inference_results(
+                context, database_port, result_hub, user_id, inference_id
+            )
+        except LogicException as e:
+            raise HTTPException(e.error_status, e.message)
+
+        async def result_events():
+            # a server-sent event for every followed inference once it finishes,
+            # named after its status, then the stream ends
+            try:
+                pending = set(inference_id)
+                for inference, result in finished:
+                    pending.discard(inference.id)
+                    if result is None:
+                        yield _format_event(
+                            inference.status,
+                            InferenceStatusUpdate(
+                                inference_id=inference.id, status=inference.status
+                            ),
+                        )
+                        continue
+                    yield _format_event(
+                        inference.status,
+                        ResultUpdate(
+                            inference_id=inference.id,
+                            output=result.output,
+                            diagnosis=result.diagnosis,
+                        ),
+                    )
+                while pending:
+                    inference_update = await subscription.get(KEEPALIVE_INTERVAL)
+                    if inference_update is None:
+                        yield ": keepalive\n\n"
+                        continue
+                    if inference_update.inference_id in pending:
+                        pending.discard(inference_update.inference_id)
+                        yield _format_event(
+                            _get_event_name(inference_update), inference_update
+                        )
+            finally:
+                subscription.close()
+
+        return StreamingResponse(
+            result_events(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache"},
+        )
+
     return router
+
+
+def _get_event_name(inference_update: InferenceUpdate) -> str:
+    # status updates are only sent for inferences finished without a result
+    if isinstance(inference_update, InferenceStatusUpdate):
+        return inference_update.status
+    return Status.completed_status
+
+
+def _format_event(event: str, inference_update: InferenceUpdate) -> str:
+    return f"event: {event}\ndata: {json.dumps(inference_update.dict())}\n\n"
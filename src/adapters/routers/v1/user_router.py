@@ -21,9 +21,9 @@ def create_user_router(
     router: APIRouter = APIRouter(prefix="/v1/users")
 
     @router.get("/{user_id}", response_model=User)
-    def get_user_by_id(user_id: str, token_content: str = Depends(oauth2_scheme)):
+    async def get_user_by_id(user_id: str, token_content: str = Depends(oauth2_scheme)):
         try:
-            user = get_by_id(
+            user = await get_by_id(
                 authentication_port,
                 database_port,
                 user_id,
@@ -38,7 +38,7 @@ def create_user_router(
         form_data: OAuth2PasswordRequestForm = Depends(),
     ):
         try:
-            access_token = authenticate_and_generate_token(
+            access_token = await authenticate_and_generate_token(
                 authentication_port,
                 database_port,
                 form_data.username,
@@ -49,11 +49,11 @@ def create_user_router(
         return {"access_token": access_token.content, "token_type": "bearer"}
 
     @router.post("/")
-    def create_user(
+    async def create_user(
         user_form: UserCreationForm, token_content: str = Depends(oauth2_scheme)
     ):
         try:
-            create_new_user(
+            await create_new_user(
                 authentication_port,
                 database_port,
                 user_form,
@@ -0,0 +1,79 @@
+from hashlib import sha256
+from typing import Any, List, Optional
+
+from fastapi import Response, status
+
+from core.model.inference import Inference
+from core.model.model import Model
+from core.model.result import Result
+
+
+def create_etag(*versions: Any) -> str:
+    """creates a strong entity tag from the values identifying a version of
+    a payload, without serializing the payload
+
+    Args:
+        versions (Any) : values that change whenever the payload changes
+
+    Returns:
+        the quoted entity tag
+    """
+    return '"' + sha256(repr(versions).encode()).hexdigest()[:32] + '"'
+
+
+def get_inference_etag(inference: Inference) -> str:
+    # the status is the only field of an inference written after its creation
+    return create_etag(inference.id, inference.status)
+
+
+def get_result_etag(inference: Inference, result: Result) -> str:
+    # output and diagnosis are the only fields of a result written after its creation
+    return create_etag(
+        inference.id, inference.status, result.id, result.output, result.diagnosis
+    )
+
+
+def get_models_etag(models: List[Model]) -> str:
+    return create_etag(*[tuple(model.dict().values()) for model in models])
+
+
+def is_not_modified(if_none_match: Optional[str], etag: str) -> bool:
+    """checks whether the If-None-Match header matches the entity tag,
+    with the weak comparison the header is evaluated with
+
+    Args:
+        if_none_match (Optional[str]) : value of the If-None-Match header
+        etag (str) : entity tag of the current payload
+
+    Returns:
+        True if the client has the current payload. False otherwise
+
+    """
+    if if_none_match is None:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag == etag:
+            return True
+    return False
+
+
+def not_modified_response(etag: str, cache_control: Optional[str] = None) -> Response:
+    """creates the empty 304 response of a conditional request
+
+    Args:
+        etag (str) : entity tag of the current payload
+        cache_control (Optional[str]) : Cache-Control header, if any
+
+    Returns:
+        the not modified response
+
+    """
+    headers = {"ETag": etag}
+    if cache_control is not None:
+        headers["Cache-Control"] = cache_control
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
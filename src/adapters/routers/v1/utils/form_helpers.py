@@ -1,4 +1,3 @@
-from calendar import c
 from fastapi import File, Form, UploadFile
 from core.model.inference import InferenceCreationForm, InferenceFiles, UploadAudio
 
@@ -28,12 +27,12 @@ async def get_inference_form_files(
     frase: UploadFile = File(None),
 ):
     return InferenceFiles(
-        aceite=UploadAudio(content=aceite.file.read(), filename=aceite.filename),
+        aceite=UploadAudio(file=aceite.file, filename=aceite.filename),
         vogal_sustentada=UploadAudio(
-            content=vogal_sustentada.file.read(), filename=vogal_sustentada.filename
+            file=vogal_sustentada.file, filename=vogal_sustentada.filename
         ),
         parlenda_ritmada=UploadAudio(
-            content=parlenda_ritmada.file.read(), filename=parlenda_ritmada.filename
+            file=parlenda_ritmada.file, filename=parlenda_ritmada.filename
         ),
-        frase=UploadAudio(content=frase.file.read(), filename=frase.filename),
+        frase=UploadAudio(file=frase.file, filename=frase.filename),
     )
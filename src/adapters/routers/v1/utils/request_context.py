@@ -0,0 +1,24 @@
+from fastapi import Depends
+from fastapi.security import OAuth2PasswordBearer
+
+from core.model.token import Token
+from core.ports.authentication_port import AuthenticationPort
+from core.ports.database_port import DatabasePort
+from core.services.request_context import RequestContext
+
+
+def create_request_context_dependency(
+    authentication_port: AuthenticationPort,
+    database_port: DatabasePort,
+    oauth2_scheme: OAuth2PasswordBearer,
+):
+    # fastapi caches the result of a dependency during a request,
+    # so every endpoint parameter depending on it shares the same context
+    async def get_request_context(
+        token_content: str = Depends(oauth2_scheme),
+    ) -> RequestContext:
+        return RequestContext(
+            authentication_port, database_port, Token(content=token_content)
+        )
+
+    return get_request_context
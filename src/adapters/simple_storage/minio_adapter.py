@@ -1,7 +1,8 @@
-from io import BytesIO
 import os
+from typing import BinaryIO
 from minio import Minio
 from minio.deleteobjects import DeleteObject
+from minio.helpers import MIN_PART_SIZE
 
 
 class MinioAdapter:
@@ -12,41 +13,61 @@ class MinioAdapter:
         bucket_name (str) : name of the bucket used by the app
         minio_access_key (str) : minio access credentials
         minio_secret_key (str) : minio credentials
+        part_size (int) : size of the chunks read from streams of unknown length
 
     """
 
     def __init__(
-        self, conn_url: str, access_key: str, secret_key: str, bucket_name: str
+        self,
+        conn_url: str,
+        access_key: str,
+        secret_key: str,
+        bucket_name: str,
+        part_size: int = MIN_PART_SIZE,
     ):
         self._client = Minio(
             conn_url, access_key=access_key, secret_key=secret_key, secure=False
         )
         self._bucket_name = bucket_name
+        self._part_size = part_size
         if not self._client.bucket_exists(bucket_name):
             self._client.make_bucket(bucket_name)
 
     def store_inference_file(
-        self, inference_id: str, file_type: str, file_extension: str, raw_file: BytesIO
+        self,
+        inference_id: str,
+        file_type: str,
+        file_extension: str,
+        raw_file: BinaryIO,
     ):
-        """stores the file in minIO server
+        """streams the file to minIO server
+
+        The file is read in chunks by the minIO client, so at most one part
+        is held in memory. Seekable files are sent with their known length,
+        other streams are sent as a multipart upload of unknown length.
 
         Args:
             inference_id (dict) : inference id
             file_type (str) : type of the file being stored
             file_extension (dict) : file extension
-            raw_file (BytesIO) : file stream
+            raw_file (BinaryIO) : file stream
 
         Returns:
             None
 
         """
-        length = raw_file.getbuffer().nbytes
-        self._client.put_object(
-            self._bucket_name,
-            inference_id + os.sep + file_type + file_extension,
-            raw_file,
-            length,
-        )
+        object_name = inference_id + os.sep + file_type + file_extension
+        length = self._get_stream_length(raw_file)
+        if length is None:
+            self._client.put_object(
+                self._bucket_name,
+                object_name,
+                raw_file,
+                -1,
+                part_size=self._part_size,
+            )
+            return
+        self._client.put_object(self._bucket_name, object_name, raw_file, length)
 
     def remove_inference_directory(self, inference_id: str):
         """removes the inference directory and files from minIO server
@@ -65,3 +86,22 @@ class MinioAdapter:
         errors = self._client.remove_objects(self._bucket_name, delete_object_list)
         for error in errors:
             print("error occured when deleting object", error, flush=True)
+
+    def _get_stream_length(self, raw_file: BinaryIO):
+        """gets the remaining length of a seekable stream without reading it
+
+        Args:
+            raw_file (BinaryIO) : file stream
+
+        Returns:
+            number of bytes from the current position to the end of the stream.
+            if the stream is not seekable, None is returned.
+
+        """
+        try:
+            position = raw_file.tell()
+            length = raw_file.seek(0, os.SEEK_END) - position
+            raw_file.seek(position)
+        except (AttributeError, OSError, ValueError):
+            return None
+        return length
@@ -0,0 +1,80 @@
+import asyncio
+from typing import Optional
+from fastapi import FastAPI
+import uvicorn
+
+from adapters.routers.app import create_app
+from core.model.message_service import OutboxDispatch
+from bootstrap import bootstrap_database_indexes, configure_ports
+from settings import Settings
+
+
+def create_api_app() -> FastAPI:
+    """Creates the API app of one server worker, with its own ports.
+    uvicorn calls it in every worker process it starts
+
+    Args:
+        None
+
+    Returns:
+        FastAPI app
+
+    """
+    return create_app(
+        configure_ports(),
+        Settings.message_service_settings.model_update_channel,
+        Settings.database_settings.watch_model_changes,
+        _get_outbox_dispatch(),
+        Settings.message_service_settings.result_update_channel,
+    )
+
+
+def _get_outbox_dispatch() -> Optional[OutboxDispatch]:
+    """gets the outbox dispatch form from the message service settings
+
+    Args:
+        None
+
+    Returns:
+        the outbox dispatch form, or None if the outbox is not dispatched
+        by the API server
+
+    """
+    message_service_settings = Settings.message_service_settings
+    if not message_service_settings.dispatch_outbox:
+        return None
+    return OutboxDispatch(
+        batch_size=message_service_settings.outbox_batch_size,
+        poll_interval=message_service_settings.outbox_poll_interval,
+        lease=message_service_settings.outbox_lease,
+        retry_base_delay=message_service_settings.outbox_retry_base_delay,
+        retry_max_delay=message_service_settings.outbox_retry_max_delay,
+        max_attempts=message_service_settings.outbox_max_attempts,
+    )
+
+
+def run_api():
+    """Runs the API server with the number of workers and the log level
+    set in the api settings
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    """
+    asyncio.run(bootstrap_database_indexes(configure_ports()))
+    uvicorn.run(
+        "api:create_api_app",
+        factory=True,
+        host=Settings.api_settings.host,
+        port=Settings.api_settings.port,
+        reload=False,
+        log_level=Settings.api_settings.log_level,
+        workers=Settings.api_settings.workers,
+    )
+
+
+if __name__ == "__main__":
+    run_api()
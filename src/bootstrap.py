@@ -0,0 +1,95 @@
+from adapters.authentication.authentication_adapter import AuthenticationAdapter
+from adapters.database.mongo_adapter import MongoAdapter
+from adapters.message_service.nats_adapter import NATSAdapter
+from adapters.simple_storage.minio_adapter import MinioAdapter
+
+from core.ports.authentication_port import AuthenticationPort
+from core.ports.database_port import DatabasePort
+from core.ports.message_codecs import create_codec
+from core.ports.message_service_port import MessageServicePort
+from core.ports.ports import Ports
+from core.ports.simple_storage_port import SimpleStoragePort
+from settings import (
+    Settings,
+)
+
+
+def configure_ports() -> Ports:
+    """Instantiates Ports and Adapters of the services used in the application
+
+    Args:
+        None
+
+    Returns:
+        Ports object with port instances as attributes
+
+    """
+    ports = Ports(
+        DatabasePort(
+            MongoAdapter(
+                Settings.database_settings.mongo_conn_url,
+                Settings.database_settings.database_name,
+                Settings.database_settings.user_collection_name,
+                Settings.database_settings.inference_collection_name,
+                Settings.database_settings.model_collection_name,
+                Settings.database_settings.result_collection_name,
+                Settings.database_settings.outbox_collection_name,
+            ),
+            Settings.database_settings.model_registry_ttl,
+            Settings.database_settings.inference_cache_size,
+            Settings.database_settings.inference_cache_ttl,
+        ),
+        MessageServicePort(
+            NATSAdapter(
+                Settings.message_service_settings.nats_conn_url,
+                Settings.message_service_settings.publisher_pool_size,
+            ),
+            create_codec(Settings.message_service_settings.codec),
+        ),
+        AuthenticationPort(
+            AuthenticationAdapter(
+                Settings.authentication_settings.expire_time,
+                Settings.authentication_settings.key,
+                Settings.authentication_settings.algorithm,
+                Settings.authentication_settings.context_scheme,
+                Settings.authentication_settings.deprecated,
+                Settings.authentication_settings.token_cache_size,
+                Settings.authentication_settings.token_cache_ttl,
+                Settings.authentication_settings.password_workers,
+            ),
+            Settings.authentication_settings.check_revoked_users,
+        ),
+        SimpleStoragePort(
+            MinioAdapter(
+                Settings.simple_storage_settings.minio_conn_url,
+                Settings.simple_storage_settings.minio_access_key,
+                Settings.simple_storage_settings.minio_secret_key,
+                Settings.simple_storage_settings.bucket_name,
+            ),
+            Settings.simple_storage_settings.upload_workers,
+            Settings.simple_storage_settings.upload_pool_size,
+        ),
+    )
+    return ports
+
+
+async def bootstrap_database_indexes(ports: Ports) -> None:
+    """Creates the missing database indexes, if enabled, and reports
+    the required indexes that still do not exist
+
+    Args:
+        ports (Ports): Ports object with ports instances
+
+    Returns:
+        None
+
+    """
+    if Settings.database_settings.ensure_indexes:
+        missing_indexes = await ports.database_port.ensure_indexes()
+    else:
+        missing_indexes = await ports.database_port.get_missing_indexes()
+    for collection_name, index_names in missing_indexes.items():
+        print(
+            f"missing indexes on {collection_name}: {', '.join(index_names)}",
+            flush=True,
+        )
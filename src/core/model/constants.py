@@ -4,4 +4,4 @@ class Status:
 
     completed_status = "completed"
 
-    error_status = "error"
\ No newline at end of file
+    error_status = "error"
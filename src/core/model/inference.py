@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import Any, List, Optional
 from typing import Literal
 
 sex_type = Literal["F", "M"]
@@ -21,7 +21,9 @@ class InferenceCreation(InferenceCreationForm):
 
 
 class UploadAudio(BaseModel):
-    content: bytes
+    # file-like object with a read() method, usually the spooled file of the upload.
+    # it is streamed to the simple storage, so the audio is never fully loaded in memory
+    file: Any
     filename: str
 
 
@@ -34,3 +36,15 @@ class InferenceFiles(BaseModel):
 
 class Inference(InferenceCreation):
     id: str
+
+
+class InferenceCacheStats(BaseModel):
+    hits: int
+    misses: int
+    size: int
+
+
+class InferencePage(BaseModel):
+    inferences: List[Inference]
+    # id of the last inference in the page, None if there are no more inferences
+    next_cursor: Optional[str]
@@ -6,3 +6,28 @@ from core.model.inference import InferenceCreation
 class RequestLetter(BaseModel):
     content: InferenceCreation
     publishing_channel: str
+
+
+class DurableSubscription(BaseModel):
+    stream_name: str
+    durable_name: str
+    max_deliveries: int
+    ack_wait: float
+    max_ack_pending: int
+    dead_letter_channel: str
+    stream_max_age: float
+
+
+class OutboxMessage(RequestLetter):
+    # id of the inference the message was written with
+    id: str
+    attempts: int = 0
+
+
+class OutboxDispatch(BaseModel):
+    batch_size: int
+    poll_interval: float
+    lease: float
+    retry_base_delay: float
+    retry_max_delay: float
+    max_attempts: int
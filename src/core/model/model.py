@@ -6,3 +6,11 @@ class Model(BaseModel):
     receiving_channel: str
     publishing_channel: str
     id: str
+
+
+class ModelRegistryStats(BaseModel):
+    hits: int
+    misses: int
+    size: int
+    refreshes: int
+    invalidations: int
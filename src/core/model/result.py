@@ -1,3 +1,4 @@
+from typing import Union
 from pydantic import BaseModel
 
 
@@ -18,3 +19,13 @@ class ResultUpdate(BaseModel):
     inference_id: str
     output: float
     diagnosis: str
+
+
+class InferenceStatusUpdate(BaseModel):
+    # an inference finished without a result, e.g. its request was never delivered
+    inference_id: str
+    status: str
+
+
+# updates sent on the result update channel
+InferenceUpdate = Union[ResultUpdate, InferenceStatusUpdate]
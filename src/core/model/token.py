@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic import BaseModel
 
 
@@ -7,3 +8,17 @@ class Token(BaseModel):
 
 class TokenData(BaseModel):
     username: str
+    # None in tokens issued before the user id claim was added
+    user_id: Optional[str]
+
+
+class PasswordPoolStats(BaseModel):
+    workers: int
+    running: int
+    queued: int
+
+
+class TokenCacheStats(BaseModel):
+    hits: int
+    misses: int
+    size: int
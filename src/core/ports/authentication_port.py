@@ -1,5 +1,5 @@
 from typing import Optional
-from core.model.token import Token, TokenData
+from core.model.token import PasswordPoolStats, Token, TokenCacheStats, TokenData
 from core.model.user import User
 
 
@@ -8,11 +8,14 @@ class AuthenticationPort:
 
     Args:
         authentication_adapter (Adapter Class) : authentication adapter instance
+        check_revoked_users (bool) : whether the requesting user must be checked
+            in the database, so disabled users are refused before their token expires
 
     """
 
-    def __init__(self, authentication_adapter):
+    def __init__(self, authentication_adapter, check_revoked_users: bool = False):
         self._authentication_adapter = authentication_adapter
+        self.check_revoked_users = check_revoked_users
 
     def validate_token(self, token: Token) -> bool:
         """calls the adapter to validate the token
@@ -53,7 +56,19 @@ class AuthenticationPort:
         """
         return self._authentication_adapter.decode_token(token)
 
-    def verify_password(self, plain_password: str, user_password: str) -> bool:
+    def get_token_cache_stats(self) -> TokenCacheStats:
+        """calls the adapter to get the hit and miss counts of the decoded token cache
+
+        Args:
+            None
+
+        Returns:
+            token cache stats
+
+        """
+        return self._authentication_adapter.get_token_cache_stats()
+
+    async def verify_password(self, plain_password: str, user_password: str) -> bool:
         """calls the adapter to verify if the plain password matches with the user hashed password
 
         Args:
@@ -64,11 +79,11 @@ class AuthenticationPort:
             True if they match. False otherwise
 
         """
-        return self._authentication_adapter.verify_password(
+        return await self._authentication_adapter.verify_password(
             plain_password, user_password
         )
 
-    def get_password_hash(self, plain_password: str) -> str:
+    async def get_password_hash(self, plain_password: str) -> str:
         """calls the adapter to get the plain password hash value
 
         Args:
@@ -78,4 +93,17 @@ class AuthenticationPort:
             hashed password
 
         """
-        return self._authentication_adapter.get_password_hash(plain_password)
+        return await self._authentication_adapter.get_password_hash(plain_password)
+
+    def get_password_pool_stats(self) -> PasswordPoolStats:
+        """calls the adapter to get the number of password workers
+        and of the password jobs running and queued
+
+        Args:
+            None
+
+        Returns:
+            password pool stats
+
+        """
+        return self._authentication_adapter.get_password_pool_stats()
@@ -1,24 +1,107 @@
-from typing import Optional, List
-from core.model.model import Model
-from core.model.result import Result, ResultCreation
+import asyncio
+from collections import OrderedDict
+import time
+from typing import Dict, Optional, List, Tuple
+from core.model.message_service import OutboxMessage
+from core.model.model import Model, ModelRegistryStats
+from core.model.result import (
+    InferenceStatusUpdate,
+    Result,
+    ResultCreation,
+    ResultUpdate,
+)
 from core.model.user import User, UserCreation, UserWithPassword
-from core.model.inference import Inference, InferenceCreation
+from core.model.inference import (
+    Inference,
+    InferenceCacheStats,
+    InferenceCreation,
+    InferencePage,
+)
+from core.model.constants import Status
 
 
 class DatabasePort:
-    """Port for the database adapter
+    """Asynchronous port for the database adapter.
+    the models can be served from a registry kept in memory, loaded with
+    every model at once and reloaded when it expires or is invalidated.
+    inferences are inserted with an outbox message, sent later by a dispatcher
+    that is woken up by the insertions of the same process.
+    the inferences read by id can be kept in a bounded cache with their
+    results, updated by the writes of the port and by the result updates
+    of the other processes, and kept inference_cache_ttl seconds at most
 
     Args:
         database_adapter (Adapter Class) : database adapter instance
+        model_registry_ttl (float) : maximum time in seconds the model registry
+            is used before being reloaded, 0 disables the registry
+        inference_cache_size (int) : maximum number of inferences kept in the
+            inference cache, 0 disables the cache
+        inference_cache_ttl (float) : maximum time in seconds an inference
+            is kept in the inference cache
 
     """
 
-    def __init__(self, database_adapter):
+    def __init__(
+        self,
+        database_adapter,
+        model_registry_ttl: float = 0,
+        inference_cache_size: int = 0,
+        inference_cache_ttl: float = 30,
+    ):
         self._database_adapter = database_adapter
+        self._model_registry_ttl = model_registry_ttl
+        self._model_registry: Dict[str, Model] = {}
+        # time the registry was loaded, None while it has to be loaded
+        self._model_registry_loaded_at: Optional[float] = None
+        self._model_registry_lock: Optional[asyncio.Lock] = None
+        self._model_registry_hits = 0
+        self._model_registry_misses = 0
+        self._model_registry_refreshes = 0
+        self._model_registry_invalidations = 0
+        self._outbox_event: Optional[asyncio.Event] = None
+        self._inference_cache_size = inference_cache_size
+        self._inference_cache_ttl = inference_cache_ttl
+        # inference id -> (inference, its result if read, time it expires)
+        self._inference_cache: "OrderedDict[str, Tuple[Inference, Optional[Result], float]]" = (
+            OrderedDict()
+        )
+        self._inference_cache_hits = 0
+        self._inference_cache_misses = 0
+        # inference id -> number of updates of the inference since the database
+        # reads in flight started, kept only while there are reads in flight
+        self._inference_updates: Dict[str, int] = {}
+        self._inference_reads: Dict[str, int] = {}
+
+    # index methods
+
+    async def ensure_indexes(self) -> Dict[str, List[str]]:
+        """creates the indexes required by the database queries, if they do not exist
+
+        Args:
+            None
+
+        Returns:
+            the names of the required indexes that are still missing, by collection name
+
+        """
+        await self._database_adapter.ensure_indexes()
+        return await self._database_adapter.get_missing_indexes()
+
+    async def get_missing_indexes(self) -> Dict[str, List[str]]:
+        """gets the indexes required by the database queries that do not exist
+
+        Args:
+            None
+
+        Returns:
+            the names of the missing indexes, by collection name
+
+        """
+        return await self._database_adapter.get_missing_indexes()
 
     # user methods
 
-    def get_user_by_id(self, user_id: str) -> Optional[User]:
+    async def get_user_by_id(self, user_id: str) -> Optional[User]:
         """gets the user object by the user id
 
         Args:
@@ -29,7 +112,7 @@ class DatabasePort:
             if no user is found, None is returned.
 
         """
-        user = self._database_adapter.get_user_by_id(user_id)
+        user = await self._database_adapter.get_user_by_id(user_id)
         if user == None:
             return None
         return User(
@@ -40,7 +123,7 @@ class DatabasePort:
             }
         )
 
-    def get_user_by_username(self, username: str) -> Optional[User]:
+    async def get_user_by_username(self, username: str) -> Optional[User]:
         """gets the user object by the username
 
         Args:
@@ -51,7 +134,7 @@ class DatabasePort:
             if no user is found, None is returned.
 
         """
-        user = self._database_adapter.get_user_by_username(username)
+        user = await self._database_adapter.get_user_by_username(username)
         if user == None:
             return None
         return User(
@@ -62,7 +145,7 @@ class DatabasePort:
             }
         )
 
-    def get_user_by_email(self, email: str) -> Optional[User]:
+    async def get_user_by_email(self, email: str) -> Optional[User]:
         """gets the user object by the email
 
         Args:
@@ -73,7 +156,7 @@ class DatabasePort:
             if no user is found, None is returned.
 
         """
-        user = self._database_adapter.get_user_by_email(email)
+        user = await self._database_adapter.get_user_by_email(email)
         if user == None:
             return None
         return User(
@@ -84,7 +167,7 @@ class DatabasePort:
             }
         )
 
-    def get_user_by_username_with_password(
+    async def get_user_by_username_with_password(
         self, username: str
     ) -> Optional[UserWithPassword]:
         """gets the user object with the password attribute by the username
@@ -97,7 +180,7 @@ class DatabasePort:
             if no user is found, None is returned.
 
         """
-        user = self._database_adapter.get_user_by_username(username)
+        user = await self._database_adapter.get_user_by_username(username)
         if user == None:
             return None
         return UserWithPassword(
@@ -109,7 +192,19 @@ class DatabasePort:
             }
         )
 
-    def insert_user(self, new_user: UserCreation):
+    async def is_user_enabled(self, user_id: str) -> bool:
+        """checks whether the user exists and was not disabled
+
+        Args:
+            user_id (str) : user id
+
+        Returns:
+            True if the user exists and is not disabled. False otherwise
+
+        """
+        return await self._database_adapter.is_user_enabled(user_id)
+
+    async def insert_user(self, new_user: UserCreation):
         """inserts a new user in the database
 
         Args:
@@ -119,11 +214,11 @@ class DatabasePort:
             None
 
         """
-        self._database_adapter.insert_user(new_user)
+        await self._database_adapter.insert_user(new_user)
 
     # inference methods
 
-    def get_inference_by_id(
+    async def get_inference_by_id(
         self, inference_id: str, user_id: str
     ) -> Optional[Inference]:
         """gets the inference object by the inference id and user id
@@ -137,7 +232,35 @@ class DatabasePort:
             if no inference is found, None is returned.
 
         """
-        inference = self._database_adapter.get_inference_by_id(inference_id, user_id)
+        cached = self._get_cached_inference(inference_id, user_id)
+        if cached is not None:
+            return cached[0]
+        updates = self._start_inference_read(inference_id)
+        try:
+            inference = await self._read_inference_by_id(inference_id, user_id)
+        finally:
+            updated = self._finish_inference_read(inference_id, updates)
+        if inference is not None and not updated:
+            self._cache_inference(inference, None)
+        return inference
+
+    async def _read_inference_by_id(
+        self, inference_id: str, user_id: str
+    ) -> Optional[Inference]:
+        """reads the inference object by the inference id and user id
+
+        Args:
+            inference_id (str) : inference id
+            user_id (str) : user id
+
+        Returns:
+            inference object.
+            if no inference is found, None is returned.
+
+        """
+        inference = await self._database_adapter.get_inference_by_id(
+            inference_id, user_id
+        )
         if inference == None:
             return None
         return Inference(
@@ -155,18 +278,26 @@ class DatabasePort:
             }
         )
 
-    def get_inference_list(self, user_id: str) -> List[Inference]:
-        """gets all inference objects of the user
+    async def get_inference_page(
+        self, user_id: str, limit: int, after: Optional[str] = None
+    ) -> InferencePage:
+        """gets a page of inference objects of the user, in ascending id order
 
         Args:
             user_id (str) : user id
+            limit (int) : maximum number of inferences in the page
+            after (Optional[str]) : cursor returned with the previous page,
+                if None the first page is returned
 
         Returns:
-            the list of inference objects
+            the inference page, with the cursor of the next page if there is one
 
         """
-        inference_list = self._database_adapter.get_inference_list(user_id)
-        return [
+        # one more document tells whether there is a next page
+        inference_list = await self._database_adapter.get_inference_page(
+            user_id, limit + 1, after
+        )
+        inferences = [
             Inference(
                 **{
                     "id": str(inference["_id"]),
@@ -181,10 +312,12 @@ class DatabasePort:
                     "created_in": inference["created_in"],
                 }
             )
-            for inference in inference_list
+            for inference in inference_list[:limit]
         ]
+        next_cursor = inferences[-1].id if len(inference_list) > limit else None
+        return InferencePage(inferences=inferences, next_cursor=next_cursor)
 
-    def insert_inference(self, new_inference: InferenceCreation) -> str:
+    async def insert_inference(self, new_inference: InferenceCreation) -> str:
         """inserts a new inference in the database
 
         Args:
@@ -194,9 +327,47 @@ class DatabasePort:
             the id of the new inference
 
         """
-        return str(self._database_adapter.insert_inference(new_inference))
+        return str(await self._database_adapter.insert_inference(new_inference))
+
+    def create_inference_id(self) -> str:
+        """creates the id of a new inference before it is inserted
+
+        Args:
+            None
+
+        Returns:
+            the new inference id
+
+        """
+        return self._database_adapter.create_id()
+
+    async def insert_inference_with_outbox(
+        self,
+        inference_id: str,
+        new_inference: InferenceCreation,
+        new_result: ResultCreation,
+        publishing_channel: str,
+    ):
+        """inserts a new inference in the database together with its result
+        and the outbox message that sends it to the publishing channel
+
+        Args:
+            inference_id (str) : id of the new inference
+            new_inference (InferenceCreation) : new inference form
+            new_result (ResultCreation) : result form the model output is written to
+            publishing_channel (str) : channel the inference message is sent to
 
-    def update_inference_status(self, inference_id: str, status: str):
+        Returns:
+            None
+
+        """
+        await self._database_adapter.insert_inference_with_outbox(
+            inference_id, new_inference, new_result, publishing_channel, time.time()
+        )
+        self._get_outbox_event().set()
+        self._cache_inference(Inference(id=inference_id, **new_inference.dict()), None)
+
+    async def update_inference_status(self, inference_id: str, status: str):
         """updates the status of an inference
 
         Args:
@@ -207,12 +378,29 @@ class DatabasePort:
             None
 
         """
-        self._database_adapter.update_inference_status(inference_id, status)
+        await self._database_adapter.update_inference_status(inference_id, status)
+        self._update_cached_inference(inference_id, status=status)
+
+    async def update_inference_statuses(self, inference_ids: List[str], status: str):
+        """updates the status of several inferences at once
+
+        Args:
+            inference_ids (List[str]) : inference ids
+            status (str) : new inference status
+
+        Returns:
+            None
+
+        """
+        await self._database_adapter.update_inference_statuses(inference_ids, status)
+        for inference_id in inference_ids:
+            self._update_cached_inference(inference_id, status=status)
 
     # model methods
 
-    def get_model_by_id(self, model_id: str) -> Optional[Model]:
-        """gets the model object by the model id
+    async def get_model_by_id(self, model_id: str) -> Optional[Model]:
+        """gets the model object by the model id, from the model registry if enabled.
+        models missing from the registry are read from the database
 
         Args:
             model_id (str) : model id
@@ -222,10 +410,18 @@ class DatabasePort:
             if no model is found, None is returned.
 
         """
-        model = self._database_adapter.get_model_by_id(model_id)
+        if self._model_registry_ttl > 0:
+            await self._load_model_registry()
+            model = self._model_registry.get(model_id)
+            if model is not None:
+                self._model_registry_hits += 1
+                return model
+            self._model_registry_misses += 1
+
+        model = await self._database_adapter.get_model_by_id(model_id)
         if model == None:
             return None
-        return Model(
+        model = Model(
             **{
                 "id": str(model["_id"]),
                 "name": model["name"],
@@ -233,9 +429,152 @@ class DatabasePort:
                 "publishing_channel": model["publishing_channel"],
             }
         )
+        if self._model_registry_ttl > 0:
+            # e.g. created after the last load, kept until the next one
+            self._model_registry[model.id] = model
+        return model
+
+    async def get_model_list(self) -> List[Model]:
+        """gets all model objects, from the model registry if enabled
+
+        Args:
+            None
+
+        Returns:
+            the list of model objects
+
+        """
+        if self._model_registry_ttl > 0:
+            await self._load_model_registry()
+            self._model_registry_hits += 1
+            return list(self._model_registry.values())
+        return await self._read_model_list()
+
+    async def refresh_models(self):
+        """reloads the model registry from the database right away,
+        if the registry is enabled
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        """
+        if self._model_registry_ttl <= 0:
+            return
+        async with self._get_model_registry_lock():
+            await self._reload_model_registry()
+
+    def invalidate_models(self):
+        """marks the model registry as outdated, so it is reloaded on the next read
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        """
+        self._model_registry_loaded_at = None
+        self._model_registry_invalidations += 1
+
+    async def watch_model_changes(self):
+        """invalidates the model registry every time a model is changed in the
+        database, until the watch fails or is cancelled
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        Raises:
+            exception, if the database can not report its changes
+
+        """
+        async for _ in self._database_adapter.watch_model_changes():
+            self.invalidate_models()
+
+    def get_model_registry_stats(self) -> ModelRegistryStats:
+        """gets the hit and miss counts, the size and the number of
+        refreshes and invalidations of the model registry
+
+        Args:
+            None
+
+        Returns:
+            model registry stats
+
+        """
+        return ModelRegistryStats(
+            hits=self._model_registry_hits,
+            misses=self._model_registry_misses,
+            size=len(self._model_registry),
+            refreshes=self._model_registry_refreshes,
+            invalidations=self._model_registry_invalidations,
+        )
+
+    async def _load_model_registry(self):
+        """loads the model registry if it was never loaded, expired or was invalidated.
+        concurrent reads of an outdated registry wait for a single reload
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        """
+        if self._is_model_registry_valid():
+            return
+        async with self._get_model_registry_lock():
+            if not self._is_model_registry_valid():
+                await self._reload_model_registry()
+
+    async def _reload_model_registry(self):
+        """replaces the model registry with the models in the database
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        """
+        invalidations = self._model_registry_invalidations
+        loaded_at = time.monotonic()
+        model_list = await self._read_model_list()
+        self._model_registry = {model.id: model for model in model_list}
+        self._model_registry_refreshes += 1
+        # invalidated while reading, the models read may already be outdated
+        if invalidations == self._model_registry_invalidations:
+            self._model_registry_loaded_at = loaded_at
+
+    def _is_model_registry_valid(self) -> bool:
+        """checks if the model registry was loaded and did not expire
+
+        Args:
+            None
+
+        Returns:
+            True if the registry can be used. False otherwise
+
+        """
+        loaded_at = self._model_registry_loaded_at
+        return (
+            loaded_at is not None
+            and time.monotonic() - loaded_at < self._model_registry_ttl
+        )
 
-    def get_model_list(self) -> List[Model]:
-        """gets all model objects
+    def _get_model_registry_lock(self) -> asyncio.Lock:
+        # the lock is created lazily so it belongs to the running event loop
+        if self._model_registry_lock is None:
+            self._model_registry_lock = asyncio.Lock()
+        return self._model_registry_lock
+
+    async def _read_model_list(self) -> List[Model]:
+        """reads all model objects from the database
 
         Args:
             None
@@ -244,7 +583,7 @@ class DatabasePort:
             the list of model objects
 
         """
-        model_list = self._database_adapter.get_model_list()
+        model_list = await self._database_adapter.get_model_list()
         return [
             Model(
                 **{
@@ -257,10 +596,98 @@ class DatabasePort:
             for model in model_list
         ]
 
+    # outbox methods
+
+    async def claim_outbox_messages(
+        self, limit: int, lease: float
+    ) -> List[OutboxMessage]:
+        """claims the oldest outbox messages ready to be sent. a claimed message
+        is not claimed again before lease seconds, unless it is rescheduled
+
+        Args:
+            limit (int) : maximum number of messages claimed
+            lease (float) : time in seconds the messages are kept from
+                the other dispatchers
+
+        Returns:
+            the list of claimed outbox messages
+
+        """
+        now = time.time()
+        documents = await self._database_adapter.claim_outbox_messages(
+            limit, now, now + lease
+        )
+        return [
+            OutboxMessage(
+                id=str(document["_id"]),
+                content=document["content"],
+                publishing_channel=document["publishing_channel"],
+                attempts=document["attempts"],
+            )
+            for document in documents
+        ]
+
+    async def delete_outbox_messages(self, message_ids: List[str]):
+        """deletes outbox messages, once they were sent or given up
+
+        Args:
+            message_ids (List[str]) : outbox message ids
+
+        Returns:
+            None
+
+        """
+        await self._database_adapter.delete_outbox_messages(message_ids)
+
+    async def reschedule_outbox_messages(
+        self, reschedules: List[Tuple[OutboxMessage, float]]
+    ):
+        """makes outbox messages that could not be sent available again
+        after a delay, storing their attempt count
+
+        Args:
+            reschedules (List[Tuple[OutboxMessage, float]]) : outbox message
+                and delay in seconds before it is available again, for every message
+
+        Returns:
+            None
+
+        """
+        now = time.time()
+        await self._database_adapter.reschedule_outbox_messages(
+            [
+                (outbox_message.id, outbox_message.attempts, now + delay)
+                for outbox_message, delay in reschedules
+            ]
+        )
+
+    async def wait_for_outbox_messages(self, timeout: float) -> None:
+        """waits until an inference is inserted by this port, or the timeout expires
+
+        Args:
+            timeout (float) : maximum time in seconds waited
+
+        Returns:
+            None
+
+        """
+        outbox_event = self._get_outbox_event()
+        try:
+            await asyncio.wait_for(outbox_event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        outbox_event.clear()
+
+    def _get_outbox_event(self) -> asyncio.Event:
+        # created lazily, like the model registry lock
+        if self._outbox_event is None:
+            self._outbox_event = asyncio.Event()
+        return self._outbox_event
+
     # result methods
 
-    def get_result_by_inference_id(self, inference_id: str) -> Result:
-        result = self._database_adapter.get_result_by_inference_id(inference_id)
+    async def get_result_by_inference_id(self, inference_id: str) -> Result:
+        result = await self._database_adapter.get_result_by_inference_id(inference_id)
         return Result(
             **{
                 "id": str(result["_id"]),
@@ -270,7 +697,142 @@ class DatabasePort:
             }
         )
 
-    def insert_result(self, new_result: ResultCreation):
+    async def get_inference_with_result(
+        self, inference_id: str, user_id: str
+    ) -> Optional[Tuple[Inference, Optional[Result]]]:
+        """gets the inference object by the inference id and user id
+        together with its result object, in a single database query
+
+        Args:
+            inference_id (str) : inference id
+            user_id (str) : user id
+
+        Returns:
+            a tuple with the inference object and its result object.
+            if no inference is found, None is returned,
+            if the inference has no result, the result is None.
+
+        """
+        cached = self._get_cached_inference(inference_id, user_id)
+        if cached is not None and cached[1] is not None:
+            return cached
+        updates = self._start_inference_read(inference_id)
+        try:
+            inference_with_result = await self._read_inference_with_result(
+                inference_id, user_id
+            )
+        finally:
+            updated = self._finish_inference_read(inference_id, updates)
+        if inference_with_result is not None and not updated:
+            self._cache_inference(*inference_with_result)
+        return inference_with_result
+
+    async def _read_inference_with_result(
+        self, inference_id: str, user_id: str
+    ) -> Optional[Tuple[Inference, Optional[Result]]]:
+        """reads the inference object by the inference id and user id
+        together with its result object, in a single database query
+
+        Args:
+            inference_id (str) : inference id
+            user_id (str) : user id
+
+        Returns:
+            a tuple with the inference object and its result object.
+            if no inference is found, None is returned,
+            if the inference has no result, the result is None.
+
+        """
+        inference = await self._database_adapter.get_inference_with_result(
+            inference_id, user_id
+        )
+        if inference == None:
+            return None
+        return self._create_inference_with_result(inference)
+
+    async def get_results_by_inference_ids(
+        self, inference_ids: List[str], user_id: str
+    ) -> Dict[str, Tuple[Inference, Optional[Result]]]:
+        """gets the inference objects of the user by their ids together with
+        their result objects. the cached ones are not read, the others are
+        read at once
+
+        Args:
+            inference_ids (List[str]) : inference ids
+            user_id (str) : user id
+
+        Returns:
+            a dict from the inference id to a tuple with the inference object
+            and its result object, holding only the inferences found.
+            if an inference has no result, the result is None.
+
+        """
+        inferences_with_results: Dict[str, Tuple[Inference, Optional[Result]]] = {}
+        missing_ids = []
+        for inference_id in inference_ids:
+            cached = self._get_cached_inference(inference_id, user_id)
+            if cached is not None and cached[1] is not None:
+                inferences_with_results[inference_id] = cached
+            else:
+                missing_ids.append(inference_id)
+        if not missing_ids:
+            return inferences_with_results
+
+        reads = [
+            (inference_id, self._start_inference_read(inference_id))
+            for inference_id in missing_ids
+        ]
+        try:
+            inferences = await self._database_adapter.get_results_by_inference_ids(
+                missing_ids, user_id
+            )
+        finally:
+            updated_ids = {
+                inference_id
+                for inference_id, updates in reads
+                if self._finish_inference_read(inference_id, updates)
+            }
+        for inference in inferences:
+            inference_with_result = self._create_inference_with_result(inference)
+            inference_id = inference_with_result[0].id
+            inferences_with_results[inference_id] = inference_with_result
+            if inference_id not in updated_ids:
+                self._cache_inference(*inference_with_result)
+        return inferences_with_results
+
+    def _create_inference_with_result(
+        self, inference: dict
+    ) -> Tuple[Inference, Optional[Result]]:
+        # the inference document holds a result list with its result document
+        result = inference["result"][0] if inference["result"] else None
+        return (
+            Inference(
+                **{
+                    "id": str(inference["_id"]),
+                    "age": inference["age"],
+                    "sex": inference["sex"],
+                    "rgh": inference["rgh"],
+                    "covid_status": inference["covid_status"],
+                    "mask_type": inference["mask_type"],
+                    "user_id": inference["user_id"],
+                    "model_id": inference["model_id"],
+                    "status": inference["status"],
+                    "created_in": inference["created_in"],
+                }
+            ),
+            None
+            if result == None
+            else Result(
+                **{
+                    "id": str(result["_id"]),
+                    "inference_id": result["inference_id"],
+                    "output": result["output"],
+                    "diagnosis": result["diagnosis"],
+                }
+            ),
+        )
+
+    async def insert_result(self, new_result: ResultCreation):
         """inserts a new result object in the database
 
         Args:
@@ -280,9 +842,9 @@ class DatabasePort:
             None
 
         """
-        self._database_adapter.insert_result(new_result)
+        await self._database_adapter.insert_result(new_result)
 
-    def update_result(self, result_update: ResultCreation):
+    async def update_result(self, result_update: ResultCreation):
         """updates a result object in the database
 
         Args:
@@ -292,4 +854,183 @@ class DatabasePort:
             None
 
         """
-        self._database_adapter.update_result(result_update)
+        await self._database_adapter.update_result(result_update)
+        self._update_cached_inference(
+            result_update.inference_id, result_update=result_update
+        )
+
+    async def update_results(self, result_updates: List[ResultUpdate]):
+        """updates several result objects in the database at once,
+        in the given order
+
+        Args:
+            result_updates (List[ResultUpdate]) : result update forms
+
+        Returns:
+            None
+
+        """
+        await self._database_adapter.update_results(result_updates)
+        for result_update in result_updates:
+            self._update_cached_inference(
+                result_update.inference_id, result_update=result_update
+            )
+
+    # inference cache methods
+
+    def cache_result_update(self, result_update: ResultUpdate):
+        """applies to the inference cache a result update written by another
+        process, completing the cached inference with the update
+
+        Args:
+            result_update (ResultUpdate) : result update form
+
+        Returns:
+            None
+
+        """
+        self._update_cached_inference(
+            result_update.inference_id,
+            status=Status.completed_status,
+            result_update=result_update,
+        )
+
+    def cache_status_update(self, status_update: InferenceStatusUpdate):
+        """applies to the inference cache a status written by another process,
+        for an inference finished without a result
+
+        Args:
+            status_update (InferenceStatusUpdate) : inference status update form
+
+        Returns:
+            None
+
+        """
+        self._update_cached_inference(
+            status_update.inference_id, status=status_update.status
+        )
+
+    def get_inference_cache_stats(self) -> InferenceCacheStats:
+        """gets the hit and miss counts and the size of the inference cache
+
+        Args:
+            None
+
+        Returns:
+            inference cache stats
+
+        """
+        return InferenceCacheStats(
+            hits=self._inference_cache_hits,
+            misses=self._inference_cache_misses,
+            size=len(self._inference_cache),
+        )
+
+    def _get_cached_inference(
+        self, inference_id: str, user_id: str
+    ) -> Optional[Tuple[Inference, Optional[Result]]]:
+        """gets a cached inference of the user with its result, if it did not expire
+
+        Args:
+            inference_id (str) : inference id
+            user_id (str) : user id
+
+        Returns:
+            a tuple with the inference object and its result object, or None
+            if it is not cached. the result is None if it was not read yet
+
+        """
+        if self._inference_cache_size <= 0:
+            return None
+        cached = self._inference_cache.get(inference_id)
+        if cached is None or cached[2] <= time.monotonic():
+            self._inference_cache_misses += 1
+            return None
+        inference, result, _ = cached
+        if inference.user_id != user_id:
+            # read from the database, which finds no inference of the user
+            self._inference_cache_misses += 1
+            return None
+        self._inference_cache.move_to_end(inference_id)
+        self._inference_cache_hits += 1
+        return inference, result
+
+    def _cache_inference(self, inference: Inference, result: Optional[Result]):
+        """adds an inference and its result to the inference cache,
+        evicting the least recently used ones if it is full
+
+        Args:
+            inference (Inference) : inference object
+            result (Optional[Result]) : its result object, None if not read
+
+        Returns:
+            None
+
+        """
+        if self._inference_cache_size <= 0:
+            return
+        self._inference_cache[inference.id] = (
+            inference,
+            result,
+            time.monotonic() + self._inference_cache_ttl,
+        )
+        self._inference_cache.move_to_end(inference.id)
+        while len(self._inference_cache) > self._inference_cache_size:
+            self._inference_cache.popitem(last=False)
+
+    def _update_cached_inference(
+        self,
+        inference_id: str,
+        status: Optional[str] = None,
+        result_update: Optional[ResultUpdate] = None,
+    ):
+        """applies a write to the cached inference, if it is cached, and
+        keeps the database reads in flight from caching what they read
+
+        Args:
+            inference_id (str) : inference id
+            status (Optional[str]) : new inference status, if it was written
+            result_update (Optional[ResultUpdate]) : result update form,
+                if it was written
+
+        Returns:
+            None
+
+        """
+        if inference_id in self._inference_updates:
+            self._inference_updates[inference_id] += 1
+        cached = self._inference_cache.get(inference_id)
+        if cached is None:
+            return
+        inference, result, expires_at = cached
+        if status is not None:
+            inference = inference.copy(update={"status": status})
+        if result_update is not None:
+            if result is None:
+                # the result id is unknown, it is read again with the inference
+                del self._inference_cache[inference_id]
+                return
+            result = result.copy(
+                update={
+                    "output": result_update.output,
+                    "diagnosis": result_update.diagnosis,
+                }
+            )
+        self._inference_cache[inference_id] = (inference, result, expires_at)
+
+    def _start_inference_read(self, inference_id: str) -> int:
+        # the updates counted while the read is in flight tell whether
+        # what it read may be stale
+        self._inference_reads[inference_id] = (
+            self._inference_reads.get(inference_id, 0) + 1
+        )
+        return self._inference_updates.setdefault(inference_id, 0)
+
+    def _finish_inference_read(self, inference_id: str, updates: int) -> bool:
+        # returns whether the inference was updated while it was read
+        updated = self._inference_updates[inference_id] != updates
+        self._inference_reads[inference_id] -= 1
+        if self._inference_reads[inference_id] == 0:
+            del self._inference_reads[inference_id]
+            del self._inference_updates[inference_id]
+        return updated
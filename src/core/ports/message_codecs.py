@@ -0,0 +1,123 @@
+from abc import ABC, abstractmethod
+import json
+from typing import Dict, Type
+
+try:
+    import orjson
+except ImportError:
+    # optional, only needed by OrjsonCodec
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    # optional, only needed by MsgpackCodec
+    msgpack = None
+
+
+class MessageCodec(ABC):
+    """Base class of the codecs serializing the message service contents
+
+    Attributes:
+        content_type (str) : content type sent along with the encoded messages
+
+    """
+
+    content_type: str = ""
+
+    @abstractmethod
+    def encode(self, content: dict) -> bytes:
+        """encodes the message content
+
+        Args:
+            content (dict) : message content
+
+        Returns:
+            encoded message
+
+        """
+
+    @abstractmethod
+    def decode(self, message: bytes) -> dict:
+        """decodes the message content
+
+        Args:
+            message (bytes) : encoded message
+
+        Returns:
+            message content
+
+        Raises:
+            exception, if the message is not valid
+
+        """
+
+
+class JSONCodec(MessageCodec):
+    """Codec using the json module of the standard library"""
+
+    content_type = "application/json"
+
+    def encode(self, content: dict) -> bytes:
+        return json.dumps(content).encode("utf-8")
+
+    def decode(self, message: bytes) -> dict:
+        return json.loads(message)
+
+
+class OrjsonCodec(MessageCodec):
+    """JSON codec using orjson, compatible with the JSON codec"""
+
+    content_type = "application/json"
+
+    def __init__(self):
+        if orjson is None:
+            raise ImportError("the orjson codec needs the orjson package")
+
+    def encode(self, content: dict) -> bytes:
+        return orjson.dumps(content)
+
+    def decode(self, message: bytes) -> dict:
+        return orjson.loads(message)
+
+
+class MsgpackCodec(MessageCodec):
+    """Binary codec using msgpack"""
+
+    content_type = "application/msgpack"
+
+    def __init__(self):
+        if msgpack is None:
+            raise ImportError("the msgpack codec needs the msgpack package")
+
+    def encode(self, content: dict) -> bytes:
+        return msgpack.packb(content)
+
+    def decode(self, message: bytes) -> dict:
+        return msgpack.unpackb(message)
+
+
+CODECS: Dict[str, Type[MessageCodec]] = {
+    "json": JSONCodec,
+    "orjson": OrjsonCodec,
+    "msgpack": MsgpackCodec,
+}
+
+
+def create_codec(name: str) -> MessageCodec:
+    """creates the codec registered with the name
+
+    Args:
+        name (str) : codec name, one of json, orjson or msgpack
+
+    Returns:
+        codec instance
+
+    Raises:
+        value error, if there is no codec with the name
+        import error, if the package used by the codec is not installed
+
+    """
+    if name not in CODECS:
+        raise ValueError(f"unknown message codec {name}")
+    return CODECS[name]()
@@ -1,22 +1,60 @@
-import json
+from typing import Awaitable, Callable, Dict, Optional
 
-from core.model.message_service import RequestLetter
-from core.model.result import ResultUpdate
+from core.model.message_service import DurableSubscription, RequestLetter
+from core.model.result import InferenceStatusUpdate, InferenceUpdate, ResultUpdate
+from core.ports.message_codecs import CODECS, JSONCodec, MessageCodec
 
 
 class MessageServicePort:
-    """Port for the message service
+    """Port for the message service.
+    messages are sent with the content type of the codec, and received
+    messages are decoded by their content type, json if they have none
 
     Args:
         message_service_adapter (Adapter Class) : message service adapter instance
+        codec (Optional[MessageCodec]) : codec encoding the sent messages,
+            json if None
 
     """
 
-    def __init__(self, message_service_adapter):
+    def __init__(self, message_service_adapter, codec: Optional[MessageCodec] = None):
         self._message_service_adapter = message_service_adapter
+        self._codec = codec if codec is not None else JSONCodec()
+        self._decoders: Dict[str, MessageCodec] = {}
+        for codec_class in CODECS.values():
+            try:
+                decoder = codec_class()
+            except ImportError:
+                continue
+            self._decoders.setdefault(decoder.content_type, decoder)
+        self._decoders[self._codec.content_type] = self._codec
+
+    async def connect(self):
+        """opens the long-lived connections used to send messages
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        """
+        await self._message_service_adapter.connect()
+
+    async def close(self):
+        """closes the connections used to send messages
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        """
+        await self._message_service_adapter.close()
 
     async def send_message(self, letter: RequestLetter):
-        """sends a serialized json to the message service
+        """sends the letter content, encoded by the codec, to the message service
 
         Args:
             letter (RequestLetter) : object containing message and publishing channel
@@ -26,32 +64,210 @@ class MessageServicePort:
 
         """
         await self._message_service_adapter.send_message(
-            json.dumps(letter.content.dict()), letter.publishing_channel
+            self._codec.encode(letter.content.dict()),
+            letter.publishing_channel,
+            self._codec.content_type,
+        )
+
+    async def send_result_update(self, channel: str, result_update: ResultUpdate):
+        """sends a result update, encoded by the codec, to the message service
+
+        Args:
+            channel (str) : publishing channel
+            result_update (ResultUpdate) : result update form
+
+        Returns:
+            None
+
+        """
+        await self._message_service_adapter.send_message(
+            self._codec.encode(result_update.dict()),
+            channel,
+            self._codec.content_type,
+        )
+
+    async def send_status_update(
+        self, channel: str, status_update: InferenceStatusUpdate
+    ):
+        """sends a status update, encoded by the codec, to the message service
+
+        Args:
+            channel (str) : publishing channel
+            status_update (InferenceStatusUpdate) : inference status update form
+
+        Returns:
+            None
+
+        """
+        await self._message_service_adapter.send_message(
+            self._codec.encode(status_update.dict()),
+            channel,
+            self._codec.content_type,
         )
 
-    async def subscribe(self, receiving_channel: str):
-        """subscribes to the channel to receive messages from it
+    async def subscribe(
+        self,
+        receiving_channel: str,
+        callback: Callable[[ResultUpdate], Awaitable[None]],
+        queue_group: str = "",
+    ):
+        """subscribes to the channel to receive messages from it.
+        every message is deserialized and pushed to the callback as soon as it arrives
 
         Args:
             receiving_channel (str) : receiving channel
+            callback (Callable[[ResultUpdate], Awaitable[None]]) : coroutine function
+                called with the result update form of every message
+            queue_group (str) : group sharing the messages of the channel,
+                each message is received by only one of its subscribers.
+                if empty, every message is received
 
         Returns:
             None
 
         """
-        await self._message_service_adapter.subscribe(receiving_channel)
 
-    async def wait_for_message(self, receiving_channel: str) -> ResultUpdate:
-        """waits until a message arrives in the given channel from the message service
+        async def message_callback(message: bytes, content_type: Optional[str]):
+            await callback(self._decode_result_update(message, content_type))
+
+        await self._message_service_adapter.subscribe(
+            receiving_channel, message_callback, queue_group
+        )
+
+    async def subscribe_durable(
+        self,
+        receiving_channel: str,
+        callback: Callable[[ResultUpdate], Awaitable[None]],
+        durable_subscription: DurableSubscription,
+    ):
+        """subscribes to the channel with at least once delivery. the messages are
+        kept while nobody is subscribed, and a message is only acknowledged after
+        the callback returns. messages failing durable_subscription.max_deliveries
+        times, including the ones that can not be deserialized, are sent to
+        the dead letter channel
 
         Args:
-            receiving_channel (str) : channel to listen
+            receiving_channel (str) : receiving channel
+            callback (Callable[[ResultUpdate], Awaitable[None]]) : coroutine function
+                called with the result update form of every message
+            durable_subscription (DurableSubscription) : durable subscription form
 
         Returns:
-            result update form
+            None
 
         """
-        message_dict = json.loads(
-            await self._message_service_adapter.wait_for_message(receiving_channel)
+
+        async def message_callback(message: bytes, content_type: Optional[str]):
+            await callback(self._decode_result_update(message, content_type))
+
+        await self._message_service_adapter.subscribe_durable(
+            receiving_channel,
+            message_callback,
+            durable_subscription.stream_name,
+            durable_subscription.durable_name,
+            durable_subscription.max_deliveries,
+            durable_subscription.ack_wait,
+            durable_subscription.max_ack_pending,
+            durable_subscription.dead_letter_channel,
+            durable_subscription.stream_max_age,
+        )
+
+    async def subscribe_notifications(
+        self, receiving_channel: str, callback: Callable[[], Awaitable[None]]
+    ):
+        """subscribes to a channel whose messages only notify that something
+        happened, their content is ignored
+
+        Args:
+            receiving_channel (str) : receiving channel
+            callback (Callable[[], Awaitable[None]]) : coroutine function
+                called for every message
+
+        Returns:
+            None
+
+        """
+
+        async def message_callback(message: bytes, content_type: Optional[str]):
+            await callback()
+
+        # not in a queue group, every subscriber has to be notified
+        await self._message_service_adapter.subscribe(
+            receiving_channel, message_callback
+        )
+
+    async def subscribe_inference_updates(
+        self,
+        receiving_channel: str,
+        callback: Callable[[InferenceUpdate], Awaitable[None]],
+    ):
+        """subscribes to a channel carrying both result updates and status
+        updates of the inferences finished without a result
+
+        Args:
+            receiving_channel (str) : receiving channel
+            callback (Callable[[InferenceUpdate], Awaitable[None]]) : coroutine
+                function called with the result or status update of every message
+
+        Returns:
+            None
+
+        """
+
+        async def message_callback(message: bytes, content_type: Optional[str]):
+            await callback(self._decode_inference_update(message, content_type))
+
+        # not in a queue group, every subscriber has to be notified
+        await self._message_service_adapter.subscribe(
+            receiving_channel, message_callback
         )
-        return ResultUpdate(**message_dict)
+
+    def _decode_inference_update(
+        self, message: bytes, content_type: Optional[str]
+    ) -> InferenceUpdate:
+        """decodes a received message into a result update, or into a status
+        update if it has no output
+
+        Args:
+            message (bytes) : encoded message
+            content_type (Optional[str]) : content type of the message,
+                json if None
+
+        Returns:
+            result update or inference status update form
+
+        Raises:
+            value error, if there is no codec for the content type
+            exception, if the message is not a valid update
+
+        """
+        content = self._decode_message(message, content_type)
+        if "output" in content:
+            return ResultUpdate(**content)
+        return InferenceStatusUpdate(**content)
+
+    def _decode_result_update(
+        self, message: bytes, content_type: Optional[str]
+    ) -> ResultUpdate:
+        """decodes a received message with the codec of its content type
+
+        Args:
+            message (bytes) : encoded message
+            content_type (Optional[str]) : content type of the message,
+                json if None
+
+        Returns:
+            result update form
+
+        Raises:
+            value error, if there is no codec for the content type
+            exception, if the message is not a valid result update
+
+        """
+        return ResultUpdate(**self._decode_message(message, content_type))
+
+    def _decode_message(self, message: bytes, content_type: Optional[str]) -> dict:
+        decoder = self._decoders.get(content_type or JSONCodec.content_type)
+        if decoder is None:
+            raise ValueError(f"unsupported content type {content_type}")
+        return decoder.decode(message)
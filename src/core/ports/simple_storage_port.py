@@ -1,5 +1,7 @@
-from io import BytesIO
+from asyncio import Semaphore, gather, get_running_loop
+from concurrent.futures import ThreadPoolExecutor
 import os
+from typing import Dict
 
 from core.model.inference import UploadAudio
 
@@ -9,16 +11,31 @@ class SimpleStoragePort:
 
     Args:
         simple_storage_adapter (Adapter Class) : simple storage adapter instance
+        upload_workers (int) : maximum number of files of a request
+            uploaded at the same time
+        upload_pool_size (int) : maximum number of files uploaded at the same
+            time by the whole process, the size of the shared upload pool
 
     """
 
-    def __init__(self, simple_storage_adapter):
+    def __init__(
+        self,
+        simple_storage_adapter,
+        upload_workers: int = 4,
+        upload_pool_size: int = 32,
+    ):
         self._simples_storage_adapter = simple_storage_adapter
+        self._upload_workers = upload_workers
+        # shared by all the requests, it bounds the threads and the minIO
+        # connections of the process, while the threads are only started when needed
+        self._upload_executor = ThreadPoolExecutor(
+            max_workers=upload_pool_size, thread_name_prefix="simple_storage_upload"
+        )
 
     def store_inference_file(
         self, inference_id: str, file_type: str, audio_file: UploadAudio
     ) -> None:
-        """stores the upload_audio in minIO server
+        """streams the upload_audio file to minIO server
 
         Args:
             inference_id (dict) : inference id
@@ -31,9 +48,57 @@ class SimpleStoragePort:
         """
         _, file_extension = os.path.splitext(audio_file.filename)
         self._simples_storage_adapter.store_inference_file(
-            inference_id, file_type, file_extension, BytesIO(audio_file.content)
+            inference_id, file_type, file_extension, audio_file.file
+        )
+
+    async def store_inference_files(
+        self, inference_id: str, audio_files: Dict[str, UploadAudio]
+    ) -> None:
+        """streams all the inference files to minIO server concurrently.
+        if any of the uploads fails, the inference directory is removed,
+        so no partial set of files is left behind
+
+        Args:
+            inference_id (dict) : inference id
+            audio_files (Dict[str, UploadAudio]) : audio file objects by file type
+
+        Returns:
+            None
+
+        Raises:
+            the first upload exception, if any of the uploads failed
+
+        """
+        loop = get_running_loop()
+        # a request takes at most upload_workers threads of the shared pool,
+        # so one request does not delay the uploads of the others
+        upload_slots = Semaphore(self._upload_workers)
+
+        async def upload(file_type: str, audio_file: UploadAudio) -> None:
+            async with upload_slots:
+                await loop.run_in_executor(
+                    self._upload_executor,
+                    self.store_inference_file,
+                    inference_id,
+                    file_type,
+                    audio_file,
+                )
+
+        uploads = await gather(
+            *[
+                upload(file_type, audio_file)
+                for file_type, audio_file in audio_files.items()
+            ],
+            return_exceptions=True,
         )
 
+        errors = [upload for upload in uploads if isinstance(upload, Exception)]
+        if errors:
+            await loop.run_in_executor(
+                None, self.remove_inference_directory, inference_id
+            )
+            raise errors[0]
+
     def remove_inference_directory(self, inference_id: str) -> None:
         """removes the inference directory and files from minIO server
 
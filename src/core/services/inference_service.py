@@ -1,40 +1,36 @@
-from typing import List, Union
+from asyncio import get_running_loop
+from typing import Optional, Union
 from fastapi import status
 import datetime
 from core.model.constants import Status
-from core.model.message_service import RequestLetter
-from core.model.token import Token
-from core.ports.authentication_port import AuthenticationPort
-
+from core.model.model import Model
 from core.ports.database_port import DatabasePort
 from core.model.inference import (
     Inference,
     InferenceCreation,
     InferenceCreationForm,
     InferenceFiles,
+    InferencePage,
 )
-from core.model.exception import DefaultExceptions, LogicException
-from core.ports.message_service_port import MessageServicePort
+from core.model.exception import LogicException
+from core.model.result import ResultCreation
 from core.ports.simple_storage_port import SimpleStoragePort
-
-import core.services.model_service as model_service
+from core.services.request_context import RequestContext
 
 
-def get_by_id(
-    authentication_port: AuthenticationPort,
+async def get_by_id(
+    context: RequestContext,
     database_port: DatabasePort,
     inference_id: str,
     user_id: str,
-    token: Token,
 ) -> Union[Inference, LogicException]:
     """gets inference by id from database
 
     Args:
-        authentication_port (AuthenticationPort) : authentication port
+        context (RequestContext) : context of the request
         database_port (DatabasePort) : database port
         inference_id (str) : inference id
         user_id (str) : user id
-        token (Token): authentication token
 
     Returns:
         inference object
@@ -47,8 +43,8 @@ def get_by_id(
 
     """
     try:
-        _authenticate_user(authentication_port, database_port, user_id, token)
-        inference = database_port.get_inference_by_id(inference_id, user_id)
+        await context.authenticate_user(user_id)
+        inference = await database_port.get_inference_by_id(inference_id, user_id)
         if inference is None:
             raise LogicException("inference not found", status.HTTP_404_NOT_FOUND)
 
@@ -62,22 +58,25 @@ def get_by_id(
     return inference
 
 
-def get_list(
-    authentication_port: AuthenticationPort,
+async def get_list(
+    context: RequestContext,
     database_port: DatabasePort,
     user_id: str,
-    token: Token,
-) -> Union[List[Inference], LogicException]:
-    """gets inference list from database
+    limit: int,
+    after: Optional[str] = None,
+) -> Union[InferencePage, LogicException]:
+    """gets a page of the inference list from database
 
     Args:
-        authentication_port (AuthenticationPort) : authentication port
+        context (RequestContext) : context of the request
         database_port (DatabasePort) : database port
         user_id (str) : user id
-        token (Token): authentication token
+        limit (int) : maximum number of inferences in the page
+        after (Optional[str]) : cursor returned with the previous page,
+            if None the first page is returned
 
     Returns:
-        list of inference objects
+        inference page object
 
     Raises:
         unauthorized exception, if not authenticated
@@ -86,8 +85,8 @@ def get_list(
 
     """
     try:
-        _authenticate_user(authentication_port, database_port, user_id, token)
-        inference_list = database_port.get_inference_list(user_id)
+        await context.authenticate_user(user_id)
+        inference_page = await database_port.get_inference_page(user_id, limit, after)
 
     except LogicException:
         raise
@@ -96,31 +95,29 @@ def get_list(
             "cound not retrieve inference list", status.HTTP_500_INTERNAL_SERVER_ERROR
         )
 
-    return inference_list
+    return inference_page
 
 
 async def create_new_inference(
     simple_storage_port: SimpleStoragePort,
-    message_service_port: MessageServicePort,
-    authentication_port: AuthenticationPort,
+    context: RequestContext,
     database_port: DatabasePort,
     user_id: str,
     inference_form: InferenceCreationForm,
     inference_files: InferenceFiles,
-    token: Token,
 ) -> str:
-    """creates new inference, inserts it in database,
-     stores inference files in simple storage and sends inference message to message service
+    """creates new inference, stores inference files in simple storage
+     and inserts it in database with its result and the outbox message sending
+     it to the model. the message is sent by the outbox dispatcher,
+     so it is not waited for
 
     Args:
         simple_storage_port (SimpleStoragePort) : simple storage port
-        message_service_port (MessageServicePort): message service port
-        authentication_port (AuthenticationPort) : authentication port
+        context (RequestContext) : context of the request
         database_port (DatabasePort) : database port
         user_id (str) : user id
         inference_form (InferenceCreationForm) : new inference form
         inference_files (InferenceFiles) : inference request files
-        token (Token): authentication token
 
     Returns:
         new inference id
@@ -132,8 +129,8 @@ async def create_new_inference(
 
     """
     try:
-        _authenticate_user(authentication_port, database_port, user_id, token)
-        _validate_new_inference(database_port, inference_form)
+        await context.authenticate_user(user_id)
+        model = await _validate_new_inference(context, inference_form)
 
         new_inference = InferenceCreation(
             age=inference_form.age,
@@ -146,19 +143,25 @@ async def create_new_inference(
             status=Status.processing_status,
             created_in=str(datetime.datetime.now()),
         )
-        new_id = database_port.insert_inference(new_inference)
-
-        model = model_service.get_by_id(
-            authentication_port, database_port, inference_form.model_id, token
-        )
-
-        _store_files(simple_storage_port, inference_files, new_id)
-
-        await message_service_port.send_message(
-            RequestLetter(
-                content=new_inference, publishing_channel=model.receiving_channel
+        new_id = database_port.create_inference_id()
+
+        # the files are stored first, so the message is never sent without them
+        await _store_files(simple_storage_port, inference_files, new_id)
+
+        try:
+            await database_port.insert_inference_with_outbox(
+                new_id,
+                new_inference,
+                ResultCreation(
+                    inference_id=new_id, output=-1, diagnosis="not available"
+                ),
+                model.receiving_channel,
             )
-        )
+        except:
+            await get_running_loop().run_in_executor(
+                None, simple_storage_port.remove_inference_directory, new_id
+            )
+            raise
     except LogicException:
         raise
     except:
@@ -169,52 +172,18 @@ async def create_new_inference(
     return new_id
 
 
-def _authenticate_user(
-    authentication_port: AuthenticationPort,
-    database_port: DatabasePort,
-    user_id: str,
-    token: Token,
-) -> None:
-    """authenticates requesting user
-
-    Args:
-        authentication_port (AuthenticationPort) : authentication port
-        database_port (DatabasePort) : database port
-        user_id (str) : user id
-        token (Token): authentication token
-
-    Returns:
-        None
-
-    Raises:
-        unauthorized exception, if not authenticated
-        forbidden exception, if token does not match user in request
-
-    """
-    try:
-        decoded_token_content = authentication_port.decode_token(token)
-        user = database_port.get_user_by_username(decoded_token_content.username)
-        if user.id != user_id:
-            raise DefaultExceptions.forbidden_exception
-
-    except LogicException:
-        raise
-    except:
-        raise DefaultExceptions.credentials_exception
-
-
-def _validate_new_inference(
-    database_port: DatabasePort,
+async def _validate_new_inference(
+    context: RequestContext,
     inference_form: InferenceCreationForm,
-) -> None:
+) -> Model:
     """validates inference form data
 
     Args:
-        database_port (DatabasePort) : database port
+        context (RequestContext) : context of the request
         inference_form (InferenceCreationForm) : inference creation form
 
     Returns:
-        None
+        the model of the inference
 
     Raises:
         model not found exception, if inference form model is not in database
@@ -222,7 +191,7 @@ def _validate_new_inference(
 
     """
     try:
-        model = database_port.get_model_by_id(inference_form.model_id)
+        model = await context.get_model(inference_form.model_id)
         if model is None:
             raise LogicException("model not found", status.HTTP_404_NOT_FOUND)
 
@@ -233,11 +202,13 @@ def _validate_new_inference(
             "model id is not valid", status.HTTP_422_UNPROCESSABLE_ENTITY
         )
 
+    return model
+
 
-def _store_files(
+async def _store_files(
     simple_storage_port: SimpleStoragePort, files: InferenceFiles, inference_id: str
 ) -> None:
-    """stores inference files in simple storage
+    """stores inference files in simple storage, all of them or none
 
     Args:
         simple_storage_port (SimpleStoragePort) : simple storage port
@@ -253,10 +224,10 @@ def _store_files(
     """
     try:
         file_types = InferenceFiles.__fields__.keys()
-        for file_type in file_types:
-            simple_storage_port.store_inference_file(
-                inference_id, file_type, getattr(files, file_type)
-            )
+        await simple_storage_port.store_inference_files(
+            inference_id,
+            {file_type: getattr(files, file_type) for file_type in file_types},
+        )
 
     except:
         raise LogicException(
@@ -1,4 +1,16 @@
+from asyncio import (
+    Future,
+    Semaphore,
+    TimerHandle,
+    ensure_future,
+    get_running_loop,
+    wait,
+)
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
 from core.model.exception import LogicException
+from core.model.message_service import DurableSubscription
 from core.model.result import ResultUpdate
 from core.ports.database_port import DatabasePort
 from core.ports.message_service_port import MessageServicePort
@@ -10,12 +22,21 @@ from core.model.constants import Status
 async def subscribe_to_channel(
     message_service_port: MessageServicePort,
     central_channel: str,
+    message_handler: Callable[[ResultUpdate], Awaitable[None]],
+    queue_group: str = "",
+    durable_subscription: Optional[DurableSubscription] = None,
 ) -> None:
     """subscribes the listener service to a channel in the message service
 
     Args:
         message_service_port (MessageServicePort) : message service port
         central_channel (str) : channel to subscribe in
+        message_handler (Callable[[ResultUpdate], Awaitable[None]]) : coroutine
+            function called with every received result update
+        queue_group (str) : group of listeners sharing the channel messages
+        durable_subscription (Optional[DurableSubscription]) : if given, the
+            channel is subscribed with at least once delivery, and its durable
+            name takes the place of the queue group
 
     Returns:
         None
@@ -25,48 +46,236 @@ async def subscribe_to_channel(
 
     """
     try:
-        await message_service_port.subscribe(central_channel)
+        if durable_subscription is not None:
+            await message_service_port.subscribe_durable(
+                central_channel, message_handler, durable_subscription
+            )
+        else:
+            await message_service_port.subscribe(
+                central_channel, message_handler, queue_group
+            )
     except:
         raise LogicException("cound not subscribe to channel")
 
 
+class ResultUpdateBatcher:
+    """Groups result updates so they are written to the database together
+
+    A batch is written once batch_size updates are waiting, or batch_window
+    seconds after its first update arrived, whichever comes first.
+
+    Args:
+        database_port (DatabasePort) : database port
+        batch_size (int) : maximum number of updates written at once
+        batch_window (float) : maximum time in seconds an update waits for its batch
+
+    """
+
+    def __init__(
+        self,
+        database_port: DatabasePort,
+        batch_size: int,
+        batch_window: float,
+    ):
+        self._database_port = database_port
+        self._batch_size = batch_size
+        self._batch_window = batch_window
+        self._pending: List[Tuple[ResultUpdate, Future]] = []
+        self._flush_timer: Optional[TimerHandle] = None
+
+    async def update(self, result_update: ResultUpdate) -> None:
+        """adds the result update to the current batch and waits until it is written
+
+        Args:
+            result_update (ResultUpdate) : result update form
+
+        Returns:
+            None
+
+        Raises:
+            exception, if there was an error while updating the database
+
+        """
+        loop = get_running_loop()
+        written = loop.create_future()
+        self._pending.append((result_update, written))
+        if len(self._pending) >= self._batch_size:
+            self._flush()
+        elif self._flush_timer is None:
+            self._flush_timer = loop.call_later(self._batch_window, self._flush)
+        await written
+
+    def _flush(self) -> None:
+        """starts writing the pending updates as one batch
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        """
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            ensure_future(self._write(batch))
+
+    async def _write(self, batch: List[Tuple[ResultUpdate, Future]]) -> None:
+        """writes a batch of updates and notifies each of them.
+        if the batch fails, its updates are written one by one,
+        so an invalid update does not fail the others
+
+        Args:
+            batch (List[Tuple[ResultUpdate, Future]]) : updates and their futures
+
+        Returns:
+            None
+
+        """
+        try:
+            await _update_database_in_batch(
+                self._database_port,
+                [result_update for result_update, _ in batch],
+            )
+        except LogicException:
+            for result_update, written in batch:
+                try:
+                    await _update_database(self._database_port, result_update)
+                except LogicException as e:
+                    if not written.done():
+                        written.set_exception(e)
+                    continue
+                if not written.done():
+                    written.set_result(None)
+            return
+
+        for _, written in batch:
+            if not written.done():
+                written.set_result(None)
+
+
 async def listen_for_messages_and_update(
     simple_storage_port: SimpleStoragePort,
     message_service_port: MessageServicePort,
     database_port: DatabasePort,
     central_channel: str,
+    max_concurrent_updates: int = 1,
+    batch_size: int = 1,
+    batch_window: float = 0,
+    queue_group: str = "",
+    durable_subscription: Optional[DurableSubscription] = None,
+    result_update_channel: Optional[str] = None,
 ) -> None:
-    """waits for a message to arrive at central channel in message service
-        and updates the database with the received data
+    """subscribes to the central channel in message service and updates
+        the database with the received data as soon as each message arrives.
+
+        up to max_concurrent_updates messages are processed at the same time.
+        when all of them are busy, no new message is taken from the channel.
+        updates of the same inference are always applied in arrival order.
+        the database writes of the messages being processed are grouped
+        in batches of up to batch_size updates, each waiting at most batch_window.
+
+        listeners subscribed with the same queue group share the messages,
+        so several of them can run at once. the order of the updates of an
+        inference is then only kept inside each listener, which is harmless
+        because a single result is sent per inference and the updates are
+        idempotent: a repeated update does not change nor rewrite anything.
+
+        with a durable subscription, a message is only acknowledged once its
+        update is written to the database, so the message service delivers
+        again the updates that failed or were not written before a restart.
+
+        once written, every update is sent to the result update channel,
+        so the API servers push it to the clients following the inference
 
     Args:
         simple_storage_port (SimpleStoragePort) : simple storage port
         message_service_port (MessageServicePort) : message service port
         database_port (DatabasePort) : database port
-        central_channel (str) : subscribed channel
+        central_channel (str) : channel to subscribe in
+        max_concurrent_updates (int) : maximum number of messages processed at once
+        batch_size (int) : maximum number of updates written to the database at once
+        batch_window (float) : maximum time in seconds an update waits for its batch
+        queue_group (str) : group of listeners sharing the channel messages,
+            if empty every message of the channel is received
+        durable_subscription (Optional[DurableSubscription]) : durable
+            subscription form, if None messages are not acknowledged
+        result_update_channel (Optional[str]) : channel the written updates
+            are sent to, if None they are not sent
 
     Returns:
         None
 
     Raises:
-        exception, if there was an error waiting for messages
-        exception, if there was an error while updating the database
+        exception, if there was an error subscribing
 
     """
-    try:
-        result_update = await message_service_port.wait_for_message(central_channel)
+    workers = Semaphore(max_concurrent_updates)
+    executor = ThreadPoolExecutor(
+        max_workers=max_concurrent_updates, thread_name_prefix="inference_files_removal"
+    )
+    batcher = ResultUpdateBatcher(database_port, batch_size, batch_window)
+    # latest update still being processed for each inference id
+    last_updates: Dict[str, Future] = {}
 
-        _update_database(database_port, result_update)
+    async def process_in_order(
+        previous_update: Optional[Future], result_update: ResultUpdate
+    ) -> None:
+        if previous_update is not None:
+            await wait([previous_update])
+        try:
+            await batcher.update(result_update)
+        except LogicException as e:
+            print(e.message, flush=True)
+            if durable_subscription is not None:
+                # not acknowledged, the message is delivered again
+                raise
+            return
+        if result_update_channel is not None:
+            await _send_result_update(
+                message_service_port, result_update_channel, result_update
+            )
+        try:
+            await get_running_loop().run_in_executor(
+                executor,
+                _remove_inference_files,
+                simple_storage_port,
+                result_update.inference_id,
+            )
+        except LogicException as e:
+            print(e.message, flush=True)
 
-        simple_storage_port.remove_inference_directory(result_update.inference_id)
+    def release_worker(inference_id: str, update: Future) -> None:
+        workers.release()
+        if last_updates.get(inference_id) is update:
+            del last_updates[inference_id]
 
-    except LogicException:
-        raise
-    except:
-        raise LogicException("an error occurred while waiting for the messages")
+    async def update_on_message(result_update: ResultUpdate) -> None:
+        await workers.acquire()
+        inference_id = result_update.inference_id
+        update = ensure_future(
+            process_in_order(last_updates.get(inference_id), result_update)
+        )
+        last_updates[inference_id] = update
+        update.add_done_callback(partial(release_worker, inference_id))
+        if durable_subscription is not None:
+            # the message is acknowledged when this returns
+            await update
+
+    await subscribe_to_channel(
+        message_service_port,
+        central_channel,
+        update_on_message,
+        queue_group,
+        durable_subscription,
+    )
 
 
-def _update_database(database_port: DatabasePort, result_update: ResultUpdate) -> None:
+async def _update_database(
+    database_port: DatabasePort, result_update: ResultUpdate
+) -> None:
     """updates the database with the result update
 
     Args:
@@ -81,9 +290,83 @@ def _update_database(database_port: DatabasePort, result_update: ResultUpdate) -
 
     """
     try:
-        database_port.update_result(result_update)
-        database_port.update_inference_status(
+        await database_port.update_result(result_update)
+        await database_port.update_inference_status(
             result_update.inference_id, Status.completed_status
         )
     except:
         raise LogicException("cound not update inference result")
+
+
+async def _update_database_in_batch(
+    database_port: DatabasePort, result_updates: List[ResultUpdate]
+) -> None:
+    """updates the database with a batch of result updates,
+        using one write for the results and one for the inferences
+
+    Args:
+        database_port (DatabasePort) : database port
+        result_updates (List[ResultUpdate]) : result update forms
+
+    Returns:
+        None
+
+    Raises:
+        exception, if there was an error while updating the database
+
+    """
+    try:
+        await database_port.update_results(result_updates)
+        await database_port.update_inference_statuses(
+            [result_update.inference_id for result_update in result_updates],
+            Status.completed_status,
+        )
+    except:
+        raise LogicException("cound not update inference results")
+
+
+async def _send_result_update(
+    message_service_port: MessageServicePort,
+    result_update_channel: str,
+    result_update: ResultUpdate,
+) -> None:
+    """sends a written result update to the result update channel.
+    a failure is only reported, clients can still read the result
+
+    Args:
+        message_service_port (MessageServicePort) : message service port
+        result_update_channel (str) : result update channel
+        result_update (ResultUpdate) : result update form
+
+    Returns:
+        None
+
+    """
+    try:
+        await message_service_port.send_result_update(
+            result_update_channel, result_update
+        )
+    except Exception as e:
+        print("could not send result update", result_update.inference_id, e, flush=True)
+
+
+def _remove_inference_files(
+    simple_storage_port: SimpleStoragePort, inference_id: str
+) -> None:
+    """removes the inference files from simple storage
+
+    Args:
+        simple_storage_port (SimpleStoragePort) : simple storage port
+        inference_id (str) : inference id
+
+    Returns:
+        None
+
+    Raises:
+        exception, if there was an error while removing the inference files
+
+    """
+    try:
+        simple_storage_port.remove_inference_directory(inference_id)
+    except:
+        raise LogicException("cound not remove inference files")
@@ -8,7 +8,7 @@ from core.model.exception import DefaultExceptions, LogicException
 from core.model.token import Token
 
 
-def get_by_id(
+async def get_by_id(
     authentication_port: AuthenticationPort,
     database_port: DatabasePort,
     model_id: str,
@@ -35,7 +35,7 @@ def get_by_id(
         if not authentication_port.validate_token(token):
             raise DefaultExceptions.credentials_exception
 
-        model = database_port.get_model_by_id(model_id)
+        model = await database_port.get_model_by_id(model_id)
 
         if model is None:
             raise LogicException("model not found", status.HTTP_404_NOT_FOUND)
@@ -50,7 +50,7 @@ def get_by_id(
     return model
 
 
-def get_list(
+async def get_list(
     authentication_port: AuthenticationPort,
     database_port: DatabasePort,
     token: Token,
@@ -74,7 +74,7 @@ def get_list(
         if not authentication_port.validate_token(token):
             raise DefaultExceptions.credentials_exception
 
-        model_list = database_port.get_model_list()
+        model_list = await database_port.get_model_list()
 
     except LogicException:
         raise
@@ -0,0 +1,181 @@
+from asyncio import gather
+from typing import List, Optional, Tuple
+from core.model.constants import Status
+from core.model.exception import LogicException
+from core.model.message_service import OutboxDispatch, OutboxMessage
+from core.model.result import InferenceStatusUpdate
+from core.ports.database_port import DatabasePort
+from core.ports.message_service_port import MessageServicePort
+
+
+async def dispatch_outbox_messages(
+    message_service_port: MessageServicePort,
+    database_port: DatabasePort,
+    outbox_dispatch: OutboxDispatch,
+    result_update_channel: Optional[str] = None,
+) -> int:
+    """claims a batch of outbox messages and sends them to the message service.
+        sent messages are deleted from the outbox, the others are sent again
+        after a delay doubling with every attempt. a message that failed
+        max_attempts times is given up and its inference is set to error,
+        which is sent to the result update channel so its clients stop waiting.
+
+        a message may be sent more than once, if the dispatcher stops after
+        sending it or takes longer than the lease to delete it
+
+    Args:
+        message_service_port (MessageServicePort) : message service port
+        database_port (DatabasePort) : database port
+        outbox_dispatch (OutboxDispatch) : outbox dispatch form
+        result_update_channel (Optional[str]) : channel the status of the given
+            up inferences is sent to, if None it is not sent
+
+    Returns:
+        the number of claimed messages
+
+    Raises:
+        exception, if there was an error reading or writing the outbox
+
+    """
+    try:
+        outbox_messages = await database_port.claim_outbox_messages(
+            outbox_dispatch.batch_size, outbox_dispatch.lease
+        )
+        sendings = await gather(
+            *[
+                message_service_port.send_message(outbox_message)
+                for outbox_message in outbox_messages
+            ],
+            return_exceptions=True,
+        )
+
+        sent_ids: List[str] = []
+        given_up_ids: List[str] = []
+        reschedules: List[Tuple[OutboxMessage, float]] = []
+        for outbox_message, sending in zip(outbox_messages, sendings):
+            if not isinstance(sending, Exception):
+                sent_ids.append(outbox_message.id)
+                continue
+            attempts = outbox_message.attempts + 1
+            if attempts >= outbox_dispatch.max_attempts:
+                print(
+                    "giving up sending inference",
+                    outbox_message.id,
+                    sending,
+                    flush=True,
+                )
+                given_up_ids.append(outbox_message.id)
+                continue
+            reschedules.append(
+                (
+                    outbox_message.copy(update={"attempts": attempts}),
+                    _get_retry_delay(outbox_dispatch, attempts),
+                )
+            )
+
+        await database_port.delete_outbox_messages(sent_ids)
+        await database_port.reschedule_outbox_messages(reschedules)
+        if given_up_ids:
+            await database_port.update_inference_statuses(
+                given_up_ids, Status.error_status
+            )
+            await database_port.delete_outbox_messages(given_up_ids)
+    except:
+        raise LogicException("cound not dispatch outbox messages")
+
+    if given_up_ids and result_update_channel is not None:
+        await _send_status_updates(
+            message_service_port,
+            result_update_channel,
+            given_up_ids,
+            Status.error_status,
+        )
+    return len(outbox_messages)
+
+
+async def run_outbox_dispatcher(
+    message_service_port: MessageServicePort,
+    database_port: DatabasePort,
+    outbox_dispatch: OutboxDispatch,
+    result_update_channel: Optional[str] = None,
+) -> None:
+    """keeps sending the outbox messages. full batches are followed right away
+        by the next one, otherwise the dispatcher waits for an inference to be
+        inserted by the same database port, or poll_interval seconds for the
+        ones inserted by other processes and the rescheduled messages
+
+    Args:
+        message_service_port (MessageServicePort) : message service port
+        database_port (DatabasePort) : database port
+        outbox_dispatch (OutboxDispatch) : outbox dispatch form
+        result_update_channel (Optional[str]) : channel the status of the given
+            up inferences is sent to, if None it is not sent
+
+    Returns:
+        None
+
+    """
+    while True:
+        try:
+            claimed = await dispatch_outbox_messages(
+                message_service_port,
+                database_port,
+                outbox_dispatch,
+                result_update_channel,
+            )
+        except LogicException as e:
+            print(e.message, flush=True)
+            claimed = 0
+        if claimed < outbox_dispatch.batch_size:
+            await database_port.wait_for_outbox_messages(outbox_dispatch.poll_interval)
+
+
+async def _send_status_updates(
+    message_service_port: MessageServicePort,
+    result_update_channel: str,
+    inference_ids: List[str],
+    status: str,
+) -> None:
+    """sends the written status of the inferences to the result update channel.
+    a failure is only reported, clients can still read the status
+
+    Args:
+        message_service_port (MessageServicePort) : message service port
+        result_update_channel (str) : result update channel
+        inference_ids (List[str]) : inference ids
+        status (str) : inference status
+
+    Returns:
+        None
+
+    """
+    sendings = await gather(
+        *[
+            message_service_port.send_status_update(
+                result_update_channel,
+                InferenceStatusUpdate(inference_id=inference_id, status=status),
+            )
+            for inference_id in inference_ids
+        ],
+        return_exceptions=True,
+    )
+    for inference_id, sending in zip(inference_ids, sendings):
+        if isinstance(sending, Exception):
+            print("could not send status update", inference_id, sending, flush=True)
+
+
+def _get_retry_delay(outbox_dispatch: OutboxDispatch, attempts: int) -> float:
+    """gets the delay before the next attempt of sending a message
+
+    Args:
+        outbox_dispatch (OutboxDispatch) : outbox dispatch form
+        attempts (int) : number of failed attempts
+
+    Returns:
+        the delay in seconds
+
+    """
+    return min(
+        outbox_dispatch.retry_base_delay * 2 ** (attempts - 1),
+        outbox_dispatch.retry_max_delay,
+    )
@@ -0,0 +1,90 @@
+from typing import Dict, Optional, Set
+
+from core.model.exception import DefaultExceptions, LogicException
+from core.model.model import Model
+from core.model.token import Token, TokenData
+from core.ports.authentication_port import AuthenticationPort
+from core.ports.database_port import DatabasePort
+
+
+class RequestContext:
+    """Data resolved while serving one request, shared by the services it calls
+    so the token is decoded and each model is read only once per request
+
+    Args:
+        authentication_port (AuthenticationPort) : authentication port
+        database_port (DatabasePort) : database port
+        token (Token) : authentication token of the request
+
+    """
+
+    def __init__(
+        self,
+        authentication_port: AuthenticationPort,
+        database_port: DatabasePort,
+        token: Token,
+    ):
+        self._authentication_port = authentication_port
+        self._database_port = database_port
+        self.token = token
+        self._token_data: Optional[TokenData] = None
+        self._authenticated_user_ids: Set[str] = set()
+        self._models: Dict[str, Optional[Model]] = {}
+
+    async def authenticate_user(self, user_id: str) -> None:
+        """authenticates the requesting user as the user of the request path.
+        the user id is taken from the token claims, so the database is only read
+        for tokens without the claim, or to check revoked users if enabled
+
+        Args:
+            user_id (str) : user id
+
+        Returns:
+            None
+
+        Raises:
+            unauthorized exception, if not authenticated or the user was disabled
+            forbidden exception, if token does not match user in request
+
+        """
+        if user_id in self._authenticated_user_ids:
+            return
+        try:
+            if self._token_data is None:
+                self._token_data = self._authentication_port.decode_token(self.token)
+            token_user_id = self._token_data.user_id
+            if token_user_id is None:
+                user = await self._database_port.get_user_by_username(
+                    self._token_data.username
+                )
+                token_user_id = user.id
+            if token_user_id != user_id:
+                raise DefaultExceptions.forbidden_exception
+            if self._authentication_port.check_revoked_users:
+                if not await self._database_port.is_user_enabled(user_id):
+                    raise DefaultExceptions.credentials_exception
+
+        except LogicException:
+            raise
+        except:
+            raise DefaultExceptions.credentials_exception
+
+        self._authenticated_user_ids.add(user_id)
+
+    async def get_model(self, model_id: str) -> Optional[Model]:
+        """gets the model object by the model id, read once per request
+
+        Args:
+            model_id (str) : model id
+
+        Returns:
+            model object.
+            if no model is found, None is returned.
+
+        Raises:
+            exception, if the model id is not valid
+
+        """
+        if model_id not in self._models:
+            self._models[model_id] = await self._database_port.get_model_by_id(model_id)
+        return self._models[model_id]
@@ -0,0 +1,195 @@
+from asyncio import Future, Queue, TimeoutError, get_running_loop, wait_for
+from typing import Dict, List, Optional, Set
+
+from core.model.result import InferenceUpdate
+
+
+class ResultSubscription:
+    """Subscription of a client to the result updates of some inferences
+
+    Args:
+        result_hub (ResultHub) : hub the subscription belongs to
+        inference_ids (List[str]) : ids of the inferences followed
+
+    """
+
+    def __init__(self, result_hub: "ResultHub", inference_ids: List[str]):
+        self._result_hub = result_hub
+        self.inference_ids = inference_ids
+        self._updates: "Queue[InferenceUpdate]" = Queue()
+
+    def put(self, inference_update: InferenceUpdate) -> None:
+        """delivers a result or status update to the subscription
+
+        Args:
+            inference_update (InferenceUpdate) : result or status update form
+
+        Returns:
+            None
+
+        """
+        self._updates.put_nowait(inference_update)
+
+    async def get(self, timeout: float) -> Optional[InferenceUpdate]:
+        """waits for the next result or status update delivered to the subscription
+
+        Args:
+            timeout (float) : maximum time in seconds waited
+
+        Returns:
+            the result or status update, or None if the timeout expired
+
+        """
+        try:
+            return await wait_for(self._updates.get(), timeout)
+        except TimeoutError:
+            return None
+
+    def close(self) -> None:
+        """stops delivering result updates to the subscription
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        """
+        self._result_hub.unsubscribe(self)
+
+
+class ResultHub:
+    """In-process pub/sub hub fanning out the result updates received
+    from the message service to the subscriptions following their inference,
+    and resolving the futures of the requests waiting for them
+    """
+
+    def __init__(self):
+        # inference id -> subscriptions following it
+        self._subscriptions: Dict[str, Set[ResultSubscription]] = {}
+        # inference id -> futures of the requests waiting for its next update
+        self._waiters: Dict[str, Set[Future]] = {}
+
+    def subscribe(self, inference_ids: List[str]) -> ResultSubscription:
+        """subscribes to the result updates of the inferences
+
+        Args:
+            inference_ids (List[str]) : inference ids
+
+        Returns:
+            the subscription, to be closed once it is not used anymore
+
+        """
+        subscription = ResultSubscription(self, inference_ids)
+        for inference_id in inference_ids:
+            self._subscriptions.setdefault(inference_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: ResultSubscription) -> None:
+        """removes the subscription from the hub
+
+        Args:
+            subscription (ResultSubscription) : subscription
+
+        Returns:
+            None
+
+        """
+        for inference_id in subscription.inference_ids:
+            subscriptions = self._subscriptions.get(inference_id)
+            if subscriptions is None:
+                continue
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del self._subscriptions[inference_id]
+
+    def add_waiter(self, inference_id: str) -> Future:
+        """registers a future resolved with the next result update of the inference
+
+        Args:
+            inference_id (str) : inference id
+
+        Returns:
+            the future, to be removed with remove_waiter once it is not used anymore
+
+        """
+        waiter = get_running_loop().create_future()
+        self._waiters.setdefault(inference_id, set()).add(waiter)
+        return waiter
+
+    def remove_waiter(self, inference_id: str, waiter: Future) -> None:
+        """removes a future from the waiter table, cancelling it if it is pending
+
+        Args:
+            inference_id (str) : inference id
+            waiter (Future) : future returned by add_waiter
+
+        Returns:
+            None
+
+        """
+        waiter.cancel()
+        waiters = self._waiters.get(inference_id)
+        if waiters is None:
+            return
+        waiters.discard(waiter)
+        if not waiters:
+            del self._waiters[inference_id]
+
+    async def wait(self, waiter: Future, timeout: float) -> Optional[InferenceUpdate]:
+        """waits for a future returned by add_waiter to be resolved
+
+        Args:
+            waiter (Future) : future returned by add_waiter
+            timeout (float) : maximum time in seconds waited
+
+        Returns:
+            the result or status update, or None if the timeout expired
+
+        """
+        try:
+            return await wait_for(waiter, timeout)
+        except TimeoutError:
+            return None
+
+    async def publish(self, inference_update: InferenceUpdate) -> None:
+        """delivers the result or status update to every subscription following
+        its inference and resolves the futures waiting for it
+
+        Args:
+            inference_update (InferenceUpdate) : result or status update form
+
+        Returns:
+            None
+
+        """
+        inference_id = inference_update.inference_id
+        for subscription in self._subscriptions.get(inference_id, ()):
+            subscription.put(inference_update)
+        for waiter in self._waiters.pop(inference_id, ()):
+            if not waiter.done():
+                waiter.set_result(inference_update)
+
+    def get_followed_inference_count(self) -> int:
+        """gets the number of inferences followed by at least one subscription
+
+        Args:
+            None
+
+        Returns:
+            number of followed inferences
+
+        """
+        return len(self._subscriptions)
+
+    def get_waiter_count(self) -> int:
+        """gets the number of futures waiting for a result update
+
+        Args:
+            None
+
+        Returns:
+            number of waiting futures
+
+        """
+        return sum(len(waiters) for waiters in self._waiters.values())
@@ -1,30 +1,36 @@
 from fastapi import status
-from typing import Tuple
+from typing import List, Optional, Tuple
 
-from core.model.exception import DefaultExceptions, LogicException
+from core.model.constants import Status
+from core.model.exception import LogicException
 from core.model.inference import Inference
-from core.model.result import Result, ResultCreation, ResultUpdate
-from core.model.token import Token
-from core.ports.authentication_port import AuthenticationPort
+from core.model.result import Result, ResultUpdate
 from core.ports.database_port import DatabasePort
-import core.services.inference_service as inference_service
+from core.services.request_context import RequestContext
+from core.services.result_hub import ResultHub, ResultSubscription
 
 
-def get_inference_result(
-    authentication_port: AuthenticationPort,
+async def get_inference_result(
+    context: RequestContext,
     database_port: DatabasePort,
     inference_id: str,
     user_id: str,
-    token: Token,
+    result_hub: Optional[ResultHub] = None,
+    wait: float = 0,
 ) -> Tuple[Inference, Result]:
-    """gets the result object of an inference from database
+    """gets the result object of an inference from database.
+    if wait is given and the inference is still processing, the request
+    waits up to wait seconds for its result update before reading it again,
+    parked on a future of the result hub waiter table
 
     Args:
-        authentication_port (AuthenticationPort) : authentication port
+        context (RequestContext) : context of the request
         database_port (DatabasePort) : database port
         inference_id (str) : inference id
         user_id (str) : user id
-        token (Token): authentication token
+        result_hub (Optional[ResultHub]) : hub of the result updates,
+            needed to wait
+        wait (float) : maximum time in seconds waited for the result update
 
     Returns:
         A tuple where the first element is the inference whose id is given as
@@ -38,66 +44,178 @@ def get_inference_result(
         not found exception, if result was not found in database
 
     """
+    await context.authenticate_user(user_id)
+    if wait <= 0 or result_hub is None:
+        return await _read_inference_result(database_port, inference_id, user_id)
+
+    # registered before the read, so an update arriving in between is not missed
+    waiter = result_hub.add_waiter(inference_id)
     try:
-        inference = inference_service.get_by_id(
-            authentication_port, database_port, inference_id, user_id, token
+        inference, result = await _read_inference_result(
+            database_port, inference_id, user_id
         )
+        if inference.status != Status.processing_status:
+            return inference, result
+        # on timeout the current state is returned
+        await result_hub.wait(waiter, wait)
+        return await _read_inference_result(database_port, inference_id, user_id)
+    finally:
+        result_hub.remove_waiter(inference_id, waiter)
+
+
+async def _read_inference_result(
+    database_port: DatabasePort, inference_id: str, user_id: str
+) -> Tuple[Inference, Result]:
+    """reads an inference and its result from database
+
+    Args:
+        database_port (DatabasePort) : database port
+        inference_id (str) : inference id
+        user_id (str) : user id
+
+    Returns:
+        A tuple with the inference and its result object
 
-        result = database_port.get_result_by_inference_id(inference_id)
+    Raises:
+        not found exception, if inference was not found in database
+        unprocessable entity exception, if inference id is not valid
+        not found exception, if result was not found in database
+
+    """
+    try:
+        # the inference and its result come from one query, this endpoint is polled
+        inference_with_result = await database_port.get_inference_with_result(
+            inference_id, user_id
+        )
+        if inference_with_result is None:
+            raise LogicException("inference not found", status.HTTP_404_NOT_FOUND)
+
+        inference, result = inference_with_result
         if result is None:
             raise LogicException("result not found", status.HTTP_404_NOT_FOUND)
 
     except LogicException:
         raise
+    except:
+        raise LogicException(
+            "inference id is not valid", status.HTTP_422_UNPROCESSABLE_ENTITY
+        )
 
     return inference, result
 
 
-def create_inference_result(
-    authentication_port: AuthenticationPort,
+async def batch_get_inference_results(
+    context: RequestContext,
     database_port: DatabasePort,
     user_id: str,
-    inference_id: str,
-    token: Token,
-) -> None:
-    """creates the result object of an inference and inserts it in database
+    inference_ids: List[str],
+) -> List[Tuple[Inference, Result]]:
+    """gets several inferences of the user with their result objects,
+    authenticating once and reading them all at once
 
     Args:
-        authentication_port (AuthenticationPort) : authentication port
+        context (RequestContext) : context of the request
         database_port (DatabasePort) : database port
         user_id (str) : user id
-        inference_id (str) : inference id
-        token (Token): authentication token
+        inference_ids (List[str]) : inference ids
 
     Returns:
-        None
+        A list of tuples with an inference and its result object,
+        in the order of the inference ids, without repeated inferences
 
     Raises:
         unauthorized exception, if not authenticated
         forbidden exception, if token does not match user in request
-        internal server exception, if there was an error creating result object
+        not found exception, if an inference was not found in database
+        unprocessable entity exception, if an inference id is not valid
+        not found exception, if a result was not found in database
 
     """
+    await context.authenticate_user(user_id)
     try:
-        inference_service._authenticate_user(
-            authentication_port, database_port, user_id, token
+        inference_ids = list(dict.fromkeys(inference_ids))
+        inferences_with_results = await database_port.get_results_by_inference_ids(
+            inference_ids, user_id
         )
 
-        new_result = ResultCreation(
-            inference_id=inference_id, output=-1, diagnosis="not available"
+        inference_results = []
+        for inference_id in inference_ids:
+            inference_with_result = inferences_with_results.get(inference_id)
+            if inference_with_result is None:
+                raise LogicException("inference not found", status.HTTP_404_NOT_FOUND)
+            inference, result = inference_with_result
+            if result is None:
+                raise LogicException("result not found", status.HTTP_404_NOT_FOUND)
+            inference_results.append((inference, result))
+
+    except LogicException:
+        raise
+    except:
+        raise LogicException(
+            "inference id is not valid", status.HTTP_422_UNPROCESSABLE_ENTITY
         )
-        database_port.insert_result(new_result)
+
+    return inference_results
+
+
+async def subscribe_to_inference_results(
+    context: RequestContext,
+    database_port: DatabasePort,
+    result_hub: ResultHub,
+    user_id: str,
+    inference_ids: List[str],
+) -> Tuple[ResultSubscription, List[Tuple[Inference, Optional[Result]]]]:
+    """subscribes to the result updates of inferences of the user, and gets
+    the inferences that are not processing anymore with their results,
+    None for the ones finished without a result.
+    the subscription is made before reading the inferences, so no update
+    arriving in between is missed
+
+    Args:
+        context (RequestContext) : context of the request
+        database_port (DatabasePort) : database port
+        result_hub (ResultHub) : hub of the result updates
+        user_id (str) : user id
+        inference_ids (List[str]) : inference ids
+
+    Returns:
+        A tuple where the first element is the subscription, to be closed by
+        the caller, and the second the finished inferences with their results
+
+    Raises:
+        unauthorized exception, if not authenticated
+        forbidden exception, if token does not match user in request
+        not found exception, if an inference was not found in database
+        unprocessable entity exception, if an inference id is not valid
+
+    """
+    await context.authenticate_user(user_id)
+    subscription = result_hub.subscribe(inference_ids)
+    try:
+        finished = []
+        for inference_id in inference_ids:
+            inference_with_result = await database_port.get_inference_with_result(
+                inference_id, user_id
+            )
+            if inference_with_result is None:
+                raise LogicException("inference not found", status.HTTP_404_NOT_FOUND)
+            inference, result = inference_with_result
+            if inference.status != Status.processing_status:
+                finished.append((inference, result))
 
     except LogicException:
+        subscription.close()
         raise
     except:
+        subscription.close()
         raise LogicException(
-            "cound not create new inference result",
-            status.HTTP_500_INTERNAL_SERVER_ERROR,
+            "inference id is not valid", status.HTTP_422_UNPROCESSABLE_ENTITY
         )
 
+    return subscription, finished
+
 
-def update_inference_result(
+async def update_inference_result(
     database_port: DatabasePort, result_update: ResultUpdate
 ) -> None:
     """updates the result object in database
@@ -114,7 +232,7 @@ def update_inference_result(
 
     """
     try:
-        database_port.update_result(result_update)
+        await database_port.update_result(result_update)
     except:
         raise LogicException(
             "cound not create new inference result",
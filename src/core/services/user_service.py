@@ -9,7 +9,7 @@ from core.model.exception import DefaultExceptions, LogicException
 from core.model.token import Token, TokenData
 
 
-def get_by_id(
+async def get_by_id(
     authentication_port: AuthenticationPort,
     database_port: DatabasePort,
     user_id: str,
@@ -36,7 +36,7 @@ def get_by_id(
         if not authentication_port.validate_token(token):
             raise DefaultExceptions.credentials_exception
 
-        user = database_port.get_user_by_id(user_id)
+        user = await database_port.get_user_by_id(user_id)
 
         if user is None:
             raise LogicException("user not found", status.HTTP_404_NOT_FOUND)
@@ -51,7 +51,7 @@ def get_by_id(
     return user
 
 
-def authenticate_and_generate_token(
+async def authenticate_and_generate_token(
     authentication_port: AuthenticationPort,
     database_port: DatabasePort,
     username: str,
@@ -72,14 +72,14 @@ def authenticate_and_generate_token(
         invalid username or password exception, if so
     """
     try:
-        user: User = _authenticate_user(
+        user: User = await _authenticate_user(
             authentication_port, database_port, username, password
         )
         if user is None:
             raise
 
         token = authentication_port.generate_token(
-            data=TokenData(username=user.username)
+            data=TokenData(username=user.username, user_id=user.id)
         )
     except:
         raise DefaultExceptions.user_form_exception
@@ -87,7 +87,7 @@ def authenticate_and_generate_token(
     return token
 
 
-def create_new_user(
+async def create_new_user(
     authentication_port: AuthenticationPort,
     database_port: DatabasePort,
     user_form: UserCreationForm,
@@ -114,15 +114,17 @@ def create_new_user(
         if not authentication_port.validate_token(token):
             raise DefaultExceptions.credentials_exception
 
-        _validate_new_user(database_port, user_form)
+        await _validate_new_user(database_port, user_form)
 
         new_user = UserCreation(
             username=user_form.username,
             email=user_form.email,
             password=user_form.password,
         )
-        new_user.password = authentication_port.get_password_hash(new_user.password)
-        database_port.insert_user(new_user)
+        new_user.password = await authentication_port.get_password_hash(
+            new_user.password
+        )
+        await database_port.insert_user(new_user)
 
     except LogicException:
         raise
@@ -132,7 +134,7 @@ def create_new_user(
         )
 
 
-def _validate_new_user(
+async def _validate_new_user(
     database_port: DatabasePort,
     user_form: UserCreationForm,
 ):
@@ -156,13 +158,13 @@ def _validate_new_user(
             "password and password confirmation don't match",
             status.HTTP_400_BAD_REQUEST,
         )
-    existent_user = database_port.get_user_by_username(user_form.username)
+    existent_user = await database_port.get_user_by_username(user_form.username)
     if existent_user is not None:
         raise LogicException(
             "username is already registered",
             status.HTTP_400_BAD_REQUEST,
         )
-    existent_user = database_port.get_user_by_email(user_form.email)
+    existent_user = await database_port.get_user_by_email(user_form.email)
     if existent_user is not None:
         raise LogicException(
             "email is already registered",
@@ -175,7 +177,7 @@ def _validate_new_user(
         )
 
 
-def _authenticate_user(
+async def _authenticate_user(
     authentication_port: AuthenticationPort,
     database_port: DatabasePort,
     username: str,
@@ -196,8 +198,10 @@ def _authenticate_user(
         exception, if user was not on database or passwords don't match
     """
 
-    user_with_password = database_port.get_user_by_username_with_password(username)
-    if user_with_password is None or not authentication_port.verify_password(
+    user_with_password = await database_port.get_user_by_username_with_password(
+        username
+    )
+    if user_with_password is None or not await authentication_port.verify_password(
         plain_password, user_with_password.password
     ):
         raise
@@ -0,0 +1,24 @@
+import logging
+
+from adapters.listener.message_listener import run_listener
+from bootstrap import configure_ports
+from settings import Settings
+
+
+def run_listener_process():
+    """Runs a message listener process with its own ports.
+    several listener processes can run next to the API server
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    """
+    logging.basicConfig(level=Settings.message_listener_settings.log_level.upper())
+    run_listener(configure_ports())
+
+
+if __name__ == "__main__":
+    run_listener_process()
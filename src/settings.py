@@ -1,6 +1,24 @@
+from typing import Optional
 from pydantic import BaseSettings
 
 
+class ApiSettings(BaseSettings):
+    """Settings holding the environment variables for the API server
+
+    Attributes:
+        host (str) : address the server binds to
+        port (int) : port the server listens on
+        workers (int) : number of server processes, each with its own ports
+        log_level (str) : log level of the server
+
+    """
+
+    host: str = "0.0.0.0"
+    port: int = 8000
+    workers: int = 1
+    log_level: str = "info"
+
+
 class DatabaseSettings(BaseSettings):
     """Settings holding the environment variables for the MongoAdapter
 
@@ -11,6 +29,19 @@ class DatabaseSettings(BaseSettings):
         inference_collection_name (str) : name of the collection referring to inferences
         model_collection_name (str) : name of the collection referring to models
         result_collection_name (str) : : name of the collection referring to results
+        outbox_collection_name (str) : name of the collection holding the inference
+            messages waiting to be sent
+        ensure_indexes (bool) : whether the required indexes are created at startup
+        model_registry_ttl (float) : maximum time in seconds the models are kept
+            in memory before being read again, 0 disables the model registry
+        watch_model_changes (bool) : whether the model registry is invalidated by
+            a change stream on the models collection, needs a replica set
+        inference_cache_size (int) : maximum number of inferences kept in memory
+            with their results, 0 disables the inference cache
+        inference_cache_ttl (float) : maximum time in seconds an inference is kept
+            in memory. it bounds how long a status written by another process
+            without a result update, or with result_update_channel unset,
+            is not seen
 
     """
 
@@ -20,6 +51,12 @@ class DatabaseSettings(BaseSettings):
     inference_collection_name: str
     model_collection_name: str
     result_collection_name: str
+    outbox_collection_name: str = "outbox"
+    ensure_indexes: bool = True
+    model_registry_ttl: float = 300
+    watch_model_changes: bool = False
+    inference_cache_size: int = 10000
+    inference_cache_ttl: float = 30
 
 
 class AuthenticationSettings(BaseSettings):
@@ -31,6 +68,10 @@ class AuthenticationSettings(BaseSettings):
         algorithm (str) : algorithm used to generate token
         context_scheme (str) : encryption context scheme
         deprecated (str) : encryption context parameter
+        token_cache_size (int) : maximum number of decoded tokens kept, 0 disables it
+        token_cache_ttl (float) : maximum time in seconds a decoded token is kept
+        check_revoked_users (bool) : whether disabled users are refused on every request
+        password_workers (int) : number of processes hashing and verifying passwords
 
     """
 
@@ -39,6 +80,10 @@ class AuthenticationSettings(BaseSettings):
     algorithm: str
     context_scheme: str
     deprecated: str
+    token_cache_size: int = 1024
+    token_cache_ttl: float = 300
+    check_revoked_users: bool = False
+    password_workers: int = 2
 
 
 class MessageServiceSettings(BaseSettings):
@@ -46,23 +91,80 @@ class MessageServiceSettings(BaseSettings):
 
     Attributes:
         nats_conn_url (str) : connection url to NATS server container
+        publisher_pool_size (int) : number of long-lived connections used to publish
+        model_update_channel (Optional[str]) : channel notifying that models were
+            changed, so the model registry is invalidated
+        codec (str) : codec encoding the sent messages, json, orjson or msgpack
+        result_update_channel (Optional[str]) : channel the listener sends the
+            written result updates to, so the API servers push them to clients
+        dispatch_outbox (bool) : whether the API server sends the inference
+            messages written to the outbox
+        outbox_batch_size (int) : maximum number of outbox messages sent at once
+        outbox_poll_interval (float) : maximum time in seconds between outbox reads
+        outbox_lease (float) : time in seconds an outbox message being sent is
+            kept from the other dispatchers
+        outbox_retry_base_delay (float) : delay in seconds before sending again
+            a message that failed once, doubled with every attempt
+        outbox_retry_max_delay (float) : maximum delay in seconds before sending
+            again a message that failed
+        outbox_max_attempts (int) : number of failed attempts after which
+            a message is given up and its inference set to error
 
     """
 
     nats_conn_url: str
+    publisher_pool_size: int = 1
+    model_update_channel: Optional[str] = None
+    codec: str = "json"
+    result_update_channel: Optional[str] = "result_updates"
+    dispatch_outbox: bool = True
+    outbox_batch_size: int = 100
+    outbox_poll_interval: float = 1
+    outbox_lease: float = 30
+    outbox_retry_base_delay: float = 0.5
+    outbox_retry_max_delay: float = 60
+    outbox_max_attempts: int = 10
 
 
 class MessageListenerSettings(BaseSettings):
     """Settings holding the environment variables for the message listener process
 
     Attributes:
-        loop_interval (float) : time interval between loop iterations
         central_channel (str) : message service channel used to receive update messages
+        subscribe_retry_interval (float) : time interval between subscription attempts
+        max_concurrent_updates (int) : maximum number of update messages processed at once
+        update_batch_size (int) : maximum number of updates written to the database at once
+        update_batch_window (float) : maximum time in seconds an update waits for its batch
+        log_level (str) : log level of the listener process
+        queue_group (str) : group the listener replicas join to share the central
+            channel messages, if empty each replica receives every message
+        durable_delivery (bool) : whether the central channel is consumed with at
+            least once delivery, through a jetstream durable consumer named after
+            the queue group
+        stream_name (str) : jetstream stream storing the central channel messages
+        max_deliveries (int) : maximum number of deliveries of a message
+        ack_wait (float) : time in seconds before an unacknowledged message
+            is delivered again
+        dead_letter_channel (str) : channel receiving the messages that could not
+            be processed after max_deliveries deliveries
+        stream_max_age (float) : maximum time in seconds an unacknowledged message
+            is kept in the stream, applied when the stream is created
 
     """
 
-    loop_interval: float
     central_channel: str
+    subscribe_retry_interval: float = 5
+    max_concurrent_updates: int = 32
+    update_batch_size: int = 32
+    update_batch_window: float = 0.01
+    log_level: str = "info"
+    queue_group: str = "result_listeners"
+    durable_delivery: bool = False
+    stream_name: str = "results"
+    max_deliveries: int = 5
+    ack_wait: float = 30
+    dead_letter_channel: str = "results_dead_letter"
+    stream_max_age: float = 86400
 
 
 class SimpleStorageSettings(BaseSettings):
@@ -73,6 +175,10 @@ class SimpleStorageSettings(BaseSettings):
         bucket_name (str) : name of the bucket used by the app
         minio_access_key (str) : minio access credentials
         minio_secret_key (str) : minio credentials
+        upload_workers (int) : maximum number of files of a request uploaded to minIO
+            at the same time
+        upload_pool_size (int) : maximum number of files uploaded to minIO at the
+            same time by the process
 
     """
 
@@ -80,12 +186,15 @@ class SimpleStorageSettings(BaseSettings):
     bucket_name: str
     minio_access_key: str
     minio_secret_key: str
+    upload_workers: int = 4
+    upload_pool_size: int = 32
 
 
 class Settings:
     """Settings gathering the environment variables for all adapters
 
     Attributes:
+        api_settings (ApiSettings) : api settings object
         database_settings (DatabaseSettings) : database settings object
         authentication_settings (AuthenticationSettings) : authentication settings object
         message_service_settings (MessageServiceSettings) : message_service settings object
@@ -94,6 +203,8 @@ class Settings:
 
     """
 
+    api_settings = ApiSettings(_env_file="api.env", _env_file_encoding="utf-8")
+
     database_settings = DatabaseSettings(
         _env_file="database.env", _env_file_encoding="utf-8"
     )
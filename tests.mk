@@ -9,4 +9,29 @@ make:
 	python3 -m py.test tests/unit_tests/services
 
 	@echo running integration tests for endpoints
-	python3 -m py.test tests/integration_tests
\ No newline at end of file
+	python3 -m py.test tests/integration_tests
+
+benchmark:
+	@echo running benchmark for inference creation
+	PYTHONPATH=src python3 -m tests.benchmarks.bench_create_inference
+
+	@echo running benchmark for message publishing
+	PYTHONPATH=src python3 -m tests.benchmarks.bench_publish
+
+	@echo running benchmark for result ingestion
+	PYTHONPATH=src python3 -m tests.benchmarks.bench_listener
+
+	@echo running benchmark for database indexes, needs BENCHMARK_MONGO_CONN_URL
+	PYTHONPATH=src python3 -m tests.benchmarks.bench_indexes
+
+	@echo running benchmark for token validation
+	PYTHONPATH=src python3 -m tests.benchmarks.bench_token_validation
+
+	@echo running benchmark for password workers
+	PYTHONPATH=src python3 -m tests.benchmarks.bench_password_pool
+
+	@echo running benchmark for message codecs
+	PYTHONPATH=src python3 -m tests.benchmarks.bench_codecs
+
+	@echo running benchmark for result long polling
+	PYTHONPATH=src python3 -m tests.benchmarks.bench_long_poll
@@ -0,0 +1,61 @@
+"""Encode and decode throughput of the message codecs
+
+Encodes the content of a new inference, as sent to the model workers, and
+decodes a result update, as received by the message listener, MESSAGES times
+with every codec whose package is installed. Also reports the encoded size.
+
+Usage:
+    PYTHONPATH=src python3 -m tests.benchmarks.bench_codecs
+"""
+import time
+
+from core.ports.message_codecs import CODECS, MessageCodec
+
+MESSAGES = 50000
+
+INFERENCE = {
+    "age": 30,
+    "sex": "M",
+    "rgh": "fake_rgh",
+    "covid_status": "Sim",
+    "mask_type": "None",
+    "model_id": "629f992d45cda830033cf4cd",
+    "status": "processing",
+    "user_id": "507f191e810c19729de860ea",
+    "created_in": "2022-07-18 17:07:16.954632",
+    "id": "629f815d6abaa3c5e6cf7c16",
+}
+
+RESULT_UPDATE = {
+    "inference_id": "629f815d6abaa3c5e6cf7c16",
+    "output": 0.9871,
+    "diagnosis": "positive",
+}
+
+
+def _throughput(function, argument) -> float:
+    start = time.perf_counter()
+    for _ in range(MESSAGES):
+        function(argument)
+    return MESSAGES / (time.perf_counter() - start)
+
+
+def _run(name: str, codec: MessageCodec):
+    encoded_inference = codec.encode(INFERENCE)
+    encoded_result = codec.encode(RESULT_UPDATE)
+    print(
+        f"{name:<8} encode {_throughput(codec.encode, INFERENCE):9.0f} msg/s  "
+        f"decode {_throughput(codec.decode, encoded_result):9.0f} msg/s  "
+        f"{len(encoded_inference):4d} / {len(encoded_result):3d} bytes",
+        flush=True,
+    )
+
+
+if __name__ == "__main__":
+    for name, codec_class in CODECS.items():
+        try:
+            codec = codec_class()
+        except ImportError:
+            print(f"{name:<8} skipped, package not installed", flush=True)
+            continue
+        _run(name, codec)
@@ -0,0 +1,139 @@
+"""Latency of POST /v1/users/{user_id}/inferences against a minIO stand-in
+
+The stand-in sleeps on every put_object call to simulate the round trip to
+the minIO server. The serial run (one upload worker) reproduces the previous
+behaviour, where the four files were stored one after the other. The
+sequential runs send one request after the other, the concurrent runs send
+CONCURRENT_REQUESTS requests at once to the service, on one event loop.
+
+Usage:
+    PYTHONPATH=src python3 -m tests.benchmarks.bench_create_inference
+"""
+import asyncio
+from io import BytesIO
+import statistics
+import time
+
+from fastapi.testclient import TestClient
+
+from adapters.routers.app import create_app
+from core.model.inference import InferenceCreationForm, InferenceFiles, UploadAudio
+from core.model.token import Token
+from core.ports.simple_storage_port import SimpleStoragePort
+from core.services.inference_service import create_new_inference
+from core.services.request_context import RequestContext
+from tests.config import configure_ports_with_auth
+from tests.mocks.minio_mock import MinioMock
+
+PUT_OBJECT_LATENCY = 0.02
+REQUESTS = 200
+CONCURRENT_REQUESTS = 32
+USER_ID = "507f191e810c19729de860ea"
+
+
+def _create_minio() -> MinioMock:
+    minio = MinioMock()
+    minio._client.put_object.side_effect = lambda *args, **kwargs: time.sleep(
+        PUT_OBJECT_LATENCY
+    )
+    return minio
+
+
+def _run(upload_workers: int):
+    ports = configure_ports_with_auth()
+    ports.simple_storage_port = SimpleStoragePort(_create_minio(), upload_workers)
+    client = TestClient(create_app(ports))
+
+    latencies = []
+    for _ in range(REQUESTS):
+        files = {
+            "aceite": open("tests/mocks/audio_files/audio4.wav", "rb"),
+            "vogal_sustentada": open("tests/mocks/audio_files/audio1.wav", "rb"),
+            "parlenda_ritmada": open("tests/mocks/audio_files/audio2.wav", "rb"),
+            "frase": open("tests/mocks/audio_files/audio3.wav", "rb"),
+        }
+        start = time.perf_counter()
+        response = client.post(
+            "/v1/users/507f191e810c19729de860ea/inferences",
+            headers={"Authorization": "Bearer mock_token"},
+            data={
+                "sex": "F",
+                "age": 23,
+                "rgh": "fake_rgh",
+                "covid_status": "Sim",
+                "mask_type": "None",
+                "model_id": "629f992d45cda830033cf4cd",
+            },
+            files=files,
+        )
+        latencies.append(time.perf_counter() - start)
+        for file in files.values():
+            file.close()
+        assert response.status_code == 200, response.text
+
+    percentiles = statistics.quantiles(latencies, n=100)
+    return percentiles[49], percentiles[98]
+
+
+async def _create_inference(ports, inference_form: InferenceCreationForm) -> float:
+    context = RequestContext(
+        ports.authentication_port, ports.database_port, Token(content="mock_token")
+    )
+    inference_files = InferenceFiles(
+        **{
+            file_type: UploadAudio(file=BytesIO(b"fake_audio"), filename="audio.wav")
+            for file_type in InferenceFiles.__fields__.keys()
+        }
+    )
+    start = time.perf_counter()
+    await create_new_inference(
+        ports.simple_storage_port,
+        context,
+        ports.database_port,
+        USER_ID,
+        inference_form,
+        inference_files,
+    )
+    return time.perf_counter() - start
+
+
+async def _run_concurrent(upload_workers: int):
+    ports = configure_ports_with_auth()
+    ports.simple_storage_port = SimpleStoragePort(_create_minio(), upload_workers)
+    inference_form = InferenceCreationForm(
+        sex="F",
+        age=23,
+        rgh="fake_rgh",
+        covid_status="Sim",
+        mask_type="None",
+        model_id="629f992d45cda830033cf4cd",
+    )
+
+    latencies = []
+    for _ in range(REQUESTS // CONCURRENT_REQUESTS):
+        latencies += await asyncio.gather(
+            *[
+                _create_inference(ports, inference_form)
+                for _ in range(CONCURRENT_REQUESTS)
+            ]
+        )
+
+    percentiles = statistics.quantiles(latencies, n=100)
+    return percentiles[49], percentiles[98]
+
+
+if __name__ == "__main__":
+    for label, upload_workers in (("serial", 1), ("concurrent", 4)):
+        p50, p99 = _run(upload_workers)
+        print(
+            f"sequential requests, {label:>10} uploads: "
+            f"p50 {p50 * 1000:7.2f} ms  p99 {p99 * 1000:7.2f} ms",
+            flush=True,
+        )
+    for label, upload_workers in (("serial", 1), ("concurrent", 4)):
+        p50, p99 = asyncio.run(_run_concurrent(upload_workers))
+        print(
+            f"{CONCURRENT_REQUESTS} concurrent requests, {label:>10} uploads: "
+            f"p50 {p50 * 1000:7.2f} ms  p99 {p99 * 1000:7.2f} ms",
+            flush=True,
+        )
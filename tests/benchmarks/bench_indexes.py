@@ -0,0 +1,140 @@
+"""Query latency before and after the index bootstrap
+
+Fills a scratch database with USERS users holding INFERENCES_PER_USER
+inferences and one result each, then times the lookups the API runs on every
+request (user by username and email, inferences of a user, result of an
+inference) without indexes and again after MongoAdapter.ensure_indexes. The
+documents examined by each query come from its query plan.
+
+mongomock has no query planner, so this benchmark needs a real mongoDB. The
+scratch database is dropped at the end.
+
+Usage:
+    BENCHMARK_MONGO_CONN_URL=mongodb://localhost:27017 \\
+        PYTHONPATH=src python3 -m tests.benchmarks.bench_indexes
+"""
+import asyncio
+import os
+import random
+import statistics
+import time
+from typing import Awaitable, Callable, List
+
+from bson import ObjectId
+
+from adapters.database.mongo_adapter import MongoAdapter
+
+DATABASE_NAME = "spira_index_benchmark"
+USERS = 1000
+INFERENCES_PER_USER = 100
+SAMPLES = 200
+
+
+async def _fill(adapter: MongoAdapter) -> List[dict]:
+    users = [
+        {
+            "_id": ObjectId(),
+            "username": f"user{index}",
+            "email": f"user{index}@spira.com",
+            "password": "fake_password",
+        }
+        for index in range(USERS)
+    ]
+    await adapter._users.insert_many(users)
+    for user in users:
+        inferences = [
+            {
+                "_id": ObjectId(),
+                "user_id": str(user["_id"]),
+                "model_id": "fake_model_id",
+                "status": "completed",
+                "created_in": str(index),
+            }
+            for index in range(INFERENCES_PER_USER)
+        ]
+        await adapter._inferences.insert_many(inferences)
+        await adapter._results.insert_many(
+            [
+                {"inference_id": str(inference["_id"]), "output": 0.5}
+                for inference in inferences
+            ]
+        )
+    return users
+
+
+async def _timed(query: Callable[[], Awaitable[object]]) -> float:
+    latencies = []
+    for _ in range(SAMPLES):
+        start = time.perf_counter()
+        await query()
+        latencies.append(time.perf_counter() - start)
+    return statistics.median(latencies) * 1000
+
+
+async def _examined(collection, filter: dict) -> int:
+    plan = await collection.find(filter).explain()
+    return plan["executionStats"]["totalDocsExamined"]
+
+
+async def _report(label: str, adapter: MongoAdapter, users: List[dict]):
+    user = random.choice(users)
+    user_id = str(user["_id"])
+    inference = await adapter._inferences.find_one({"user_id": user_id})
+    inference_id = inference["_id"]
+    queries = (
+        (
+            "user by username",
+            lambda: adapter.get_user_by_username(user["username"]),
+            adapter._users,
+            {"username": user["username"]},
+        ),
+        (
+            "user by email",
+            lambda: adapter.get_user_by_email(user["email"]),
+            adapter._users,
+            {"email": user["email"]},
+        ),
+        (
+            "inferences of a user",
+            lambda: adapter.get_inference_page(user_id, 50),
+            adapter._inferences,
+            {"user_id": user_id},
+        ),
+        (
+            "result of an inference",
+            lambda: adapter.get_result_by_inference_id(str(inference_id)),
+            adapter._results,
+            {"inference_id": str(inference_id)},
+        ),
+    )
+    print(label, flush=True)
+    for name, query, collection, filter in queries:
+        print(
+            f"  {name:<24} p50 {await _timed(query):8.3f} ms  "
+            f"{await _examined(collection, filter):7d} docs examined",
+            flush=True,
+        )
+
+
+async def _run(conn_url: str):
+    adapter = MongoAdapter(
+        conn_url, DATABASE_NAME, "users", "inferences", "models", "results"
+    )
+    await adapter._conn.drop_database(DATABASE_NAME)
+    try:
+        users = await _fill(adapter)
+        await _report("without indexes", adapter, users)
+        await adapter.ensure_indexes()
+        print("missing indexes:", await adapter.get_missing_indexes(), flush=True)
+        await _report("with indexes", adapter, users)
+    finally:
+        await adapter._conn.drop_database(DATABASE_NAME)
+
+
+if __name__ == "__main__":
+    conn_url = os.environ.get("BENCHMARK_MONGO_CONN_URL")
+    if conn_url is None:
+        print("BENCHMARK_MONGO_CONN_URL is not set, skipping", flush=True)
+        raise SystemExit(0)
+
+    asyncio.run(_run(conn_url))
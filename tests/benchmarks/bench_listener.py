@@ -0,0 +1,147 @@
+"""Result ingestion throughput of the message listener
+
+An in-process message service pushes MESSAGES result updates as fast as the
+listener takes them, against the mongomock database and a minIO stand-in that
+sleeps STORAGE_LATENCY on every directory removal. The sleep-and-poll run
+reproduces the first listener loop, which slept loop_interval before waiting
+for every message. The push-based runs differ in max_concurrent_updates and
+in the size of the database write batches; every run also reports how many
+write operations reached the database per result.
+
+Usage:
+    PYTHONPATH=src python3 -m tests.benchmarks.bench_listener
+"""
+import asyncio
+import json
+import time
+from typing import Tuple
+
+from bson import ObjectId
+
+from core.model.constants import Status
+from core.model.result import ResultUpdate
+from core.ports.database_port import DatabasePort
+from core.ports.message_service_port import MessageServicePort
+from core.ports.simple_storage_port import SimpleStoragePort
+from core.services.message_listener_service import listen_for_messages_and_update
+from tests.mocks.minio_mock import MinioMock
+from tests.mocks.mongo_mock import MongoMock
+
+MESSAGES = 2000
+STORAGE_LATENCY = 0.002
+LOOP_INTERVAL = 0.01
+POLLED_MESSAGES = 100
+WRITE_OPERATIONS = ("update_one", "update_many", "bulk_write")
+
+
+INFERENCE_IDS = [str(ObjectId()) for _ in range(MESSAGES)]
+
+
+def _message(index: int) -> str:
+    return json.dumps(
+        {"inference_id": INFERENCE_IDS[index], "output": 0.5, "diagnosis": "positive"}
+    )
+
+
+class CountingCollection:
+    def __init__(self, collection, counter: dict):
+        self._collection = collection
+        self._counter = counter
+
+    def __getattr__(self, name: str):
+        if name in WRITE_OPERATIONS:
+            self._counter["operations"] += 1
+        return getattr(self._collection, name)
+
+
+def _database_port() -> Tuple[DatabasePort, dict]:
+    counter = {"operations": 0}
+    mongo = MongoMock()
+    mongo._results = CountingCollection(mongo._results, counter)
+    mongo._inferences = CountingCollection(mongo._inferences, counter)
+    return DatabasePort(mongo), counter
+
+
+def _simple_storage_port() -> SimpleStoragePort:
+    minio = MinioMock()
+    minio._client.list_objects.return_value = []
+    minio._client.remove_objects.side_effect = (
+        lambda *args: time.sleep(STORAGE_LATENCY) or []
+    )
+    return SimpleStoragePort(minio)
+
+
+class PushingMessageService:
+    def __init__(self, messages: int):
+        self._messages = messages
+
+    async def subscribe(self, receiving_topic: str, callback, queue: str = ""):
+        for index in range(self._messages):
+            await callback(_message(index).encode("utf-8"), None)
+        pending_updates = asyncio.all_tasks() - {asyncio.current_task()}
+        await asyncio.gather(*pending_updates)
+
+
+async def _push_based(
+    max_concurrent_updates: int, batch_size: int, batch_window: float
+) -> Tuple[float, float]:
+    database_port, counter = _database_port()
+    simple_storage_port = _simple_storage_port()
+    message_service_port = MessageServicePort(PushingMessageService(MESSAGES))
+
+    start = time.perf_counter()
+    await listen_for_messages_and_update(
+        simple_storage_port,
+        message_service_port,
+        database_port,
+        "central_channel",
+        max_concurrent_updates,
+        batch_size,
+        batch_window,
+    )
+    elapsed = time.perf_counter() - start
+    return MESSAGES / elapsed, counter["operations"] / MESSAGES
+
+
+async def _sleep_and_poll() -> Tuple[float, float]:
+    database_port, counter = _database_port()
+    simple_storage_port = _simple_storage_port()
+    queue: asyncio.Queue = asyncio.Queue()
+    for index in range(POLLED_MESSAGES):
+        queue.put_nowait(_message(index))
+
+    start = time.perf_counter()
+    while not queue.empty():
+        await asyncio.sleep(LOOP_INTERVAL)
+        result_update = ResultUpdate(**json.loads(await queue.get()))
+        await database_port.update_result(result_update)
+        await database_port.update_inference_status(
+            result_update.inference_id, Status.completed_status
+        )
+        simple_storage_port.remove_inference_directory(result_update.inference_id)
+    elapsed = time.perf_counter() - start
+    return POLLED_MESSAGES / elapsed, counter["operations"] / POLLED_MESSAGES
+
+
+def _report(label: str, throughput: float, operations_per_result: float):
+    print(
+        f"{label:<44} {throughput:8.0f} msg/s  "
+        f"{operations_per_result:5.2f} mongo ops/result",
+        flush=True,
+    )
+
+
+if __name__ == "__main__":
+    _report(
+        f"sleep-and-poll (loop_interval={LOOP_INTERVAL})",
+        *asyncio.run(_sleep_and_poll()),
+    )
+    for max_concurrent_updates, batch_size, batch_window in (
+        (1, 1, 0),
+        (8, 1, 0),
+        (32, 32, 0.01),
+    ):
+        _report(
+            f"push-based, {max_concurrent_updates} workers, batches of {batch_size}",
+            *asyncio.run(_push_based(max_concurrent_updates, batch_size, batch_window)),
+        )
@@ -0,0 +1,131 @@
+"""Result polling against long polling of the result service
+
+INFERENCES clients wait for their inference to finish, each one completing
+at a random time within COMPLETION_WINDOW seconds. Polling clients read the
+result every POLL_INTERVAL seconds, long polling clients ask for it with
+wait=LONG_POLL_WAIT and are answered when the result update arrives. Each
+run reports the result requests per inference and the time from the
+completion to the client seeing it.
+
+Usage:
+    PYTHONPATH=src python3 -m tests.benchmarks.bench_long_poll
+"""
+import asyncio
+import random
+import statistics
+import time
+from typing import List, Tuple
+
+from bson import ObjectId
+
+from core.model.constants import Status
+from core.model.inference import InferenceCreation
+from core.model.result import ResultCreation, ResultUpdate
+from core.model.token import Token
+from core.ports.authentication_port import AuthenticationPort
+from core.ports.database_port import DatabasePort
+from core.services.request_context import RequestContext
+from core.services.result_hub import ResultHub
+from core.services.result_service import get_inference_result
+from tests.mocks.authentication_mock import AuthenticationMock
+from tests.mocks.mongo_mock import MongoMock
+
+INFERENCES = 200
+COMPLETION_WINDOW = 3
+POLL_INTERVAL = 1
+LONG_POLL_WAIT = 30
+USER_ID = "507f191e810c19729de860ea"
+
+
+async def _insert_inferences(database_port: DatabasePort) -> List[str]:
+    inference_ids = []
+    for _ in range(INFERENCES):
+        inference_id = str(ObjectId())
+        await database_port.insert_inference_with_outbox(
+            inference_id,
+            InferenceCreation(
+                age=20,
+                sex="F",
+                rgh="fake_rgh",
+                covid_status="Sim",
+                mask_type="None",
+                model_id="629f992d45cda830033cf4cd",
+                status=Status.processing_status,
+                user_id=USER_ID,
+                created_in="2022-07-18 17:07:16.954632",
+            ),
+            ResultCreation(
+                inference_id=inference_id, output=-1, diagnosis="not available"
+            ),
+            "fake_channel",
+        )
+        inference_ids.append(inference_id)
+    return inference_ids
+
+
+async def _complete(
+    database_port: DatabasePort, result_hub: ResultHub, inference_id: str
+) -> float:
+    await asyncio.sleep(random.uniform(0, COMPLETION_WINDOW))
+    result_update = ResultUpdate(
+        inference_id=inference_id, output=0.5, diagnosis="negative"
+    )
+    await database_port.update_result(result_update)
+    await database_port.update_inference_status(inference_id, Status.completed_status)
+    await result_hub.publish(result_update)
+    return time.perf_counter()
+
+
+async def _client(
+    database_port: DatabasePort,
+    result_hub: ResultHub,
+    inference_id: str,
+    wait: float,
+) -> Tuple[int, float]:
+    context = RequestContext(
+        AuthenticationPort(AuthenticationMock()), database_port, Token(content="")
+    )
+    requests = 0
+    while True:
+        requests += 1
+        inference, _ = await get_inference_result(
+            context, database_port, inference_id, USER_ID, result_hub, wait
+        )
+        if inference.status == Status.completed_status:
+            return requests, time.perf_counter()
+        if wait == 0:
+            await asyncio.sleep(POLL_INTERVAL)
+
+
+async def _run(label: str, wait: float):
+    database_port = DatabasePort(MongoMock())
+    result_hub = ResultHub()
+    inference_ids = await _insert_inferences(database_port)
+
+    completions = [
+        asyncio.ensure_future(_complete(database_port, result_hub, inference_id))
+        for inference_id in inference_ids
+    ]
+    clients = await asyncio.gather(
+        *[
+            _client(database_port, result_hub, inference_id, wait)
+            for inference_id in inference_ids
+        ]
+    )
+    completed_at = await asyncio.gather(*completions)
+
+    requests = sum(client_requests for client_requests, _ in clients) / INFERENCES
+    delays = [seen_at - done_at for (_, seen_at), done_at in zip(clients, completed_at)]
+    print(
+        f"{label:<28} {requests:6.2f} requests/inference  "
+        f"time-to-notify p50 {statistics.median(delays) * 1000:8.2f} ms  "
+        f"max {max(delays) * 1000:8.2f} ms",
+        flush=True,
+    )
+
+
+if __name__ == "__main__":
+    random.seed(0)
+    asyncio.run(_run(f"polling every {POLL_INTERVAL}s", 0))
+    random.seed(0)
+    asyncio.run(_run(f"long polling, wait={LONG_POLL_WAIT}", LONG_POLL_WAIT))
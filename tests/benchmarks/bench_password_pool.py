@@ -0,0 +1,77 @@
+"""Login burst against the password workers of the authentication adapter
+
+LOGINS password verifications arrive at once on the event loop while a probe
+coroutine wakes up every PROBE_INTERVAL seconds, standing in for the other
+requests served by the same loop. Each run reports how long the burst took
+and the worst delay the probe saw, inline (password_workers=0, the previous
+behaviour) and with password worker processes.
+
+bcrypt is the production scheme; SCHEME is used here because it has a
+similar cost and does not depend on the bcrypt build installed.
+
+Usage:
+    PYTHONPATH=src python3 -m tests.benchmarks.bench_password_pool
+"""
+import asyncio
+import os
+import time
+from typing import Tuple
+
+from adapters.authentication.authentication_adapter import AuthenticationAdapter
+
+SCHEME = "sha256_crypt"
+LOGINS = 8
+PROBE_INTERVAL = 0.005
+
+
+async def _probe(stop: asyncio.Event) -> float:
+    worst_delay = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        worst_delay = max(worst_delay, time.perf_counter() - start - PROBE_INTERVAL)
+    return worst_delay
+
+
+async def _burst(password_workers: int) -> Tuple[float, float]:
+    adapter = AuthenticationAdapter(
+        30, "benchmark_secret", "HS256", SCHEME, "auto", 0, 0, password_workers
+    )
+    hashed_password = adapter._pwd_context.hash("benchmark_password")
+    if password_workers > 0:
+        # start the worker processes before measuring
+        await asyncio.gather(
+            *(
+                adapter.verify_password("benchmark_password", hashed_password)
+                for _ in range(password_workers)
+            )
+        )
+
+    stop = asyncio.Event()
+    probe = asyncio.ensure_future(_probe(stop))
+    await asyncio.sleep(PROBE_INTERVAL)
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(
+            adapter.verify_password("benchmark_password", hashed_password)
+            for _ in range(LOGINS)
+        )
+    )
+    elapsed = time.perf_counter() - start
+    stop.set()
+    worst_delay = await probe
+
+    if adapter._password_pool is not None:
+        adapter._password_pool.shutdown()
+    return elapsed, worst_delay
+
+
+if __name__ == "__main__":
+    print(f"{os.cpu_count()} cpus, {LOGINS} logins at once", flush=True)
+    for password_workers in (0, 1, 4):
+        elapsed, worst_delay = asyncio.run(_burst(password_workers))
+        print(
+            f"password_workers={password_workers}:  burst {elapsed * 1000:7.0f} ms  "
+            f"worst loop delay {worst_delay * 1000:7.1f} ms",
+            flush=True,
+        )
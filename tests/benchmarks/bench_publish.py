@@ -0,0 +1,84 @@
+"""Publishing throughput of NATSAdapter against an in-process NATS stand-in
+
+The stand-in client spends HANDSHAKE_LATENCY on every connect, like the TCP and
+NATS handshakes do. The per-message run reproduces the previous behaviour of
+send_message (connect, publish and close for every inference), the other runs
+use the long-lived publishing connections with different pool sizes.
+
+Usage:
+    PYTHONPATH=src python3 -m tests.benchmarks.bench_publish
+"""
+import asyncio
+import time
+
+from adapters.message_service.nats_adapter import NATSAdapter
+
+HANDSHAKE_LATENCY = 0.002
+MESSAGES = 2000
+CONCURRENT_REQUESTS = 50
+
+
+class FakeClient:
+    def __init__(self):
+        self.is_connected = False
+        self.is_reconnecting = False
+
+    async def connect(self, *args, **kwargs):
+        await asyncio.sleep(HANDSHAKE_LATENCY)
+        self.is_connected = True
+
+    async def publish(self, subject: str, payload: bytes, headers=None):
+        await asyncio.sleep(0)
+
+    async def close(self):
+        self.is_connected = False
+
+    async def drain(self):
+        self.is_connected = False
+
+
+async def _send_all(send):
+    queue: asyncio.Queue = asyncio.Queue()
+    for index in range(MESSAGES):
+        queue.put_nowait(b'{"inference": %d}' % index)
+
+    async def request_worker():
+        while not queue.empty():
+            await send(queue.get_nowait(), "fake_channel")
+
+    start = time.perf_counter()
+    await asyncio.gather(*[request_worker() for _ in range(CONCURRENT_REQUESTS)])
+    return MESSAGES / (time.perf_counter() - start)
+
+
+async def _connection_per_message():
+    async def send(message: bytes, topic: str):
+        # a client per message, the shared client used before raced here
+        client = FakeClient()
+        await client.connect()
+        await client.publish(topic, message)
+        await client.close()
+
+    return await _send_all(send)
+
+
+async def _long_lived_connections(pool_size: int):
+    adapter = NATSAdapter("nats://localhost:4222", pool_size)
+    adapter._publishers = [FakeClient() for _ in range(pool_size)]
+    await adapter.connect()
+    throughput = await _send_all(adapter.send_message)
+    await adapter.close()
+    return throughput
+
+
+if __name__ == "__main__":
+    print(
+        f"connection per message: {asyncio.run(_connection_per_message()):10.0f} msg/s",
+        flush=True,
+    )
+    for pool_size in (1, 4):
+        throughput = asyncio.run(_long_lived_connections(pool_size))
+        print(
+            f"long-lived pool of {pool_size}:   {throughput:10.0f} msg/s",
+            flush=True,
+        )
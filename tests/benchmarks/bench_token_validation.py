@@ -0,0 +1,55 @@
+"""Token validation throughput of the authentication adapter
+
+Validates the same HS256 bearer token VALIDATIONS times, as a client polling
+the result endpoint does, with the decoded token cache disabled and enabled.
+A second run spreads the validations over more distinct tokens than the
+cache holds, the worst case for the cache, where every validation misses.
+
+Usage:
+    PYTHONPATH=src python3 -m tests.benchmarks.bench_token_validation
+"""
+import time
+from typing import List
+
+from adapters.authentication.authentication_adapter import AuthenticationAdapter
+from core.model.token import Token, TokenData
+
+VALIDATIONS = 50000
+CACHE_SIZE = 1024
+
+
+def _adapter(token_cache_size: int) -> AuthenticationAdapter:
+    return AuthenticationAdapter(
+        30, "benchmark_secret", "HS256", "bcrypt", "auto", token_cache_size
+    )
+
+
+def _tokens(adapter: AuthenticationAdapter, count: int) -> List[Token]:
+    return [
+        adapter.generate_token(TokenData(username=f"user{index}"))
+        for index in range(count)
+    ]
+
+
+def _run(label: str, token_cache_size: int, distinct_tokens: int):
+    adapter = _adapter(token_cache_size)
+    tokens = _tokens(adapter, distinct_tokens)
+
+    start = time.perf_counter()
+    for index in range(VALIDATIONS):
+        adapter.validate_token(tokens[index % distinct_tokens])
+    elapsed = time.perf_counter() - start
+
+    stats = adapter.get_token_cache_stats()
+    print(
+        f"{label:<40} {VALIDATIONS / elapsed:9.0f} validations/s  "
+        f"hits {stats.hits:6d}  misses {stats.misses:6d}",
+        flush=True,
+    )
+
+
+if __name__ == "__main__":
+    _run("one token, no cache", 0, 1)
+    _run("one token, cached", CACHE_SIZE, 1)
+    _run(f"{2 * CACHE_SIZE} tokens, no cache", 0, 2 * CACHE_SIZE)
+    _run(f"{2 * CACHE_SIZE} tokens, cached (all misses)", CACHE_SIZE, 2 * CACHE_SIZE)
@@ -1,6 +1,9 @@
+import time
 from fastapi.testclient import TestClient
+from mock import AsyncMock, MagicMock, patch
 import pytest
 from adapters.routers.app import create_app
+from core.model.message_service import OutboxDispatch
 
 from tests.config import (
     configure_ports_without_auth,
@@ -102,6 +105,95 @@ def test_post_create_inference_success(client_with_auth: TestClient):
     assert response.status_code == 200
 
 
+def test_post_create_inference_reads_model_once():
+    ports = configure_ports_with_auth()
+    client = TestClient(create_app(ports))
+    database_port = ports.database_port
+    fake_inference = {
+        "sex": "F",
+        "age": 23,
+        "rgh": "fake_rgh",
+        "covid_status": "Sim",
+        "mask_type": "None",
+        "model_id": "629f992d45cda830033cf4cd",
+    }
+    fake_files = {
+        "aceite": open("tests/mocks/audio_files/audio4.wav", "rb"),
+        "vogal_sustentada": open("tests/mocks/audio_files/audio1.wav", "rb"),
+        "parlenda_ritmada": open("tests/mocks/audio_files/audio2.wav", "rb"),
+        "frase": open("tests/mocks/audio_files/audio3.wav", "rb"),
+    }
+    with patch.object(
+        database_port,
+        "get_model_by_id",
+        MagicMock(side_effect=database_port.get_model_by_id),
+    ) as mock_get_model_by_id, patch.object(
+        database_port,
+        "get_user_by_username",
+        MagicMock(side_effect=database_port.get_user_by_username),
+    ) as mock_get_user_by_username:
+        response = client.post(
+            "/v1/users/507f191e810c19729de860ea/inferences",
+            headers={
+                "Authorization": "Bearer mock_token",
+            },
+            data=fake_inference,
+            files=fake_files,
+        )
+
+        mock_get_model_by_id.assert_called_once_with("629f992d45cda830033cf4cd")
+        mock_get_user_by_username.assert_not_called()
+    assert response.status_code == 200
+
+
+def test_post_create_inference_dispatched_through_outbox():
+    ports = configure_ports_with_auth()
+    outbox_dispatch = OutboxDispatch(
+        batch_size=10,
+        poll_interval=60,
+        lease=30,
+        retry_base_delay=0.5,
+        retry_max_delay=60,
+        max_attempts=3,
+    )
+    fake_files = {
+        "aceite": open("tests/mocks/audio_files/audio4.wav", "rb"),
+        "vogal_sustentada": open("tests/mocks/audio_files/audio1.wav", "rb"),
+        "parlenda_ritmada": open("tests/mocks/audio_files/audio2.wav", "rb"),
+        "frase": open("tests/mocks/audio_files/audio3.wav", "rb"),
+    }
+    with patch.object(
+        ports.message_service_port, "send_message", AsyncMock()
+    ) as mock_send_message, TestClient(
+        create_app(ports, outbox_dispatch=outbox_dispatch)
+    ) as client:
+        response = client.post(
+            "/v1/users/507f191e810c19729de860ea/inferences",
+            headers={
+                "Authorization": "Bearer mock_token",
+            },
+            data={
+                "sex": "F",
+                "age": 23,
+                "rgh": "fake_rgh",
+                "covid_status": "Sim",
+                "mask_type": "None",
+                "model_id": "629f992d45cda830033cf4cd",
+            },
+            files=fake_files,
+        )
+        assert response.status_code == 200
+
+        # the insertion wakes the dispatcher up before the poll interval
+        deadline = time.monotonic() + 5
+        while not mock_send_message.called and time.monotonic() < deadline:
+            time.sleep(0.01)
+        mock_send_message.assert_called_once()
+        assert (
+            mock_send_message.call_args.args[0].publishing_channel == "fake_channel_1"
+        )
+
+
 def test_post_create_inference_with_invalid_model_id_exception(
     client_with_auth: TestClient,
 ):
@@ -219,10 +311,34 @@ def test_get_inference_list_success(client_with_auth: TestClient):
                 "status": "processing",
                 "created_in": "2022-07-18 17:07:16.954632",
             },
-        ]
+        ],
+        "next_cursor": None,
     }
 
 
+def test_get_inference_list_pages(client_with_auth: TestClient):
+    headers = {"Authorization": "Bearer mock_token"}
+    response = client_with_auth.get(
+        "/v1/users/507f191e810c19729de860ea/inferences/?limit=1", headers=headers
+    )
+    assert response.status_code == 200
+    assert [inference["id"] for inference in response.json()["inferences"]] == [
+        "629f815d6abaa3c5e6cf7c16"
+    ]
+    assert response.json()["next_cursor"] == "629f815d6abaa3c5e6cf7c16"
+
+    response = client_with_auth.get(
+        "/v1/users/507f191e810c19729de860ea/inferences/"
+        "?limit=1&after=629f815d6abaa3c5e6cf7c16",
+        headers=headers,
+    )
+    assert response.status_code == 200
+    assert [inference["id"] for inference in response.json()["inferences"]] == [
+        "629f81986abaa3c5e6cf7c17"
+    ]
+    assert response.json()["next_cursor"] is None
+
+
 def test_get_inference_list_of_another_user_exception(client_with_auth: TestClient):
     headers = {"Authorization": "Bearer mock_token"}
     response = client_with_auth.get(
@@ -1,7 +1,10 @@
+import asyncio
 from fastapi.testclient import TestClient
+from mock import ANY, MagicMock, patch
 import pytest
 
 from adapters.routers.app import create_app
+from core.model.result import InferenceStatusUpdate, ResultUpdate
 
 from core.ports.database_port import DatabasePort
 
@@ -93,6 +96,172 @@ def test_post_create_result_with_inference_success(client_with_auth: TestClient)
 # tests without authentication
 
 
+def test_stream_results_pushed_by_listener():
+    ports = configure_ports_with_auth()
+    result_update = ResultUpdate(
+        inference_id="629f815d6abaa3c5e6cf7c16", output=0.5, diagnosis="negative"
+    )
+
+    async def fake_subscribe(channel: str, callback):
+        async def push_result_update():
+            # the result update keeps arriving until the client follows it
+            for _ in range(500):
+                await callback(result_update)
+                await asyncio.sleep(0.01)
+
+        asyncio.ensure_future(push_result_update())
+
+    with patch.object(
+        ports.message_service_port,
+        "subscribe_inference_updates",
+        MagicMock(side_effect=fake_subscribe),
+    ) as mock_subscribe, TestClient(
+        create_app(ports, result_update_channel="fake_result_update_channel")
+    ) as client:
+        response = client.get(
+            "/v1/users/507f191e810c19729de860ea/results/events"
+            "?inference_id=629f815d6abaa3c5e6cf7c16",
+            headers={"Authorization": "Bearer mock_token"},
+        )
+
+        mock_subscribe.assert_called_once_with("fake_result_update_channel", ANY)
+    assert response.status_code == 200
+    assert response.text == (
+        "event: completed\n"
+        'data: {"inference_id": "629f815d6abaa3c5e6cf7c16", "output": 0.5, '
+        '"diagnosis": "negative"}\n\n'
+    )
+
+
+def test_stream_results_ended_by_error_status():
+    ports = configure_ports_with_auth()
+    status_update = InferenceStatusUpdate(
+        inference_id="629f815d6abaa3c5e6cf7c16", status="error"
+    )
+
+    async def fake_subscribe(channel: str, callback):
+        async def push_status_update():
+            # the outbox dispatcher of a server gave the inference up
+            for _ in range(500):
+                await callback(status_update)
+                await asyncio.sleep(0.01)
+
+        asyncio.ensure_future(push_status_update())
+
+    with patch.object(
+        ports.message_service_port,
+        "subscribe_inference_updates",
+        MagicMock(side_effect=fake_subscribe),
+    ), TestClient(
+        create_app(ports, result_update_channel="fake_result_update_channel")
+    ) as client:
+        response = client.get(
+            "/v1/users/507f191e810c19729de860ea/results/events"
+            "?inference_id=629f815d6abaa3c5e6cf7c16",
+            headers={"Authorization": "Bearer mock_token"},
+        )
+
+    assert response.status_code == 200
+    assert response.text == (
+        "event: error\n"
+        'data: {"inference_id": "629f815d6abaa3c5e6cf7c16", "status": "error"}\n\n'
+    )
+
+
+def test_get_result_served_from_inference_cache():
+    ports = configure_ports_with_auth()
+    ports.database_port = DatabasePort(MongoMock(), inference_cache_size=100)
+    database_adapter = ports.database_port._database_adapter
+    callbacks = []
+
+    async def fake_subscribe(channel: str, callback):
+        callbacks.append(callback)
+
+    with patch.object(
+        ports.message_service_port,
+        "subscribe_inference_updates",
+        MagicMock(side_effect=fake_subscribe),
+    ), patch.object(
+        database_adapter,
+        "get_inference_with_result",
+        MagicMock(side_effect=database_adapter.get_inference_with_result),
+    ) as mock_get_inference_with_result, TestClient(
+        create_app(ports, result_update_channel="fake_result_update_channel")
+    ) as client:
+        url = "/v1/users/507f191e810c19729de860ea/inferences/629f815d6abaa3c5e6cf7c16/result"
+        headers = {"Authorization": "Bearer mock_token"}
+        for _ in range(3):
+            response = client.get(url, headers=headers)
+            assert response.json()["inference"]["status"] == "processing"
+
+        # the listener of another process wrote the result
+        client.portal.call(
+            callbacks[0],
+            ResultUpdate(
+                inference_id="629f815d6abaa3c5e6cf7c16",
+                output=0.5,
+                diagnosis="negative",
+            ),
+        )
+        response = client.get(url, headers=headers)
+
+        mock_get_inference_with_result.assert_called_once()
+    assert response.json()["inference"]["status"] == "completed"
+    assert response.json()["result"]["output"] == 0.5
+    assert response.json()["result"]["diagnosis"] == "negative"
+
+
+def test_get_result_status_update_of_another_server():
+    ports = configure_ports_with_auth()
+    ports.database_port = DatabasePort(MongoMock(), inference_cache_size=100)
+    database_adapter = ports.database_port._database_adapter
+    callbacks = []
+
+    async def fake_subscribe(channel: str, callback):
+        callbacks.append(callback)
+
+    with patch.object(
+        ports.message_service_port,
+        "subscribe_inference_updates",
+        MagicMock(side_effect=fake_subscribe),
+    ), patch.object(
+        database_adapter,
+        "get_inference_with_result",
+        MagicMock(side_effect=database_adapter.get_inference_with_result),
+    ) as mock_get_inference_with_result, TestClient(
+        create_app(ports, result_update_channel="fake_result_update_channel")
+    ) as client:
+        url = "/v1/users/507f191e810c19729de860ea/inferences/629f815d6abaa3c5e6cf7c16/result"
+        headers = {"Authorization": "Bearer mock_token"}
+        response = client.get(url, headers=headers)
+        assert response.json()["inference"]["status"] == "processing"
+
+        # the outbox dispatcher of another server gave the inference up
+        client.portal.call(
+            callbacks[0],
+            InferenceStatusUpdate(
+                inference_id="629f815d6abaa3c5e6cf7c16", status="error"
+            ),
+        )
+        response = client.get(url, headers=headers)
+
+        mock_get_inference_with_result.assert_called_once()
+    assert response.json()["inference"]["status"] == "error"
+
+
+def test_batch_get_results_success(client_with_auth: TestClient):
+    response = client_with_auth.post(
+        "/v1/users/507f191e810c19729de860ea/results:batchGet",
+        headers={"Authorization": "Bearer mock_token"},
+        json={"inference_ids": ["629f815d6abaa3c5e6cf7c16"]},
+    )
+    assert response.status_code == 200
+    assert [
+        (item["inference"]["id"], item["result"]["id"])
+        for item in response.json()["results"]
+    ] == [("629f815d6abaa3c5e6cf7c16", "62abf2cd154f18493d74fcd2")]
+
+
 def test_get_result_by_inference_unauthorized(client_without_auth: TestClient):
     headers = {"Authorization": "Bearer mock_token"}
     response = client_without_auth.get(
@@ -1,3 +1,5 @@
+from collections import OrderedDict
+from threading import Lock
 from typing import Optional
 from passlib.context import CryptContext
 
@@ -9,10 +11,10 @@ class AuthenticationMock(AuthenticationAdapter):
     def __init__(self):
         pass
 
-    def verify_password(self, plain_password: str, user_password: str):
+    async def verify_password(self, plain_password: str, user_password: str):
         return True
 
-    def get_password_hash(self, plain_password: str) -> str:
+    async def get_password_hash(self, plain_password: str) -> str:
         return "fake_hash"
 
     def generate_token(self, data: TokenData) -> Token:
@@ -22,17 +24,17 @@ class AuthenticationMock(AuthenticationAdapter):
         return True
 
     def decode_token(self, token: Token) -> Optional[TokenData]:
-        return TokenData(username="test_username")
+        return TokenData(username="test_username", user_id="507f191e810c19729de860ea")
 
 
 class UnauthorizedAuthenticationMock(AuthenticationAdapter):
     def __init__(self):
         pass
 
-    def verify_password(self, plain_password: str, user_password: str):
+    async def verify_password(self, plain_password: str, user_password: str):
         return True
 
-    def get_password_hash(self, plain_password: str) -> str:
+    async def get_password_hash(self, plain_password: str) -> str:
         return "fake_hash"
 
     def generate_token(self, data: TokenData) -> Token:
@@ -51,3 +53,12 @@ class AuthenticationJWTMock(AuthenticationAdapter):
         self._expire_time = 1
         self._key = "fake_secret"
         self._algorithm = "fake_algorithm"
+        self._token_cache_size = 2
+        self._token_cache_ttl = 60
+        self._token_cache = OrderedDict()
+        self._token_cache_lock = Lock()
+        self._token_cache_hits = 0
+        self._token_cache_misses = 0
+        self._password_workers = 0
+        self._password_pool = None
+        self._pending_password_jobs = 0
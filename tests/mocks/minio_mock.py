@@ -1,5 +1,6 @@
 from adapters.simple_storage.minio_adapter import MinioAdapter
 from minio import Minio
+from minio.helpers import MIN_PART_SIZE
 from mock import Mock
 
 
@@ -7,4 +8,5 @@ class MinioMock(MinioAdapter):
     def __init__(self):
         self._client: Minio = Mock(spec=Minio)
         self._bucket_name = "mock-bucket"
+        self._part_size = MIN_PART_SIZE
         self._client.make_bucket(self._bucket_name)
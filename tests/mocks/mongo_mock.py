@@ -1,19 +1,27 @@
 from bson.objectid import ObjectId
 from mongomock import MongoClient
+from mongomock_motor import AsyncMongoMockClient
 
 from adapters.database.mongo_adapter import MongoAdapter
 
 
 class MongoMock(MongoAdapter):
     def __init__(self):
-        self._conn = MongoClient()
+        # the data is seeded through the synchronous client,
+        # the adapter then reads it through the asynchronous one
+        client = MongoClient()
+        self._seed(client.spira_db)
+
+        self._conn = AsyncMongoMockClient(mock_mongo_client=client)
         self._db = self._conn.spira_db
         self._users = self._db.users
         self._inferences = self._db.inferences
         self._models = self._db.models
         self._results = self._db.results
+        self._outbox = self._db.outbox
 
-        self._users.insert_many(
+    def _seed(self, db):
+        db.users.insert_many(
             [
                 {
                     "_id": ObjectId("507f191e810c19729de860ea"),
@@ -30,7 +38,7 @@ class MongoMock(MongoAdapter):
             ]
         )
 
-        self._inferences.insert_many(
+        db.inferences.insert_many(
             [
                 {
                     "_id": ObjectId("629f815d6abaa3c5e6cf7c16"),
@@ -71,7 +79,7 @@ class MongoMock(MongoAdapter):
             ]
         )
 
-        self._models.insert_many(
+        db.models.insert_many(
             [
                 {
                     "_id": ObjectId("629f992d45cda830033cf4cd"),
@@ -88,7 +96,7 @@ class MongoMock(MongoAdapter):
             ]
         )
 
-        self._results.insert_one(
+        db.results.insert_one(
             {
                 "_id": ObjectId("62abf2cd154f18493d74fcd2"),
                 "inference_id": "629f815d6abaa3c5e6cf7c16",
@@ -1,5 +1,8 @@
+from typing import Dict, List, Optional
 from mock import Mock
 from nats.aio.client import Client
+from nats.js.api import ConsumerConfig, RawStreamMsg, StreamConfig
+from nats.js.errors import NotFoundError
 
 from adapters.message_service.nats_adapter import NATSAdapter
 
@@ -7,6 +10,84 @@ from adapters.message_service.nats_adapter import NATSAdapter
 class NATSMock(NATSAdapter):
     def __init__(self):
         self._conn_url = "fake_url"
-        self._nc: Client = Mock(spec=Client)
+        self._publishers = [Mock(spec=Client)]
+        self._next_publisher = 0
+        self._connect_lock = None
         self._receiving_nc: Client = Mock(spec=Client)
         self._subs = {}
+        self._durable_handlers = set()
+
+
+class JetStreamMessageMock:
+    def __init__(
+        self, jetstream: "JetStreamMock", seq: int, data: bytes, num_delivered: int
+    ):
+        self.data = data
+        self.headers = None
+        self.metadata = Mock(num_delivered=num_delivered)
+        self._seq = seq
+        self._jetstream = jetstream
+
+    async def ack(self):
+        self._jetstream.acked.append(self.data)
+        del self._jetstream.messages[self._seq]
+
+    async def nak(self, delay: Optional[float] = None):
+        await self._jetstream.deliver(
+            self._seq, self.data, self.metadata.num_delivered + 1
+        )
+
+    async def term(self):
+        self._jetstream.terminated.append(self.data)
+        del self._jetstream.messages[self._seq]
+
+
+class JetStreamMock:
+    """In-process stand-in for a jetstream context with one push consumer
+    on a work queue stream: published messages are delivered to the
+    subscription callback and delivered again when they are not acknowledged,
+    up to max_deliver times. acknowledged and terminated messages are
+    removed from the stream
+
+    """
+
+    def __init__(self):
+        self.streams: Dict[str, StreamConfig] = {}
+        self.messages: Dict[int, bytes] = {}
+        self.acked: List[bytes] = []
+        self.terminated: List[bytes] = []
+        self.config: Optional[ConsumerConfig] = None
+        self._callback = None
+
+    async def stream_info(self, name: str):
+        if name not in self.streams:
+            raise NotFoundError()
+        return self.streams[name]
+
+    async def add_stream(self, **params):
+        self.streams[params["name"]] = StreamConfig(**params)
+
+    async def get_msg(self, stream_name: str, seq: int) -> RawStreamMsg:
+        if seq not in self.messages:
+            raise NotFoundError()
+        return RawStreamMsg(seq=seq, data=self.messages[seq])
+
+    async def delete_msg(self, stream_name: str, seq: int) -> bool:
+        del self.messages[seq]
+        return True
+
+    async def subscribe(self, subject: str, cb, config: ConsumerConfig, **kwargs):
+        self._callback = cb
+        self.config = config
+        return Mock()
+
+    async def publish(self, data: bytes) -> int:
+        seq = len(self.messages) + len(self.acked) + len(self.terminated) + 1
+        self.messages[seq] = data
+        await self.deliver(seq, data, 1)
+        return seq
+
+    async def deliver(self, seq: int, data: bytes, num_delivered: int):
+        if num_delivered > self.config.max_deliver:
+            return
+        await self._callback(JetStreamMessageMock(self, seq, data, num_delivered))
@@ -1,8 +1,9 @@
+import asyncio
 from operator import truediv
 from typing import Optional
 from unittest.mock import ANY, MagicMock, patch
 import pytest
-from core.model.token import Token, TokenData
+from core.model.token import PasswordPoolStats, Token, TokenCacheStats, TokenData
 from core.model.user import User
 from adapters.authentication.authentication_adapter import AuthenticationAdapter
 from tests.mocks.authentication_mock import AuthenticationJWTMock, AuthenticationMock
@@ -49,6 +50,21 @@ def test_decode_token(authentication_adapter: AuthenticationAdapter):
         assert return_value == TokenData(username="fake_username")
 
 
+def test_decode_token_with_user_id(authentication_adapter: AuthenticationAdapter):
+    with patch(
+        "adapters.authentication.authentication_adapter.jwt.decode"
+    ) as mock_method:
+        fake_token = Token(content="fake_content")
+        mock_method.return_value = {
+            "username": "fake_username",
+            "user_id": "507f191e810c19729de860ea",
+        }
+        return_value = authentication_adapter.decode_token(fake_token)
+        assert return_value == TokenData(
+            username="fake_username", user_id="507f191e810c19729de860ea"
+        )
+
+
 def test_decode_token_exception(authentication_adapter: AuthenticationAdapter):
 
     with patch(
@@ -76,8 +92,10 @@ def test_verify_password(authentication_adapter: AuthenticationAdapter):
         "verify",
         MagicMock(side_effect=fake_verify_password),
     ) as mock_method:
-        return_value = authentication_adapter.verify_password(
-            "fake_plain_password", "fake_user_password"
+        return_value = asyncio.run(
+            authentication_adapter.verify_password(
+                "fake_plain_password", "fake_user_password"
+            )
         )
         mock_method.assert_called_once_with("fake_plain_password", "fake_user_password")
         assert return_value == True
@@ -87,8 +105,10 @@ def test_verify_password(authentication_adapter: AuthenticationAdapter):
         "verify",
         MagicMock(side_effect=fake_verify_password_failed),
     ) as mock_method:
-        return_value = authentication_adapter.verify_password(
-            "fake_plain_password", "fake_user_password"
+        return_value = asyncio.run(
+            authentication_adapter.verify_password(
+                "fake_plain_password", "fake_user_password"
+            )
         )
         mock_method.assert_called_once_with("fake_plain_password", "fake_user_password")
         assert return_value == False
@@ -103,7 +123,9 @@ def test_get_password_hash(authentication_adapter: AuthenticationAdapter):
         "hash",
         MagicMock(side_effect=fake_get_password_hash),
     ) as mock_method:
-        return_value = authentication_adapter.get_password_hash("fake_plain_password")
+        return_value = asyncio.run(
+            authentication_adapter.get_password_hash("fake_plain_password")
+        )
         mock_method.assert_called_once_with("fake_plain_password")
         assert return_value == "fake_hash"
 
@@ -117,3 +139,124 @@ def test_generate_token(authentication_adapter: AuthenticationAdapter):
         return_value = authentication_adapter.generate_token(fake_token_data)
         mock_method.assert_called_once()
         assert return_value == Token(content="fake_content")
+
+
+def test_decode_token_cache_hit(authentication_adapter: AuthenticationAdapter):
+    with patch(
+        "adapters.authentication.authentication_adapter.jwt.decode"
+    ) as mock_method:
+        fake_token = Token(content="fake_content")
+        mock_method.return_value = {"username": "fake_username"}
+
+        assert authentication_adapter.validate_token(fake_token) == True
+        return_value = authentication_adapter.decode_token(fake_token)
+
+        mock_method.assert_called_once_with("fake_content", ANY, algorithms=ANY)
+        assert return_value == TokenData(username="fake_username")
+        assert authentication_adapter.get_token_cache_stats() == TokenCacheStats(
+            hits=1, misses=1, size=1
+        )
+
+
+def test_decode_token_cache_expiration(authentication_adapter: AuthenticationAdapter):
+    with patch(
+        "adapters.authentication.authentication_adapter.jwt.decode"
+    ) as mock_method, patch(
+        "adapters.authentication.authentication_adapter.time.time"
+    ) as mock_time:
+        fake_token = Token(content="fake_content")
+        # the token expires before the cache ttl of 60 seconds
+        mock_method.return_value = {"username": "fake_username", "exp": 1010}
+
+        mock_time.return_value = 1000
+        authentication_adapter.decode_token(fake_token)
+        mock_time.return_value = 1009
+        authentication_adapter.decode_token(fake_token)
+        assert mock_method.call_count == 1
+
+        mock_time.return_value = 1010
+        authentication_adapter.decode_token(fake_token)
+        assert mock_method.call_count == 2
+
+
+def test_decode_token_cache_eviction(authentication_adapter: AuthenticationAdapter):
+    with patch(
+        "adapters.authentication.authentication_adapter.jwt.decode"
+    ) as mock_method:
+        mock_method.return_value = {"username": "fake_username"}
+
+        authentication_adapter.decode_token(Token(content="first_content"))
+        authentication_adapter.decode_token(Token(content="second_content"))
+        authentication_adapter.decode_token(Token(content="first_content"))
+        # the cache holds two tokens, the least recently used one is dropped
+        authentication_adapter.decode_token(Token(content="third_content"))
+        authentication_adapter.decode_token(Token(content="first_content"))
+        authentication_adapter.decode_token(Token(content="second_content"))
+
+        assert [call.args[0] for call in mock_method.call_args_list] == [
+            "first_content",
+            "second_content",
+            "third_content",
+            "second_content",
+        ]
+        assert authentication_adapter.get_token_cache_stats() == TokenCacheStats(
+            hits=2, misses=4, size=2
+        )
+
+
+def test_decode_token_cache_invalid_token(
+    authentication_adapter: AuthenticationAdapter,
+):
+    with patch(
+        "adapters.authentication.authentication_adapter.jwt.decode"
+    ) as mock_method:
+        fake_token = Token(content="fake_content")
+        mock_method.side_effect = Exception()
+
+        assert authentication_adapter.validate_token(fake_token) == False
+        assert authentication_adapter.validate_token(fake_token) == False
+
+        assert mock_method.call_count == 2
+        assert authentication_adapter.get_token_cache_stats().size == 0
+
+
+def test_generate_token_with_user_id(authentication_adapter: AuthenticationAdapter):
+    with patch(
+        "adapters.authentication.authentication_adapter.jwt.encode"
+    ) as mock_method:
+        mock_method.return_value = "fake_content"
+        authentication_adapter.generate_token(
+            TokenData(username="fake_username", user_id="507f191e810c19729de860ea")
+        )
+        claims = mock_method.call_args.args[0]
+        assert claims["username"] == "fake_username"
+        assert claims["user_id"] == "507f191e810c19729de860ea"
+
+
+def test_password_pool():
+    adapter = AuthenticationAdapter(
+        1, "fake_secret", "HS256", "plaintext", "auto", 0, 0, 1
+    )
+
+    async def hash_and_verify():
+        jobs = [
+            asyncio.ensure_future(adapter.get_password_hash("fake_password"))
+            for _ in range(3)
+        ]
+        await asyncio.sleep(0)
+        stats_while_busy = adapter.get_password_pool_stats()
+        hashed_passwords = await asyncio.gather(*jobs)
+        verified = await adapter.verify_password("fake_password", hashed_passwords[0])
+        return stats_while_busy, hashed_passwords, verified
+
+    try:
+        stats_while_busy, hashed_passwords, verified = asyncio.run(hash_and_verify())
+    finally:
+        adapter._password_pool.shutdown()
+
+    assert stats_while_busy == PasswordPoolStats(workers=1, running=1, queued=2)
+    assert hashed_passwords == ["fake_password"] * 3
+    assert verified == True
+    assert adapter.get_password_pool_stats() == PasswordPoolStats(
+        workers=1, running=0, queued=0
+    )
@@ -1,6 +1,8 @@
+import asyncio
 import pytest
 from bson import ObjectId
 import datetime
+from mock import ANY
 from adapters.database.mongo_adapter import MongoAdapter
 from core.model.inference import InferenceCreation
 from core.model.result import ResultCreation, ResultUpdate
@@ -19,7 +21,7 @@ def database_adapter():
 
 
 def test_get_user_by_id(database_adapter: MongoAdapter):
-    user = database_adapter.get_user_by_id("507f191e810c19729de860ea")
+    user = asyncio.run(database_adapter.get_user_by_id("507f191e810c19729de860ea"))
     assert user == {
         "_id": ObjectId("507f191e810c19729de860ea"),
         "username": "test_username",
@@ -29,7 +31,7 @@ def test_get_user_by_id(database_adapter: MongoAdapter):
 
 
 def test_get_user_by_username(database_adapter: MongoAdapter):
-    user = database_adapter.get_user_by_username("test_username")
+    user = asyncio.run(database_adapter.get_user_by_username("test_username"))
     assert user == {
         "_id": ObjectId("507f191e810c19729de860ea"),
         "username": "test_username",
@@ -38,13 +40,28 @@ def test_get_user_by_username(database_adapter: MongoAdapter):
     }
 
 
+def test_is_user_enabled(database_adapter: MongoAdapter):
+    assert asyncio.run(database_adapter.is_user_enabled("507f191e810c19729de860ea"))
+    assert not asyncio.run(database_adapter.is_user_enabled("629d34d2663c15eb2ed15494"))
+
+    asyncio.run(
+        database_adapter._users.update_one(
+            {"_id": ObjectId("507f191e810c19729de860ea")},
+            {"$set": {"disabled": True}},
+        )
+    )
+    assert not asyncio.run(database_adapter.is_user_enabled("507f191e810c19729de860ea"))
+
+
 def test_insert_user(database_adapter: MongoAdapter):
     try:
-        database_adapter.insert_user(
-            UserCreation(
-                username="test_name",
-                email="test_email@gmail.com",
-                password="fake_password",
+        asyncio.run(
+            database_adapter.insert_user(
+                UserCreation(
+                    username="test_name",
+                    email="test_email@gmail.com",
+                    password="fake_password",
+                )
             )
         )
     except:
@@ -52,8 +69,10 @@ def test_insert_user(database_adapter: MongoAdapter):
 
 
 def test_get_inference_by_id(database_adapter: MongoAdapter):
-    inference = database_adapter.get_inference_by_id(
-        "629f815d6abaa3c5e6cf7c16", "507f191e810c19729de860ea"
+    inference = asyncio.run(
+        database_adapter.get_inference_by_id(
+            "629f815d6abaa3c5e6cf7c16", "507f191e810c19729de860ea"
+        )
     )
 
     assert inference == {
@@ -70,8 +89,10 @@ def test_get_inference_by_id(database_adapter: MongoAdapter):
     }
 
 
-def test_get_inference_list(database_adapter: MongoAdapter):
-    inferences = database_adapter.get_inference_list("507f191e810c19729de860ea")
+def test_get_inference_page(database_adapter: MongoAdapter):
+    inferences = asyncio.run(
+        database_adapter.get_inference_page("507f191e810c19729de860ea", 10)
+    )
 
     assert list(inferences) == [
         {
@@ -101,40 +122,219 @@ def test_get_inference_list(database_adapter: MongoAdapter):
     ]
 
 
+def test_get_inference_page_after(database_adapter: MongoAdapter):
+    first_page = asyncio.run(
+        database_adapter.get_inference_page("507f191e810c19729de860ea", 1)
+    )
+    assert [inference["_id"] for inference in first_page] == [
+        ObjectId("629f815d6abaa3c5e6cf7c16")
+    ]
+
+    second_page = asyncio.run(
+        database_adapter.get_inference_page(
+            "507f191e810c19729de860ea", 1, "629f815d6abaa3c5e6cf7c16"
+        )
+    )
+    assert [inference["_id"] for inference in second_page] == [
+        ObjectId("629f81986abaa3c5e6cf7c17")
+    ]
+
+    last_page = asyncio.run(
+        database_adapter.get_inference_page(
+            "507f191e810c19729de860ea", 1, "629f81986abaa3c5e6cf7c17"
+        )
+    )
+    assert list(last_page) == []
+
+
 def test_insert_inference(database_adapter: MongoAdapter):
     try:
-        database_adapter.insert_inference(
-            InferenceCreation(
-                age=20,
-                sex="F",
-                rgh="fake_rgh",
-                covid_status="Sim",
-                mask_type="None",
-                user_id="507f191e810c19729de860ea",
-                model_id="629f994245cda830033cf4cf",
-                status="processing",
-                created_in=str(datetime.datetime.now()),
+        asyncio.run(
+            database_adapter.insert_inference(
+                InferenceCreation(
+                    age=20,
+                    sex="F",
+                    rgh="fake_rgh",
+                    covid_status="Sim",
+                    mask_type="None",
+                    user_id="507f191e810c19729de860ea",
+                    model_id="629f994245cda830033cf4cf",
+                    status="processing",
+                    created_in=str(datetime.datetime.now()),
+                )
             )
         )
     except:
         pytest.fail("test_insert_inference failed")
 
 
+def _new_inference() -> InferenceCreation:
+    return InferenceCreation(
+        age=20,
+        sex="F",
+        rgh="fake_rgh",
+        covid_status="Sim",
+        mask_type="None",
+        user_id="507f191e810c19729de860ea",
+        model_id="629f994245cda830033cf4cf",
+        status="processing",
+        created_in="2022-07-18 17:07:16.954632",
+    )
+
+
+def _new_result(inference_id: str) -> ResultCreation:
+    return ResultCreation(
+        inference_id=inference_id, output=-1, diagnosis="not available"
+    )
+
+
+def test_insert_inference_with_outbox(database_adapter: MongoAdapter):
+    inference_id = database_adapter.create_id()
+    asyncio.run(
+        database_adapter.insert_inference_with_outbox(
+            inference_id,
+            _new_inference(),
+            _new_result(inference_id),
+            "fake_channel",
+            10.0,
+        )
+    )
+
+    inference = asyncio.run(
+        database_adapter.get_inference_by_id(inference_id, "507f191e810c19729de860ea")
+    )
+    assert inference == {"_id": ObjectId(inference_id), **_new_inference().dict()}
+    outbox_document = asyncio.run(
+        database_adapter._outbox.find_one({"_id": ObjectId(inference_id)})
+    )
+    assert outbox_document == {
+        "_id": ObjectId(inference_id),
+        "publishing_channel": "fake_channel",
+        "content": _new_inference().dict(),
+        "attempts": 0,
+        "available_at": 10.0,
+    }
+    result = asyncio.run(
+        database_adapter._results.find_one({"inference_id": inference_id})
+    )
+    assert result == {"_id": ANY, **_new_result(inference_id).dict()}
+
+
+def test_insert_inference_with_outbox_exception(database_adapter: MongoAdapter):
+    # the inference exists already, so its insertion fails
+    with pytest.raises(Exception):
+        asyncio.run(
+            database_adapter.insert_inference_with_outbox(
+                "629f815d6abaa3c5e6cf7c16",
+                _new_inference(),
+                _new_result("629f815d6abaa3c5e6cf7c16"),
+                "fake_channel",
+                10.0,
+            )
+        )
+
+    assert asyncio.run(database_adapter._outbox.count_documents({})) == 0
+    assert (
+        asyncio.run(
+            database_adapter._results.count_documents(
+                {"inference_id": "629f815d6abaa3c5e6cf7c16", "output": -1}
+            )
+        )
+        == 0
+    )
+
+
+def test_claim_outbox_messages(database_adapter: MongoAdapter):
+    inference_ids = [database_adapter.create_id() for _ in range(3)]
+    for available_at, inference_id in zip([12.0, 10.0, 30.0], inference_ids):
+        asyncio.run(
+            database_adapter.insert_inference_with_outbox(
+                inference_id,
+                _new_inference(),
+                _new_result(inference_id),
+                "fake_channel",
+                available_at,
+            )
+        )
+
+    claimed = asyncio.run(database_adapter.claim_outbox_messages(10, 20.0, 50.0))
+    assert {document["_id"] for document in claimed} == {
+        ObjectId(inference_ids[0]),
+        ObjectId(inference_ids[1]),
+    }
+    assert all(document["available_at"] == 50.0 for document in claimed)
+    # claimed documents are kept from the other dispatchers until the lease ends
+    assert asyncio.run(database_adapter.claim_outbox_messages(10, 20.0, 50.0)) == []
+
+    claimed = asyncio.run(database_adapter.claim_outbox_messages(1, 50.0, 80.0))
+    assert [document["_id"] for document in claimed] == [ObjectId(inference_ids[2])]
+
+
+def test_reschedule_and_delete_outbox_messages(database_adapter: MongoAdapter):
+    inference_ids = [database_adapter.create_id() for _ in range(2)]
+    for inference_id in inference_ids:
+        asyncio.run(
+            database_adapter.insert_inference_with_outbox(
+                inference_id,
+                _new_inference(),
+                _new_result(inference_id),
+                "fake_channel",
+                10.0,
+            )
+        )
+
+    asyncio.run(database_adapter.delete_outbox_messages([inference_ids[0]]))
+    asyncio.run(
+        database_adapter.reschedule_outbox_messages([(inference_ids[1], 2, 40.0)])
+    )
+
+    outbox_documents = asyncio.run(database_adapter._outbox.find().to_list(length=None))
+    assert len(outbox_documents) == 1
+    assert outbox_documents[0]["_id"] == ObjectId(inference_ids[1])
+    assert outbox_documents[0]["attempts"] == 2
+    assert outbox_documents[0]["available_at"] == 40.0
+
+
 def test_inference_status_update(database_adapter: MongoAdapter):
     try:
-        database_adapter.update_inference_status(
-            "629f815d6abaa3c5e6cf7c16", "completed"
+        asyncio.run(
+            database_adapter.update_inference_status(
+                "629f815d6abaa3c5e6cf7c16", "completed"
+            )
         )
     except:
         pytest.fail("test_update_inference_status failed")
-    updated_inference = database_adapter.get_inference_by_id(
-        "629f815d6abaa3c5e6cf7c16", "507f191e810c19729de860ea"
+    updated_inference = asyncio.run(
+        database_adapter.get_inference_by_id(
+            "629f815d6abaa3c5e6cf7c16", "507f191e810c19729de860ea"
+        )
     )
     assert updated_inference["status"] == "completed"
 
 
+def test_inference_statuses_update(database_adapter: MongoAdapter):
+    asyncio.run(
+        database_adapter.update_inference_statuses(
+            ["629f815d6abaa3c5e6cf7c16", "629f81986abaa3c5e6cf7c17"], "completed"
+        )
+    )
+    for inference_id in ["629f815d6abaa3c5e6cf7c16", "629f81986abaa3c5e6cf7c17"]:
+        updated_inference = asyncio.run(
+            database_adapter.get_inference_by_id(
+                inference_id, "507f191e810c19729de860ea"
+            )
+        )
+        assert updated_inference["status"] == "completed"
+    untouched_inference = asyncio.run(
+        database_adapter.get_inference_by_id(
+            "629e4f781ed5308d4b8212bc", "629d34d2663c15eb2ed15494"
+        )
+    )
+    assert untouched_inference["status"] == "processing"
+
+
 def test_get_model_by_id(database_adapter: MongoAdapter):
-    model = database_adapter.get_model_by_id("629f992d45cda830033cf4cd")
+    model = asyncio.run(database_adapter.get_model_by_id("629f992d45cda830033cf4cd"))
 
     assert model == {
         "_id": ObjectId("629f992d45cda830033cf4cd"),
@@ -145,7 +345,7 @@ def test_get_model_by_id(database_adapter: MongoAdapter):
 
 
 def test_get_model_list(database_adapter: MongoAdapter):
-    models = database_adapter.get_model_list()
+    models = asyncio.run(database_adapter.get_model_list())
     assert list(models) == [
         {
             "_id": ObjectId("629f992d45cda830033cf4cd"),
@@ -163,7 +363,9 @@ def test_get_model_list(database_adapter: MongoAdapter):
 
 
 def test_get_result_by_inference_id(database_adapter: MongoAdapter):
-    result = database_adapter.get_result_by_inference_id("629f815d6abaa3c5e6cf7c16")
+    result = asyncio.run(
+        database_adapter.get_result_by_inference_id("629f815d6abaa3c5e6cf7c16")
+    )
     assert result == {
         "_id": ObjectId("62abf2cd154f18493d74fcd2"),
         "inference_id": "629f815d6abaa3c5e6cf7c16",
@@ -172,13 +374,87 @@ def test_get_result_by_inference_id(database_adapter: MongoAdapter):
     }
 
 
+def test_get_inference_with_result(database_adapter: MongoAdapter):
+    inference = asyncio.run(
+        database_adapter.get_inference_with_result(
+            "629f815d6abaa3c5e6cf7c16", "507f191e810c19729de860ea"
+        )
+    )
+
+    assert inference == {
+        "_id": ObjectId("629f815d6abaa3c5e6cf7c16"),
+        "sex": "M",
+        "age": 23,
+        "rgh": "fake_rgh",
+        "covid_status": "Sim",
+        "mask_type": "None",
+        "user_id": "507f191e810c19729de860ea",
+        "model_id": "629f992d45cda830033cf4cd",
+        "status": "processing",
+        "created_in": "2022-07-18 17:07:16.954632",
+        "result": [
+            {
+                "_id": ObjectId("62abf2cd154f18493d74fcd2"),
+                "inference_id": "629f815d6abaa3c5e6cf7c16",
+                "output": 0.98765,
+                "diagnosis": "positive",
+            }
+        ],
+    }
+
+
+def test_get_inference_with_result_without_result(database_adapter: MongoAdapter):
+    inference = asyncio.run(
+        database_adapter.get_inference_with_result(
+            "629f81986abaa3c5e6cf7c17", "507f191e810c19729de860ea"
+        )
+    )
+
+    assert inference["_id"] == ObjectId("629f81986abaa3c5e6cf7c17")
+    assert inference["result"] == []
+
+
+def test_get_inference_with_result_of_another_user(database_adapter: MongoAdapter):
+    inference = asyncio.run(
+        database_adapter.get_inference_with_result(
+            "629f815d6abaa3c5e6cf7c16", "629d34d2663c15eb2ed15494"
+        )
+    )
+
+    assert inference is None
+
+
+def test_get_results_by_inference_ids(database_adapter: MongoAdapter):
+    inferences = asyncio.run(
+        database_adapter.get_results_by_inference_ids(
+            [
+                "629f815d6abaa3c5e6cf7c16",
+                "629f81986abaa3c5e6cf7c17",
+                "629e4f781ed5308d4b8212bc",
+            ],
+            "507f191e810c19729de860ea",
+        )
+    )
+
+    # the inference of another user is not returned
+    assert sorted(
+        (str(inference["_id"]), [result["_id"] for result in inference["result"]])
+        for inference in inferences
+    ) == [
+        ("629f815d6abaa3c5e6cf7c16", [ObjectId("62abf2cd154f18493d74fcd2")]),
+        ("629f81986abaa3c5e6cf7c17", []),
+    ]
+
+
 def test_insert_result(database_adapter: MongoAdapter):
     try:
-        database_adapter.insert_result(
-            ResultCreation(
-                inference_id="629f815d6abaa3c5e6cf7c16",
-                output=-1,
-                diagnosis="not available",
+        asyncio.run(
+            database_adapter.insert_result(
+                ResultCreation(
+                    inference_id="629f815d6abaa3c5e6cf7c16",
+                    output=-1,
+                    diagnosis="not available",
+                )
             )
         )
     except:
@@ -187,12 +463,97 @@ def test_insert_result(database_adapter: MongoAdapter):
 
 def test_update_result(database_adapter: MongoAdapter):
     try:
-        database_adapter.update_result(
-            ResultUpdate(
-                inference_id="629f815d6abaa3c5e6cf7c16",
-                output=0.987,
-                diagnosis="positive",
+        asyncio.run(
+            database_adapter.update_result(
+                ResultUpdate(
+                    inference_id="629f815d6abaa3c5e6cf7c16",
+                    output=0.987,
+                    diagnosis="positive",
+                )
             )
         )
     except:
         pytest.fail("test_update_result failed")
+
+
+def test_update_results(database_adapter: MongoAdapter):
+    asyncio.run(
+        database_adapter.update_results(
+            [
+                ResultUpdate(
+                    inference_id="629f815d6abaa3c5e6cf7c16",
+                    output=0.1,
+                    diagnosis="negative",
+                ),
+                ResultUpdate(
+                    inference_id="629f815d6abaa3c5e6cf7c16",
+                    output=0.987,
+                    diagnosis="positive",
+                ),
+            ]
+        )
+    )
+    result = asyncio.run(
+        database_adapter.get_result_by_inference_id("629f815d6abaa3c5e6cf7c16")
+    )
+    assert result == {
+        "_id": ObjectId("62abf2cd154f18493d74fcd2"),
+        "inference_id": "629f815d6abaa3c5e6cf7c16",
+        "output": 0.987,
+        "diagnosis": "positive",
+    }
+
+
+def test_update_results_repeated(database_adapter: MongoAdapter):
+    result_update = ResultUpdate(
+        inference_id="629f815d6abaa3c5e6cf7c16", output=0.5, diagnosis="negative"
+    )
+    update_filter = database_adapter._get_result_update_filter(result_update)
+
+    assert asyncio.run(database_adapter._results.count_documents(update_filter)) == 1
+    asyncio.run(database_adapter.update_results([result_update]))
+    # the update is already applied, repeating it matches nothing to rewrite
+    assert asyncio.run(database_adapter._results.count_documents(update_filter)) == 0
+    asyncio.run(database_adapter.update_results([result_update]))
+
+    result = asyncio.run(
+        database_adapter.get_result_by_inference_id("629f815d6abaa3c5e6cf7c16")
+    )
+    assert result["output"] == 0.5
+    assert result["diagnosis"] == "negative"
+
+
+def test_get_missing_indexes(database_adapter: MongoAdapter):
+    missing_indexes = asyncio.run(database_adapter.get_missing_indexes())
+    assert missing_indexes == {
+        "users": ["username_1", "email_1"],
+        "inferences": ["user_id_1_created_in_1", "user_id_1__id_1"],
+        "results": ["inference_id_1"],
+        "outbox": ["available_at_1", "claim_1"],
+    }
+
+
+def test_ensure_indexes(database_adapter: MongoAdapter):
+    asyncio.run(database_adapter.ensure_indexes())
+    # creating them again must not fail
+    asyncio.run(database_adapter.ensure_indexes())
+
+    assert asyncio.run(database_adapter.get_missing_indexes()) == {}
+    assert asyncio.run(database_adapter._users.index_information())["username_1"][
+        "unique"
+    ]
+    assert asyncio.run(database_adapter._users.index_information())["email_1"]["unique"]
+
+
+def test_ensure_indexes_duplicated_values(database_adapter: MongoAdapter):
+    asyncio.run(
+        database_adapter._users.insert_one(
+            {"username": "test_username", "email": "other_email", "password": "fake"}
+        )
+    )
+
+    asyncio.run(database_adapter.ensure_indexes())
+
+    assert asyncio.run(database_adapter.get_missing_indexes()) == {
+        "users": ["username_1"]
+    }
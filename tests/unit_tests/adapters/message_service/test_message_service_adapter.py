@@ -1,8 +1,11 @@
 import json
-from mock import ANY, MagicMock, call, patch
+from typing import Optional
+from mock import ANY, AsyncMock, MagicMock, Mock, call, patch
+from nats.aio.client import Client
+from nats.js.api import RetentionPolicy
 from pydantic import BaseModel
 from adapters.message_service.nats_adapter import NATSAdapter
-from tests.mocks.nats_mock import NATSMock
+from tests.mocks.nats_mock import JetStreamMock, NATSMock
 import pytest
 import asyncio
 
@@ -18,11 +21,11 @@ def message_service_adapter():
 
 
 def test_send_message(message_service_adapter: NATSAdapter):
-    async def fake_publish(topic: str, message: bytes):
+    async def fake_publish(topic: str, message: bytes, headers: dict):
         pass
 
     with patch.object(
-        message_service_adapter._nc,
+        message_service_adapter._publishers[0],
         "publish",
         MagicMock(side_effect=fake_publish),
     ) as mock_method:
@@ -35,8 +38,9 @@ def test_send_message(message_service_adapter: NATSAdapter):
                             "model_id": "fake_model_id",
                             "inference_id": "fake_inference_id",
                         }
-                    ),
+                    ).encode("utf-8"),
                     "fake_topic",
+                    "application/json",
                 )
             )
             assert True
@@ -45,13 +49,70 @@ def test_send_message(message_service_adapter: NATSAdapter):
         mock_method.assert_called_once_with(
             "fake_topic",
             b'{"anything": 123, "model_id": "fake_model_id", "inference_id": "fake_inference_id"}',
+            headers={"Content-Type": "application/json"},
         )
 
 
+def test_send_message_round_robin(message_service_adapter: NATSAdapter):
+    message_service_adapter._publishers = [Mock(spec=Client), Mock(spec=Client)]
+
+    asyncio.run(message_service_adapter.send_message(b"first", "fake_topic"))
+    asyncio.run(message_service_adapter.send_message(b"second", "fake_topic"))
+    asyncio.run(message_service_adapter.send_message(b"third", "fake_topic"))
+
+    assert message_service_adapter._publishers[0].publish.call_args_list == [
+        call("fake_topic", b"first", headers=None),
+        call("fake_topic", b"third", headers=None),
+    ]
+    assert message_service_adapter._publishers[1].publish.call_args_list == [
+        call("fake_topic", b"second", headers=None),
+    ]
+
+
+def test_connect_once(message_service_adapter: NATSAdapter):
+    publisher = message_service_adapter._publishers[0]
+    publisher.is_connected = False
+    publisher.is_reconnecting = False
+
+    async def fake_connect(*args, **kwargs):
+        publisher.is_connected = True
+
+    publisher.connect.side_effect = fake_connect
+
+    async def send_concurrently():
+        await asyncio.gather(
+            *[
+                message_service_adapter.send_message(b"message", "fake_topic")
+                for _ in range(5)
+            ]
+        )
+
+    asyncio.run(send_concurrently())
+    asyncio.run(message_service_adapter.send_message(b"message", "fake_topic"))
+
+    publisher.connect.assert_called_once_with(
+        "fake_url", ping_interval=1, allow_reconnect=True, max_reconnect_attempts=-1
+    )
+    assert publisher.publish.call_count == 6
+
+
+def test_connect_skips_reconnecting_publisher(message_service_adapter: NATSAdapter):
+    publisher = message_service_adapter._publishers[0]
+    publisher.is_connected = False
+    publisher.is_reconnecting = True
+
+    asyncio.run(message_service_adapter.connect())
+
+    publisher.connect.assert_not_called()
+
+
 def test_subscribe(message_service_adapter: NATSAdapter):
-    async def fake_subscribe(topic: str):
+    async def fake_subscribe(topic: str, queue: str, cb):
         return "return_value_of_subscription"
 
+    async def fake_callback(message: bytes, content_type: Optional[str]):
+        pass
+
     with patch.object(
         message_service_adapter._receiving_nc,
         "subscribe",
@@ -61,48 +122,251 @@ def test_subscribe(message_service_adapter: NATSAdapter):
             asyncio.run(
                 message_service_adapter.subscribe(
                     "fake_topic",
+                    fake_callback,
                 )
             )
             assert True
         except:
             assert False
 
-        mock_method.assert_called_once_with("fake_topic")
+        mock_method.assert_called_once_with("fake_topic", queue="", cb=ANY)
         assert (
             message_service_adapter._subs["fake_topic"]
             == "return_value_of_subscription"
         )
 
 
-def test_wait_for_message(message_service_adapter: NATSAdapter):
-    async def fake_next_msg():
-        class ResponseMock(BaseModel):
-            data: bytes
+def test_subscribe_in_queue_group(message_service_adapter: NATSAdapter):
+    async def fake_subscribe(topic: str, queue: str, cb):
+        pass
+
+    async def fake_callback(message: bytes, content_type: Optional[str]):
+        pass
+
+    with patch.object(
+        message_service_adapter._receiving_nc,
+        "subscribe",
+        MagicMock(side_effect=fake_subscribe),
+    ) as mock_method:
+        asyncio.run(
+            message_service_adapter.subscribe(
+                "fake_topic", fake_callback, "fake_queue_group"
+            )
+        )
 
-        return ResponseMock(
-            data=str.encode("return_value_of_next_msg", encoding="utf-8")
+        mock_method.assert_called_once_with(
+            "fake_topic", queue="fake_queue_group", cb=ANY
         )
 
-    class SubscriptionMock:
-        def __init__(self):
-            pass
 
-        async def next_msg(self):
-            return "fake_response"
+def test_subscribe_pushes_messages(message_service_adapter: NATSAdapter):
+    class MessageMock(BaseModel):
+        data: bytes
+        headers: Optional[dict]
 
-    message_service_adapter._subs["fake_topic"] = SubscriptionMock()
-    with patch.object(
-        message_service_adapter._subs["fake_topic"],
-        "next_msg",
-        MagicMock(side_effect=fake_next_msg),
-    ) as mock_method:
-        try:
-            asyncio.run(
-                message_service_adapter.wait_for_message(
-                    "fake_topic",
-                )
+    received_messages = []
+
+    async def fake_callback(message: bytes, content_type: Optional[str]):
+        received_messages.append((message, content_type))
+
+    async def subscribe_and_receive():
+        await message_service_adapter.subscribe("fake_topic", fake_callback)
+        message_handler = message_service_adapter._receiving_nc.subscribe.call_args[1][
+            "cb"
+        ]
+        await message_handler(
+            MessageMock(data=b'{"inference_id": "first"}', headers=None)
+        )
+        await message_handler(
+            MessageMock(
+                data=b"\x81\xacinference_id\xa6second",
+                headers={"Content-Type": "application/msgpack"},
             )
-            assert True
-        except:
-            assert False
-        mock_method.assert_called_once()
+        )
+
+    asyncio.run(subscribe_and_receive())
+
+    assert received_messages == [
+        (b'{"inference_id": "first"}', None),
+        (b"\x81\xacinference_id\xa6second", "application/msgpack"),
+    ]
+
+
+async def wait_for_durable_handlers(adapter: NATSAdapter):
+    while adapter._durable_handlers:
+        await asyncio.gather(*adapter._durable_handlers)
+
+
+def test_subscribe_durable(message_service_adapter: NATSAdapter):
+    jetstream = JetStreamMock()
+    received_messages = []
+
+    async def fake_callback(message: bytes, content_type: Optional[str]):
+        received_messages.append(message)
+
+    async def subscribe_and_receive():
+        await message_service_adapter.subscribe_durable(
+            "fake_topic",
+            fake_callback,
+            "fake_stream",
+            "fake_durable",
+            3,
+            30,
+            10,
+            "fake_dead_letter_topic",
+            3600,
+        )
+        await jetstream.publish(b'{"inference_id": "first"}')
+        await wait_for_durable_handlers(message_service_adapter)
+
+    with patch.object(
+        message_service_adapter._receiving_nc,
+        "jetstream",
+        MagicMock(return_value=jetstream),
+    ), patch.object(
+        message_service_adapter._receiving_nc, "publish", AsyncMock()
+    ) as mock_publish:
+        asyncio.run(subscribe_and_receive())
+
+        assert jetstream.streams["fake_stream"].subjects == ["fake_topic"]
+        assert jetstream.streams["fake_stream"].retention == RetentionPolicy.WORK_QUEUE
+        assert jetstream.streams["fake_stream"].max_age == 3600
+        assert jetstream.messages == {}
+        assert jetstream.config.max_deliver == 3
+        assert jetstream.config.ack_wait == 30
+        assert jetstream.config.max_ack_pending == 10
+        assert received_messages == [b'{"inference_id": "first"}']
+        assert jetstream.acked == [b'{"inference_id": "first"}']
+        mock_publish.assert_not_called()
+
+
+def test_subscribe_durable_redelivery(message_service_adapter: NATSAdapter):
+    jetstream = JetStreamMock()
+    attempts = []
+
+    async def fake_callback(message: bytes, content_type: Optional[str]):
+        attempts.append(message)
+        if len(attempts) < 3:
+            raise Exception()
+
+    async def subscribe_and_receive():
+        await message_service_adapter.subscribe_durable(
+            "fake_topic",
+            fake_callback,
+            "fake_stream",
+            "fake_durable",
+            3,
+            30,
+            10,
+            "fake_dead_letter_topic",
+            3600,
+        )
+        await jetstream.publish(b"fake_message")
+        await wait_for_durable_handlers(message_service_adapter)
+
+    with patch.object(
+        message_service_adapter._receiving_nc,
+        "jetstream",
+        MagicMock(return_value=jetstream),
+    ), patch.object(
+        message_service_adapter._receiving_nc, "publish", AsyncMock()
+    ) as mock_publish:
+        asyncio.run(subscribe_and_receive())
+
+        assert len(attempts) == 3
+        assert jetstream.acked == [b"fake_message"]
+        mock_publish.assert_not_called()
+
+
+def test_subscribe_durable_dead_letter(message_service_adapter: NATSAdapter):
+    jetstream = JetStreamMock()
+    attempts = []
+
+    async def fake_callback(message: bytes, content_type: Optional[str]):
+        attempts.append(message)
+        raise Exception()
+
+    async def subscribe_and_receive():
+        await message_service_adapter.subscribe_durable(
+            "fake_topic",
+            fake_callback,
+            "fake_stream",
+            "fake_durable",
+            3,
+            30,
+            10,
+            "fake_dead_letter_topic",
+            3600,
+        )
+        await jetstream.publish(b"poison_message")
+        await wait_for_durable_handlers(message_service_adapter)
+
+    with patch.object(
+        message_service_adapter._receiving_nc,
+        "jetstream",
+        MagicMock(return_value=jetstream),
+    ), patch.object(
+        message_service_adapter._receiving_nc, "publish", AsyncMock()
+    ) as mock_publish:
+        asyncio.run(subscribe_and_receive())
+
+        assert len(attempts) == 3
+        assert jetstream.acked == []
+        assert jetstream.terminated == [b"poison_message"]
+        mock_publish.assert_called_once_with(
+            "fake_dead_letter_topic", b"poison_message"
+        )
+
+
+def test_subscribe_durable_max_deliveries_advisory(
+    message_service_adapter: NATSAdapter,
+):
+    jetstream = JetStreamMock()
+    subscriptions = {}
+
+    async def fake_subscribe(subject: str, queue: str, cb):
+        subscriptions[subject] = (queue, cb)
+
+    async def fake_callback(message: bytes, content_type: Optional[str]):
+        # the last delivery is still being processed when its ack wait expires
+        await asyncio.sleep(3600)
+
+    async def subscribe_and_time_out():
+        await message_service_adapter.subscribe_durable(
+            "fake_topic",
+            fake_callback,
+            "fake_stream",
+            "fake_durable",
+            3,
+            30,
+            10,
+            "fake_dead_letter_topic",
+            3600,
+        )
+        timed_out_seq = await jetstream.publish(b"slow_message")
+        queue, advisory_handler = subscriptions[
+            "$JS.EVENT.ADVISORY.CONSUMER.MAX_DELIVERIES.fake_stream.fake_durable"
+        ]
+        assert queue == "fake_durable"
+        advisory = Mock(data=json.dumps({"stream_seq": timed_out_seq}).encode())
+        await advisory_handler(advisory)
+        # an advisory of a message already acknowledged or terminated is skipped
+        await advisory_handler(advisory)
+        for handler in message_service_adapter._durable_handlers:
+            handler.cancel()
+
+    with patch.object(
+        message_service_adapter._receiving_nc,
+        "jetstream",
+        MagicMock(return_value=jetstream),
+    ), patch.object(
+        message_service_adapter._receiving_nc,
+        "subscribe",
+        MagicMock(side_effect=fake_subscribe),
+    ), patch.object(
+        message_service_adapter._receiving_nc, "publish", AsyncMock()
+    ) as mock_publish:
+        asyncio.run(subscribe_and_time_out())
+
+        mock_publish.assert_called_once_with("fake_dead_letter_topic", b"slow_message")
+        assert jetstream.messages == {}
@@ -4,7 +4,7 @@ from fastapi.testclient import TestClient
 from fastapi import status
 import pytest
 from core.model.exception import LogicException
-from core.model.inference import Inference, InferenceCreationForm
+from core.model.inference import Inference, InferenceCreationForm, InferencePage
 from core.model.result import ResultCreation
 from core.model.token import Token
 from core.model.user import User, UserCreationForm
@@ -64,8 +64,8 @@ def test_get_inference_by_id_success(client_with_auth: TestClient):
             ANY,
             "629f815d6abaa3c5e6cf7c16",
             "507f191e810c19729de860ea",
-            Token(content="mock_token"),
         )
+        assert mock_get_by_id.call_args.args[0].token == Token(content="mock_token")
         assert response.json() == {
             "id": "629f815d6abaa3c5e6cf7c16",
             "sex": "M",
@@ -81,6 +81,48 @@ def test_get_inference_by_id_success(client_with_auth: TestClient):
         assert response.status_code == 200
 
 
+def test_get_inference_by_id_not_modified(client_with_auth: TestClient):
+    inference = Inference(
+        **{
+            "id": "629f815d6abaa3c5e6cf7c16",
+            "sex": "M",
+            "age": 23,
+            "rgh": "fake_rgh",
+            "covid_status": "Sim",
+            "mask_type": "None",
+            "user_id": "507f191e810c19729de860ea",
+            "model_id": "629f992d45cda830033cf4cd",
+            "status": "processing",
+            "created_in": "2022-07-18 17:07:16.954632",
+        }
+    )
+    with patch("adapters.routers.v1.inference_router.get_by_id") as mock_get_by_id:
+        mock_get_by_id.return_value = inference
+        headers = {"Authorization": "Bearer mock_token"}
+        response = client_with_auth.get(
+            "/v1/users/507f191e810c19729de860ea/inferences/629f815d6abaa3c5e6cf7c16",
+            headers=headers,
+        )
+        etag = response.headers["ETag"]
+
+        response = client_with_auth.get(
+            "/v1/users/507f191e810c19729de860ea/inferences/629f815d6abaa3c5e6cf7c16",
+            headers={**headers, "If-None-Match": etag},
+        )
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["ETag"] == etag
+
+        mock_get_by_id.return_value = inference.copy(update={"status": "completed"})
+        response = client_with_auth.get(
+            "/v1/users/507f191e810c19729de860ea/inferences/629f815d6abaa3c5e6cf7c16",
+            headers={**headers, "If-None-Match": etag},
+        )
+        assert response.status_code == 200
+        assert response.json()["status"] == "completed"
+        assert response.headers["ETag"] != etag
+
+
 def test_get_inference_by_id_exception(client_with_auth: TestClient):
     with patch(
         "adapters.routers.v1.inference_router.get_by_id"
@@ -99,7 +141,6 @@ def test_get_inference_by_id_exception(client_with_auth: TestClient):
             ANY,
             "invalid_id",
             "507f191e810c19729de860ea",
-            Token(content="mock_token"),
         )
         assert response.status_code == 422
         assert response.json() == {"detail": "inference id is not valid"}
@@ -108,36 +149,39 @@ def test_get_inference_by_id_exception(client_with_auth: TestClient):
 def test_get_inference_list_success(client_with_auth: TestClient):
 
     with patch("adapters.routers.v1.inference_router.get_list") as mock_get_list:
-        mock_get_list.return_value = [
-            Inference(
-                **{
-                    "id": "629f815d6abaa3c5e6cf7c16",
-                    "sex": "M",
-                    "age": 23,
-                    "rgh": "fake_rgh",
-                    "covid_status": "Sim",
-                    "mask_type": "None",
-                    "user_id": "507f191e810c19729de860ea",
-                    "model_id": "629f992d45cda830033cf4cd",
-                    "status": "processing",
-                    "created_in": "2022-07-18 17:07:16.954632",
-                }
-            ),
-            Inference(
-                **{
-                    "id": "629f81986abaa3c5e6cf7c17",
-                    "sex": "F",
-                    "age": 32,
-                    "rgh": "fake_rgh",
-                    "covid_status": "Sim",
-                    "mask_type": "None",
-                    "user_id": "507f191e810c19729de860ea",
-                    "model_id": "629f994245cda830033cf4cf",
-                    "status": "processing",
-                    "created_in": "2022-07-18 17:07:16.954632",
-                }
-            ),
-        ]
+        mock_get_list.return_value = InferencePage(
+            inferences=[
+                Inference(
+                    **{
+                        "id": "629f815d6abaa3c5e6cf7c16",
+                        "sex": "M",
+                        "age": 23,
+                        "rgh": "fake_rgh",
+                        "covid_status": "Sim",
+                        "mask_type": "None",
+                        "user_id": "507f191e810c19729de860ea",
+                        "model_id": "629f992d45cda830033cf4cd",
+                        "status": "processing",
+                        "created_in": "2022-07-18 17:07:16.954632",
+                    }
+                ),
+                Inference(
+                    **{
+                        "id": "629f81986abaa3c5e6cf7c17",
+                        "sex": "F",
+                        "age": 32,
+                        "rgh": "fake_rgh",
+                        "covid_status": "Sim",
+                        "mask_type": "None",
+                        "user_id": "507f191e810c19729de860ea",
+                        "model_id": "629f994245cda830033cf4cf",
+                        "status": "processing",
+                        "created_in": "2022-07-18 17:07:16.954632",
+                    }
+                ),
+            ],
+            next_cursor="629f81986abaa3c5e6cf7c17",
+        )
         headers = {"Authorization": "Bearer mock_token"}
         response = client_with_auth.get(
             "/v1/users/507f191e810c19729de860ea/inferences",
@@ -148,7 +192,8 @@ def test_get_inference_list_success(client_with_auth: TestClient):
             ANY,
             ANY,
             "507f191e810c19729de860ea",
-            Token(content="mock_token"),
+            50,
+            None,
         )
         assert response.json() == {
             "inferences": [
@@ -176,11 +221,51 @@ def test_get_inference_list_success(client_with_auth: TestClient):
                     "status": "processing",
                     "created_in": "2022-07-18 17:07:16.954632",
                 },
-            ]
+            ],
+            "next_cursor": "629f81986abaa3c5e6cf7c17",
         }
         assert response.status_code == 200
 
 
+def test_get_inference_list_page_parameters(client_with_auth: TestClient):
+    with patch("adapters.routers.v1.inference_router.get_list") as mock_get_list:
+        mock_get_list.return_value = InferencePage(inferences=[], next_cursor=None)
+        headers = {"Authorization": "Bearer mock_token"}
+        response = client_with_auth.get(
+            "/v1/users/507f191e810c19729de860ea/inferences"
+            "?limit=20&after=629f81986abaa3c5e6cf7c17",
+            headers=headers,
+        )
+
+        mock_get_list.assert_called_once_with(
+            ANY,
+            ANY,
+            "507f191e810c19729de860ea",
+            20,
+            "629f81986abaa3c5e6cf7c17",
+        )
+        assert response.json() == {"inferences": [], "next_cursor": None}
+        assert response.status_code == 200
+
+
+@pytest.mark.parametrize(
+    "query",
+    ["limit=0", "limit=201", "after=not_an_id"],
+)
+def test_get_inference_list_invalid_page_parameters(
+    client_with_auth: TestClient, query: str
+):
+    with patch("adapters.routers.v1.inference_router.get_list") as mock_get_list:
+        headers = {"Authorization": "Bearer mock_token"}
+        response = client_with_auth.get(
+            f"/v1/users/507f191e810c19729de860ea/inferences?{query}",
+            headers=headers,
+        )
+
+        mock_get_list.assert_not_called()
+        assert response.status_code == 422
+
+
 def test_get_inference_list_exception(client_with_auth: TestClient):
     with patch("adapters.routers.v1.inference_router.get_list") as mock_get_list_failed:
         mock_get_list_failed.side_effect = LogicException(
@@ -196,14 +281,15 @@ def test_get_inference_list_exception(client_with_auth: TestClient):
             ANY,
             ANY,
             "507f191e810c19729de860ea",
-            Token(content="mock_token"),
+            50,
+            None,
         )
         assert response.status_code == 403
         assert response.json() == {"detail": "Forbidden operation"}
 
 
 def test_post_create_inference_and_result_success(client_with_auth: TestClient):
-    def fake_insert_result(new_result: ResultCreation):
+    async def fake_insert_result(new_result: ResultCreation):
         pass
 
     with patch(
@@ -242,7 +328,6 @@ def test_post_create_inference_and_result_success(client_with_auth: TestClient):
             ANY,
             ANY,
             ANY,
-            ANY,
             "507f191e810c19729de860ea",
             InferenceCreationForm(
                 **{
@@ -255,15 +340,12 @@ def test_post_create_inference_and_result_success(client_with_auth: TestClient):
                 }
             ),
             ANY,
-            Token(content="mock_token"),
         )
-        fake_result_insert.assert_called_once_with(
-            ResultCreation(
-                inference_id="fake_inference_id",
-                output=-1,
-                diagnosis="not available",
-            )
+        assert mock_create_inference.call_args.args[1].token == Token(
+            content="mock_token"
         )
+        # the result is inserted with the inference, by create_new_inference
+        fake_result_insert.assert_not_called()
         assert response.status_code == 200
         assert response.json() == {"message": "inference registered!"}
 
@@ -303,7 +385,6 @@ def test_post_create_inference_exception(client_with_auth: TestClient):
             ANY,
             ANY,
             ANY,
-            ANY,
             "507f191e810c19729de860ea",
             InferenceCreationForm(
                 **{
@@ -316,7 +397,6 @@ def test_post_create_inference_exception(client_with_auth: TestClient):
                 }
             ),
             ANY,
-            Token(content="mock_token"),
         )
         assert response.status_code == 500
         assert response.json() == {"detail": "cound not create new inference"}
@@ -59,6 +59,33 @@ def test_get_model_by_id_success(client_with_auth: TestClient):
         }
 
 
+def test_get_model_by_id_not_modified(client_with_auth: TestClient):
+    with patch("adapters.routers.v1.model_router.get_by_id") as mock_get_by_id:
+        mock_get_by_id.return_value = Model(
+            **{
+                "id": "629f992d45cda830033cf4cd",
+                "name": "fake_model",
+                "receiving_channel": "fake_channel_1",
+                "publishing_channel": "fake_channel_2",
+            }
+        )
+        headers = {"Authorization": "Bearer mock_token"}
+        response = client_with_auth.get(
+            "/v1/models/629f992d45cda830033cf4cd", headers=headers
+        )
+        etag = response.headers["ETag"]
+        assert response.headers["Cache-Control"] == "private, max-age=60"
+
+        response = client_with_auth.get(
+            "/v1/models/629f992d45cda830033cf4cd",
+            headers={**headers, "If-None-Match": etag},
+        )
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["ETag"] == etag
+        assert response.headers["Cache-Control"] == "private, max-age=60"
+
+
 def test_get_model_by_id_exception(client_with_auth: TestClient):
     with patch("adapters.routers.v1.model_router.get_by_id") as mock_get_by_id_failed:
         mock_get_by_id_failed.side_effect = LogicException(
@@ -1,15 +1,20 @@
 from fastapi.testclient import TestClient
 import pytest
 from fastapi import status
-from unittest.mock import ANY, patch, MagicMock
+from unittest.mock import ANY, AsyncMock, patch, MagicMock
 from core.model.exception import LogicException
-from core.model.token import Token
 
 from adapters.routers.app import create_app
 
 from core.ports.database_port import DatabasePort
 from core.model.inference import Inference, InferenceCreation
-from core.model.result import Result, ResultCreation
+from core.model.result import (
+    InferenceStatusUpdate,
+    Result,
+    ResultCreation,
+    ResultUpdate,
+)
+from core.services.result_hub import ResultHub
 
 from tests.mocks.mongo_mock import MongoMock
 
@@ -75,7 +80,8 @@ def test_get_result_by_inference_id_success(client_with_auth: TestClient):
             ANY,
             "629f815d6abaa3c5e6cf7c16",
             "507f191e810c19729de860ea",
-            Token(content="mock_token"),
+            ANY,
+            0,
         )
         assert response.json() == {
             "inference": {
@@ -100,6 +106,91 @@ def test_get_result_by_inference_id_success(client_with_auth: TestClient):
         assert response.status_code == 200
 
 
+def test_get_result_not_modified(client_with_auth: TestClient):
+    inference = Inference(
+        **{
+            "id": "629f815d6abaa3c5e6cf7c16",
+            "sex": "M",
+            "age": 23,
+            "rgh": "fake_rgh",
+            "covid_status": "Sim",
+            "mask_type": "None",
+            "user_id": "507f191e810c19729de860ea",
+            "model_id": "629f992d45cda830033cf4cd",
+            "status": "processing",
+            "created_in": "2022-07-18 17:07:16.954632",
+        },
+    )
+    result = Result(
+        **{
+            "id": "62abf2cd154f18493d74fcd2",
+            "inference_id": "629f815d6abaa3c5e6cf7c16",
+            "output": -1,
+            "diagnosis": "not available",
+        }
+    )
+    with patch(
+        "adapters.routers.v1.result_router.get_inference_result"
+    ) as mock_get_result:
+        mock_get_result.return_value = inference, result
+        headers = {"Authorization": "Bearer mock_token"}
+        response = client_with_auth.get(
+            "/v1/users/507f191e810c19729de860ea/inferences/629f815d6abaa3c5e6cf7c16/result",
+            headers=headers,
+        )
+        etag = response.headers["ETag"]
+
+        response = client_with_auth.get(
+            "/v1/users/507f191e810c19729de860ea/inferences/629f815d6abaa3c5e6cf7c16/result",
+            headers={**headers, "If-None-Match": f'"fake_etag", W/{etag}'},
+        )
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["ETag"] == etag
+
+        mock_get_result.return_value = (
+            inference.copy(update={"status": "completed"}),
+            result.copy(update={"output": 0.98765, "diagnosis": "positive"}),
+        )
+        response = client_with_auth.get(
+            "/v1/users/507f191e810c19729de860ea/inferences/629f815d6abaa3c5e6cf7c16/result",
+            headers={**headers, "If-None-Match": etag},
+        )
+        assert response.status_code == 200
+        assert response.json()["result"]["diagnosis"] == "positive"
+        assert response.headers["ETag"] != etag
+
+
+def test_get_result_wait_parameter(client_with_auth: TestClient):
+    with patch(
+        "adapters.routers.v1.result_router.get_inference_result"
+    ) as mock_get_result:
+        mock_get_result.side_effect = LogicException(
+            "result not found", status.HTTP_404_NOT_FOUND
+        )
+        headers = {"Authorization": "Bearer mock_token"}
+        response = client_with_auth.get(
+            "/v1/users/507f191e810c19729de860ea/inferences/629f815d6abaa3c5e6cf7c16/result?wait=30",
+            headers=headers,
+        )
+
+        mock_get_result.assert_called_once_with(
+            ANY,
+            ANY,
+            "629f815d6abaa3c5e6cf7c16",
+            "507f191e810c19729de860ea",
+            ANY,
+            30,
+        )
+        assert response.status_code == 404
+
+        response = client_with_auth.get(
+            "/v1/users/507f191e810c19729de860ea/inferences/629f815d6abaa3c5e6cf7c16/result?wait=3600",
+            headers=headers,
+        )
+        assert response.status_code == 422
+
+
 def test_get_result_by_inference_id_exception(client_with_auth: TestClient):
     with patch(
         "adapters.routers.v1.result_router.get_inference_result"
@@ -118,12 +209,250 @@ def test_get_result_by_inference_id_exception(client_with_auth: TestClient):
             ANY,
             "629f815d6abaa3c5e6cf7c16",
             "507f191e810c19729de860ea",
-            Token(content="mock_token"),
+            ANY,
+            0,
         )
         assert response.status_code == 422
         assert response.json() == {"detail": "inference id is not valid"}
 
 
+def test_batch_get_results_success(client_with_auth: TestClient):
+    with patch(
+        "adapters.routers.v1.result_router.batch_get_inference_results"
+    ) as mock_batch_get:
+        mock_batch_get.return_value = [
+            (
+                Inference(
+                    **{
+                        "id": "629f815d6abaa3c5e6cf7c16",
+                        "sex": "M",
+                        "age": 23,
+                        "rgh": "fake_rgh",
+                        "covid_status": "Sim",
+                        "mask_type": "None",
+                        "user_id": "507f191e810c19729de860ea",
+                        "model_id": "629f992d45cda830033cf4cd",
+                        "status": "completed",
+                        "created_in": "2022-07-18 17:07:16.954632",
+                    },
+                ),
+                Result(
+                    **{
+                        "id": "62abf2cd154f18493d74fcd2",
+                        "inference_id": "629f815d6abaa3c5e6cf7c16",
+                        "output": 0.98765,
+                        "diagnosis": "positive",
+                    }
+                ),
+            )
+        ]
+        response = client_with_auth.post(
+            "/v1/users/507f191e810c19729de860ea/results:batchGet",
+            headers={"Authorization": "Bearer mock_token"},
+            json={"inference_ids": ["629f815d6abaa3c5e6cf7c16"]},
+        )
+
+        mock_batch_get.assert_called_once_with(
+            ANY, ANY, "507f191e810c19729de860ea", ["629f815d6abaa3c5e6cf7c16"]
+        )
+        assert response.status_code == 200
+        assert response.json() == {
+            "results": [
+                {
+                    "inference": {
+                        "id": "629f815d6abaa3c5e6cf7c16",
+                        "sex": "M",
+                        "age": 23,
+                        "rgh": "fake_rgh",
+                        "covid_status": "Sim",
+                        "mask_type": "None",
+                        "user_id": "507f191e810c19729de860ea",
+                        "model_id": "629f992d45cda830033cf4cd",
+                        "status": "completed",
+                        "created_in": "2022-07-18 17:07:16.954632",
+                    },
+                    "result": {
+                        "id": "62abf2cd154f18493d74fcd2",
+                        "inference_id": "629f815d6abaa3c5e6cf7c16",
+                        "output": 0.98765,
+                        "diagnosis": "positive",
+                    },
+                }
+            ]
+        }
+
+
+def test_batch_get_results_invalid_body(client_with_auth: TestClient):
+    headers = {"Authorization": "Bearer mock_token"}
+    response = client_with_auth.post(
+        "/v1/users/507f191e810c19729de860ea/results:batchGet",
+        headers=headers,
+        json={"inference_ids": []},
+    )
+    assert response.status_code == 422
+
+    response = client_with_auth.post(
+        "/v1/users/507f191e810c19729de860ea/results:batchGet",
+        headers=headers,
+        json={"inference_ids": ["629f815d6abaa3c5e6cf7c16"] * 201},
+    )
+    assert response.status_code == 422
+
+    response = client_with_auth.post(
+        "/v1/users/507f191e810c19729de860ea/results:batchDelete",
+        headers=headers,
+        json={"inference_ids": ["629f815d6abaa3c5e6cf7c16"]},
+    )
+    assert response.status_code == 422
+
+
+def test_batch_get_results_exception(client_with_auth: TestClient):
+    with patch(
+        "adapters.routers.v1.result_router.batch_get_inference_results"
+    ) as mock_batch_get:
+        mock_batch_get.side_effect = LogicException(
+            "inference not found", status.HTTP_404_NOT_FOUND
+        )
+        response = client_with_auth.post(
+            "/v1/users/507f191e810c19729de860ea/results:batchGet",
+            headers={"Authorization": "Bearer mock_token"},
+            json={"inference_ids": ["629f815d6abaa3c5e6cf7c99"]},
+        )
+
+        assert response.status_code == 404
+        assert response.json() == {"detail": "inference not found"}
+
+
+def test_stream_results_success(client_with_auth: TestClient):
+    result_hub = ResultHub()
+    subscription = result_hub.subscribe(
+        ["629f815d6abaa3c5e6cf7c16", "629f81986abaa3c5e6cf7c17"]
+    )
+    subscription.put(
+        ResultUpdate(
+            inference_id="629f81986abaa3c5e6cf7c17", output=0.5, diagnosis="negative"
+        )
+    )
+    finished = [
+        (
+            Inference(
+                id="629f815d6abaa3c5e6cf7c16",
+                sex="M",
+                age=23,
+                rgh="fake_rgh",
+                covid_status="Sim",
+                mask_type="None",
+                user_id="507f191e810c19729de860ea",
+                model_id="629f992d45cda830033cf4cd",
+                status="error",
+                created_in="2022-07-18 17:07:16.954632",
+            ),
+            Result(
+                id="62abf2cd154f18493d74fcd2",
+                inference_id="629f815d6abaa3c5e6cf7c16",
+                output=-1,
+                diagnosis="not available",
+            ),
+        )
+    ]
+
+    with patch(
+        "adapters.routers.v1.result_router.subscribe_to_inference_results",
+        AsyncMock(return_value=(subscription, finished)),
+    ) as mock_subscribe:
+        response = client_with_auth.get(
+            "/v1/users/507f191e810c19729de860ea/results/events"
+            "?inference_id=629f815d6abaa3c5e6cf7c16"
+            "&inference_id=629f81986abaa3c5e6cf7c17",
+            headers={"Authorization": "Bearer mock_token"},
+        )
+
+        mock_subscribe.assert_called_once_with(
+            ANY,
+            ANY,
+            ANY,
+            "507f191e810c19729de860ea",
+            ["629f815d6abaa3c5e6cf7c16", "629f81986abaa3c5e6cf7c17"],
+        )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.text == (
+        "event: error\n"
+        'data: {"inference_id": "629f815d6abaa3c5e6cf7c16", "output": -1.0, '
+        '"diagnosis": "not available"}\n\n'
+        "event: completed\n"
+        'data: {"inference_id": "629f81986abaa3c5e6cf7c17", "output": 0.5, '
+        '"diagnosis": "negative"}\n\n'
+    )
+    # the subscription is closed once every inference finished
+    assert result_hub.get_followed_inference_count() == 0
+
+
+def test_stream_results_error_status(client_with_auth: TestClient):
+    result_hub = ResultHub()
+    subscription = result_hub.subscribe(
+        ["629f815d6abaa3c5e6cf7c16", "629f81986abaa3c5e6cf7c17"]
+    )
+    # the message of the inference was given up by the outbox dispatcher
+    subscription.put(
+        InferenceStatusUpdate(inference_id="629f81986abaa3c5e6cf7c17", status="error")
+    )
+    finished = [
+        (
+            Inference(
+                id="629f815d6abaa3c5e6cf7c16",
+                sex="M",
+                age=23,
+                rgh="fake_rgh",
+                covid_status="Sim",
+                mask_type="None",
+                user_id="507f191e810c19729de860ea",
+                model_id="629f992d45cda830033cf4cd",
+                status="error",
+                created_in="2022-07-18 17:07:16.954632",
+            ),
+            None,
+        )
+    ]
+
+    with patch(
+        "adapters.routers.v1.result_router.subscribe_to_inference_results",
+        AsyncMock(return_value=(subscription, finished)),
+    ):
+        response = client_with_auth.get(
+            "/v1/users/507f191e810c19729de860ea/results/events"
+            "?inference_id=629f815d6abaa3c5e6cf7c16"
+            "&inference_id=629f81986abaa3c5e6cf7c17",
+            headers={"Authorization": "Bearer mock_token"},
+        )
+
+    assert response.status_code == 200
+    assert response.text == (
+        "event: error\n"
+        'data: {"inference_id": "629f815d6abaa3c5e6cf7c16", "status": "error"}\n\n'
+        "event: error\n"
+        'data: {"inference_id": "629f81986abaa3c5e6cf7c17", "status": "error"}\n\n'
+    )
+    assert result_hub.get_followed_inference_count() == 0
+
+
+def test_stream_results_exception(client_with_auth: TestClient):
+    with patch(
+        "adapters.routers.v1.result_router.subscribe_to_inference_results",
+        AsyncMock(
+            side_effect=LogicException("inference not found", status.HTTP_404_NOT_FOUND)
+        ),
+    ):
+        response = client_with_auth.get(
+            "/v1/users/507f191e810c19729de860ea/results/events"
+            "?inference_id=629f815d6abaa3c5e6cf7c16",
+            headers={"Authorization": "Bearer mock_token"},
+        )
+
+    assert response.status_code == 404
+    assert response.json() == {"detail": "inference not found"}
+
+
 # tests without authentication
 
 
@@ -133,3 +462,12 @@ def test_get_result_by_inference_no_token_header(client_without_auth: TestClient
     )
     assert response.json() == {"detail": "Not authenticated"}
     assert response.status_code == 401
+
+
+def test_stream_results_no_token_header(client_without_auth: TestClient):
+    response = client_without_auth.get(
+        "/v1/users/507f191e810c19729de860ea/results/events"
+        "?inference_id=629f815d6abaa3c5e6cf7c16"
+    )
+    assert response.json() == {"detail": "Not authenticated"}
+    assert response.status_code == 401
@@ -1,4 +1,5 @@
 from io import BytesIO
+import os
 from typing import Iterable
 from fastapi import UploadFile
 from mock import ANY, MagicMock, patch
@@ -7,6 +8,7 @@ import pytest
 from adapters.simple_storage.minio_adapter import MinioAdapter
 from tests.mocks.minio_mock import MinioMock
 from minio.deleteobjects import DeleteObject
+from minio.helpers import MIN_PART_SIZE
 
 
 @pytest.fixture()
@@ -43,6 +45,66 @@ def test_store_inference_file(simple_storage_adapter: MinioAdapter):
         )
 
 
+def test_store_inference_file_stream_length(simple_storage_adapter: MinioAdapter):
+    def fake_put_object(bucket_name: str, file_name: str, file: BytesIO, length):
+        pass
+
+    with patch.object(
+        simple_storage_adapter._client,
+        "put_object",
+        MagicMock(side_effect=fake_put_object),
+    ) as mock_method:
+        file = open("tests/mocks/audio_files/audio1.wav", "rb")
+        simple_storage_adapter.store_inference_file(
+            "fake_inference_id",
+            "fake_file_type",
+            ".wav",
+            file,
+        )
+        mock_method.assert_called_once_with(
+            "mock-bucket",
+            "fake_inference_id/fake_file_type.wav",
+            file,
+            os.path.getsize("tests/mocks/audio_files/audio1.wav"),
+        )
+        assert file.tell() == 0
+        file.close()
+
+
+def test_store_inference_file_unknown_length(simple_storage_adapter: MinioAdapter):
+    class UnseekableStream:
+        def read(self, size: int = -1) -> bytes:
+            return b""
+
+        def tell(self) -> int:
+            raise OSError()
+
+    def fake_put_object(
+        bucket_name: str, file_name: str, file, length: int, part_size: int
+    ):
+        pass
+
+    with patch.object(
+        simple_storage_adapter._client,
+        "put_object",
+        MagicMock(side_effect=fake_put_object),
+    ) as mock_method:
+        stream = UnseekableStream()
+        simple_storage_adapter.store_inference_file(
+            "fake_inference_id",
+            "fake_file_type",
+            ".wav",
+            stream,
+        )
+        mock_method.assert_called_once_with(
+            "mock-bucket",
+            "fake_inference_id/fake_file_type.wav",
+            stream,
+            -1,
+            part_size=MIN_PART_SIZE,
+        )
+
+
 def test_remove_inference_directory(simple_storage_adapter: MinioAdapter):
     def fake_list_objects(bucket_name: str, inference_id: str, recursive=True):
         class MockObject(BaseModel):
@@ -1,8 +1,9 @@
+import asyncio
 from operator import truediv
 from typing import Optional
 from unittest.mock import MagicMock, patch
 import pytest
-from core.model.token import Token, TokenData
+from core.model.token import PasswordPoolStats, Token, TokenCacheStats, TokenData
 from core.model.user import User
 from core.ports.authentication_port import AuthenticationPort
 from tests.mocks.authentication_mock import AuthenticationMock
@@ -78,10 +79,12 @@ def test_decode_token_exception(authentication_port: AuthenticationPort):
 
 
 def test_verify_password(authentication_port: AuthenticationPort):
-    def fake_verify_password(plain_password: str, user_password: str) -> bool:
+    async def fake_verify_password(plain_password: str, user_password: str) -> bool:
         return True
 
-    def fake_verify_password_failed(plain_password: str, user_password: str) -> bool:
+    async def fake_verify_password_failed(
+        plain_password: str, user_password: str
+    ) -> bool:
         return False
 
     with patch.object(
@@ -89,8 +92,10 @@ def test_verify_password(authentication_port: AuthenticationPort):
         "verify_password",
         MagicMock(side_effect=fake_verify_password),
     ) as mock_method:
-        return_value = authentication_port.verify_password(
-            "fake_plain_password", "fake_user_password"
+        return_value = asyncio.run(
+            authentication_port.verify_password(
+                "fake_plain_password", "fake_user_password"
+            )
         )
         mock_method.assert_called_once_with("fake_plain_password", "fake_user_password")
         assert return_value == True
@@ -100,15 +105,17 @@ def test_verify_password(authentication_port: AuthenticationPort):
         "verify_password",
         MagicMock(side_effect=fake_verify_password_failed),
     ) as mock_method:
-        return_value = authentication_port.verify_password(
-            "fake_plain_password", "fake_user_password"
+        return_value = asyncio.run(
+            authentication_port.verify_password(
+                "fake_plain_password", "fake_user_password"
+            )
         )
         mock_method.assert_called_once_with("fake_plain_password", "fake_user_password")
         assert return_value == False
 
 
 def test_get_password_hash(authentication_port: AuthenticationPort):
-    def fake_get_password_hash(plain_password: str) -> str:
+    async def fake_get_password_hash(plain_password: str) -> str:
         return "fake_hash"
 
     with patch.object(
@@ -116,7 +123,9 @@ def test_get_password_hash(authentication_port: AuthenticationPort):
         "get_password_hash",
         MagicMock(side_effect=fake_get_password_hash),
     ) as mock_method:
-        return_value = authentication_port.get_password_hash("fake_plain_password")
+        return_value = asyncio.run(
+            authentication_port.get_password_hash("fake_plain_password")
+        )
         mock_method.assert_called_once_with("fake_plain_password")
         assert return_value == "fake_hash"
 
@@ -134,3 +143,31 @@ def test_generate_token(authentication_port: AuthenticationPort):
         return_value = authentication_port.generate_token(fake_token_data)
         mock_method.assert_called_once_with(fake_token_data)
         assert return_value == Token(content="fake_content")
+
+
+def test_get_token_cache_stats(authentication_port: AuthenticationPort):
+    def fake_get_token_cache_stats() -> TokenCacheStats:
+        return TokenCacheStats(hits=3, misses=1, size=1)
+
+    with patch.object(
+        adapter_instance,
+        "get_token_cache_stats",
+        MagicMock(side_effect=fake_get_token_cache_stats),
+    ) as mock_method:
+        return_value = authentication_port.get_token_cache_stats()
+        mock_method.assert_called_once_with()
+        assert return_value == TokenCacheStats(hits=3, misses=1, size=1)
+
+
+def test_get_password_pool_stats(authentication_port: AuthenticationPort):
+    def fake_get_password_pool_stats() -> PasswordPoolStats:
+        return PasswordPoolStats(workers=2, running=2, queued=5)
+
+    with patch.object(
+        adapter_instance,
+        "get_password_pool_stats",
+        MagicMock(side_effect=fake_get_password_pool_stats),
+    ) as mock_method:
+        return_value = authentication_port.get_password_pool_stats()
+        mock_method.assert_called_once_with()
+        assert return_value == PasswordPoolStats(workers=2, running=2, queued=5)
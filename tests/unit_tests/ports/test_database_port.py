@@ -1,11 +1,19 @@
+import asyncio
+import time
 import pytest
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 from bson import ObjectId
 from core.model.constants import Status
 
-from core.model.inference import Inference, InferenceCreation
-from core.model.model import Model
-from core.model.result import Result, ResultCreation, ResultUpdate
+from core.model.inference import Inference, InferenceCacheStats, InferenceCreation
+from core.model.message_service import OutboxMessage
+from core.model.model import Model, ModelRegistryStats
+from core.model.result import (
+    InferenceStatusUpdate,
+    Result,
+    ResultCreation,
+    ResultUpdate,
+)
 from core.model.user import User, UserCreation, UserWithPassword
 from core.ports.database_port import DatabasePort
 from tests.mocks.mongo_mock import MongoMock
@@ -21,7 +29,7 @@ def database_port():
 
 
 def test_get_user_by_id(database_port: DatabasePort):
-    def get_user_by_id(user_id) -> dict:
+    async def get_user_by_id(user_id) -> dict:
         return {
             "_id": ObjectId("507f191e810c19729de860ea"),
             "username": "test_username",
@@ -34,7 +42,7 @@ def test_get_user_by_id(database_port: DatabasePort):
         "get_user_by_id",
         MagicMock(side_effect=get_user_by_id),
     ) as mock_get_user_by_id:
-        user = database_port.get_user_by_id("507f191e810c19729de860ea")
+        user = asyncio.run(database_port.get_user_by_id("507f191e810c19729de860ea"))
 
         mock_get_user_by_id.assert_called_once_with("507f191e810c19729de860ea")
         assert user == User(
@@ -43,7 +51,7 @@ def test_get_user_by_id(database_port: DatabasePort):
 
 
 def test_get_user_by_username(database_port: DatabasePort):
-    def get_user_by_username(username) -> dict:
+    async def get_user_by_username(username) -> dict:
         return {
             "_id": ObjectId("507f191e810c19729de860ea"),
             "username": "test_username",
@@ -56,7 +64,7 @@ def test_get_user_by_username(database_port: DatabasePort):
         "get_user_by_username",
         MagicMock(side_effect=get_user_by_username),
     ) as mock_get_user_by_username:
-        user = database_port.get_user_by_username("test_username")
+        user = asyncio.run(database_port.get_user_by_username("test_username"))
 
         mock_get_user_by_username.assert_called_once_with("test_username")
         assert user == User(
@@ -69,7 +77,7 @@ def test_get_user_by_username(database_port: DatabasePort):
 
 
 def test_get_user_by_username_with_password(database_port: DatabasePort):
-    def get_user_by_username_with_password(username) -> dict:
+    async def get_user_by_username_with_password(username) -> dict:
         return {
             "_id": ObjectId("507f191e810c19729de860ea"),
             "username": "test_username",
@@ -82,7 +90,9 @@ def test_get_user_by_username_with_password(database_port: DatabasePort):
         "get_user_by_username",
         MagicMock(side_effect=get_user_by_username_with_password),
     ) as mock_get_user_by_username_with_password:
-        user = database_port.get_user_by_username_with_password("test_username")
+        user = asyncio.run(
+            database_port.get_user_by_username_with_password("test_username")
+        )
 
         mock_get_user_by_username_with_password.assert_called_once_with("test_username")
         assert user == UserWithPassword(
@@ -95,8 +105,23 @@ def test_get_user_by_username_with_password(database_port: DatabasePort):
         )
 
 
+def test_is_user_enabled(database_port: DatabasePort):
+    async def is_user_enabled(user_id) -> bool:
+        return False
+
+    with patch.object(
+        adapter_instance,
+        "is_user_enabled",
+        MagicMock(side_effect=is_user_enabled),
+    ) as mock_is_user_enabled:
+        enabled = asyncio.run(database_port.is_user_enabled("507f191e810c19729de860ea"))
+
+        mock_is_user_enabled.assert_called_once_with("507f191e810c19729de860ea")
+        assert enabled == False
+
+
 def test_insert_user(database_port: DatabasePort):
-    def fake_adapter_insert(user):
+    async def fake_adapter_insert(user):
         pass
 
     new_user = UserCreation(
@@ -108,13 +133,13 @@ def test_insert_user(database_port: DatabasePort):
     with patch.object(
         adapter_instance, "insert_user", MagicMock(side_effect=fake_adapter_insert)
     ) as fake_adapter_insert:
-        database_port.insert_user(new_user)
+        asyncio.run(database_port.insert_user(new_user))
 
         fake_adapter_insert.assert_called_once_with(new_user)
 
 
 def test_get_inference_by_id(database_port: DatabasePort):
-    def get_inference_by_id(inference_id, user_id):
+    async def get_inference_by_id(inference_id, user_id):
         return {
             "_id": ObjectId("629f815d6abaa3c5e6cf7c16"),
             "sex": "M",
@@ -134,8 +159,10 @@ def test_get_inference_by_id(database_port: DatabasePort):
         MagicMock(side_effect=get_inference_by_id),
     ) as mock_get_inference_by_id:
 
-        inference = database_port.get_inference_by_id(
-            "629f815d6abaa3c5e6cf7c16", "507f191e810c19729de860ea"
+        inference = asyncio.run(
+            database_port.get_inference_by_id(
+                "629f815d6abaa3c5e6cf7c16", "507f191e810c19729de860ea"
+            )
         )
 
         mock_get_inference_by_id.assert_called_once_with(
@@ -157,8 +184,8 @@ def test_get_inference_by_id(database_port: DatabasePort):
         )
 
 
-def test_get_inference_list(database_port: DatabasePort):
-    def get_inference_list(user_id):
+def test_get_inference_page(database_port: DatabasePort):
+    async def get_inference_page(user_id, limit, after):
         return [
             {
                 "_id": ObjectId("629f815d6abaa3c5e6cf7c16"),
@@ -188,13 +215,18 @@ def test_get_inference_list(database_port: DatabasePort):
 
     with patch.object(
         adapter_instance,
-        "get_inference_list",
-        MagicMock(side_effect=get_inference_list),
-    ) as mock_get_inference_list:
-        inferences = database_port.get_inference_list("507f191e810c19729de860ea")
+        "get_inference_page",
+        MagicMock(side_effect=get_inference_page),
+    ) as mock_get_inference_page:
+        inference_page = asyncio.run(
+            database_port.get_inference_page("507f191e810c19729de860ea", 10)
+        )
 
-        mock_get_inference_list.assert_called_once_with("507f191e810c19729de860ea")
-        assert inferences == [
+        mock_get_inference_page.assert_called_once_with(
+            "507f191e810c19729de860ea", 11, None
+        )
+        assert inference_page.next_cursor is None
+        assert inference_page.inferences == [
             Inference(
                 **{
                     "id": "629f815d6abaa3c5e6cf7c16",
@@ -226,8 +258,57 @@ def test_get_inference_list(database_port: DatabasePort):
         ]
 
 
+def test_get_inference_page_next_cursor(database_port: DatabasePort):
+    async def get_inference_page(user_id, limit, after):
+        return [
+            {
+                "_id": ObjectId("629f815d6abaa3c5e6cf7c16"),
+                "sex": "M",
+                "age": 23,
+                "rgh": "fake_rgh",
+                "covid_status": "Sim",
+                "mask_type": "None",
+                "user_id": "507f191e810c19729de860ea",
+                "model_id": "629f992d45cda830033cf4cd",
+                "status": "processing",
+                "created_in": "2022-07-18 17:07:16.954632",
+            },
+            {
+                "_id": ObjectId("629f81986abaa3c5e6cf7c17"),
+                "sex": "F",
+                "age": 32,
+                "rgh": "fake_rgh",
+                "covid_status": "Sim",
+                "mask_type": "None",
+                "user_id": "507f191e810c19729de860ea",
+                "model_id": "629f994245cda830033cf4cf",
+                "status": "processing",
+                "created_in": "2022-07-18 17:07:16.954632",
+            },
+        ]
+
+    with patch.object(
+        adapter_instance,
+        "get_inference_page",
+        MagicMock(side_effect=get_inference_page),
+    ) as mock_get_inference_page:
+        inference_page = asyncio.run(
+            database_port.get_inference_page(
+                "507f191e810c19729de860ea", 1, "507f191e810c19729de860ea"
+            )
+        )
+
+        mock_get_inference_page.assert_called_once_with(
+            "507f191e810c19729de860ea", 2, "507f191e810c19729de860ea"
+        )
+        assert [inference.id for inference in inference_page.inferences] == [
+            "629f815d6abaa3c5e6cf7c16"
+        ]
+        assert inference_page.next_cursor == "629f815d6abaa3c5e6cf7c16"
+
+
 def test_insert_inference(database_port: DatabasePort):
-    def fake_adapter_insert(inference):
+    async def fake_adapter_insert(inference):
         pass
 
     new_inference = InferenceCreation(
@@ -245,13 +326,122 @@ def test_insert_inference(database_port: DatabasePort):
     with patch.object(
         adapter_instance, "insert_inference", MagicMock(side_effect=fake_adapter_insert)
     ) as fake_adapter_insert:
-        database_port.insert_inference(new_inference)
+        asyncio.run(database_port.insert_inference(new_inference))
 
         fake_adapter_insert.assert_called_once_with(new_inference)
 
 
+def test_insert_inference_with_outbox(database_port: DatabasePort):
+    new_inference = InferenceCreation(
+        age=20,
+        sex="F",
+        user_id="507f191e810c19729de860ea",
+        rgh="fake_rgh",
+        covid_status="Sim",
+        mask_type="None",
+        model_id="629f994245cda830033cf4cf",
+        status="processing",
+        created_in="2022-07-18 17:07:16.954632",
+    )
+
+    new_result = ResultCreation(
+        inference_id="629f815d6abaa3c5e6cf7c99", output=-1, diagnosis="not available"
+    )
+
+    async def insert_and_wait():
+        await database_port.insert_inference_with_outbox(
+            "629f815d6abaa3c5e6cf7c99", new_inference, new_result, "fake_channel"
+        )
+        # the insertion wakes the dispatcher up, it does not wait for the timeout
+        await asyncio.wait_for(database_port.wait_for_outbox_messages(60), 1)
+
+    with patch.object(
+        adapter_instance, "insert_inference_with_outbox", AsyncMock()
+    ) as mock_insert, patch("time.time", MagicMock(return_value=10.0)):
+        asyncio.run(insert_and_wait())
+
+        mock_insert.assert_called_once_with(
+            "629f815d6abaa3c5e6cf7c99",
+            new_inference,
+            new_result,
+            "fake_channel",
+            10.0,
+        )
+
+
+def test_claim_outbox_messages(database_port: DatabasePort):
+    content = {
+        "age": 20,
+        "sex": "F",
+        "user_id": "507f191e810c19729de860ea",
+        "rgh": "fake_rgh",
+        "covid_status": "Sim",
+        "mask_type": "None",
+        "model_id": "629f994245cda830033cf4cf",
+        "status": "processing",
+        "created_in": "2022-07-18 17:07:16.954632",
+    }
+    with patch.object(
+        adapter_instance,
+        "claim_outbox_messages",
+        AsyncMock(
+            return_value=[
+                {
+                    "_id": ObjectId("629f815d6abaa3c5e6cf7c99"),
+                    "publishing_channel": "fake_channel",
+                    "content": content,
+                    "attempts": 2,
+                    "available_at": 40.0,
+                }
+            ]
+        ),
+    ) as mock_claim, patch("time.time", MagicMock(return_value=10.0)):
+        outbox_messages = asyncio.run(database_port.claim_outbox_messages(5, 30))
+
+        mock_claim.assert_called_once_with(5, 10.0, 40.0)
+        assert outbox_messages == [
+            OutboxMessage(
+                id="629f815d6abaa3c5e6cf7c99",
+                content=InferenceCreation(**content),
+                publishing_channel="fake_channel",
+                attempts=2,
+            )
+        ]
+
+
+def test_reschedule_outbox_messages(database_port: DatabasePort):
+    outbox_message = OutboxMessage(
+        id="629f815d6abaa3c5e6cf7c99",
+        content=InferenceCreation(
+            age=20,
+            sex="F",
+            user_id="507f191e810c19729de860ea",
+            rgh="fake_rgh",
+            covid_status="Sim",
+            mask_type="None",
+            model_id="629f994245cda830033cf4cf",
+            status="processing",
+            created_in="2022-07-18 17:07:16.954632",
+        ),
+        publishing_channel="fake_channel",
+        attempts=3,
+    )
+    with patch.object(
+        adapter_instance, "reschedule_outbox_messages", AsyncMock()
+    ) as mock_reschedule, patch("time.time", MagicMock(return_value=10.0)):
+        asyncio.run(database_port.reschedule_outbox_messages([(outbox_message, 4)]))
+
+        mock_reschedule.assert_called_once_with([("629f815d6abaa3c5e6cf7c99", 3, 14.0)])
+
+
+def test_wait_for_outbox_messages_timeout(database_port: DatabasePort):
+    start = time.monotonic()
+    asyncio.run(database_port.wait_for_outbox_messages(0.01))
+    assert time.monotonic() - start >= 0.01
+
+
 def test_inference_status_update(database_port: DatabasePort):
-    def fake_adapter_update(inference_id, status):
+    async def fake_adapter_update(inference_id, status):
         pass
 
     with patch.object(
@@ -259,8 +449,10 @@ def test_inference_status_update(database_port: DatabasePort):
         "update_inference_status",
         MagicMock(side_effect=fake_adapter_update),
     ) as fake_adapter_update:
-        database_port.update_inference_status(
-            "629f815d6abaa3c5e6cf7c16", Status.completed_status
+        asyncio.run(
+            database_port.update_inference_status(
+                "629f815d6abaa3c5e6cf7c16", Status.completed_status
+            )
         )
 
         fake_adapter_update.assert_called_once_with(
@@ -268,8 +460,30 @@ def test_inference_status_update(database_port: DatabasePort):
         )
 
 
+def test_inference_statuses_update(database_port: DatabasePort):
+    async def fake_adapter_update(inference_ids, status):
+        pass
+
+    with patch.object(
+        adapter_instance,
+        "update_inference_statuses",
+        MagicMock(side_effect=fake_adapter_update),
+    ) as fake_adapter_update:
+        asyncio.run(
+            database_port.update_inference_statuses(
+                ["629f815d6abaa3c5e6cf7c16", "629f81986abaa3c5e6cf7c17"],
+                Status.completed_status,
+            )
+        )
+
+        fake_adapter_update.assert_called_once_with(
+            ["629f815d6abaa3c5e6cf7c16", "629f81986abaa3c5e6cf7c17"],
+            Status.completed_status,
+        )
+
+
 def test_get_model_by_id(database_port: DatabasePort):
-    def get_model_by_id(model_id) -> dict:
+    async def get_model_by_id(model_id) -> dict:
         return {
             "_id": ObjectId("629f992d45cda830033cf4cd"),
             "name": "fake_model",
@@ -282,7 +496,7 @@ def test_get_model_by_id(database_port: DatabasePort):
         "get_model_by_id",
         MagicMock(side_effect=get_model_by_id),
     ) as mock_get_model_by_id:
-        model = database_port.get_model_by_id("629f992d45cda830033cf4cd")
+        model = asyncio.run(database_port.get_model_by_id("629f992d45cda830033cf4cd"))
 
         mock_get_model_by_id.assert_called_once_with("629f992d45cda830033cf4cd")
         assert model == Model(
@@ -296,7 +510,7 @@ def test_get_model_by_id(database_port: DatabasePort):
 
 
 def test_get_model_list(database_port: DatabasePort):
-    def get_model_list():
+    async def get_model_list():
         return [
             {
                 "_id": ObjectId("629f992d45cda830033cf4cd"),
@@ -317,7 +531,7 @@ def test_get_model_list(database_port: DatabasePort):
         "get_model_list",
         MagicMock(side_effect=get_model_list),
     ) as mock_get_model_list:
-        models = database_port.get_model_list()
+        models = asyncio.run(database_port.get_model_list())
         mock_get_model_list.assert_called_once()
         assert models == [
             Model(
@@ -339,8 +553,139 @@ def test_get_model_list(database_port: DatabasePort):
         ]
 
 
+def test_get_model_by_id_from_model_registry():
+    adapter = MongoMock()
+    database_port = DatabasePort(adapter, model_registry_ttl=60)
+
+    async def get_model_twice():
+        return (
+            await database_port.get_model_by_id("629f992d45cda830033cf4cd"),
+            await database_port.get_model_by_id("629f992d45cda830033cf4cd"),
+        )
+
+    with patch.object(
+        adapter,
+        "get_model_by_id",
+        MagicMock(side_effect=adapter.get_model_by_id),
+    ) as mock_get_model_by_id, patch.object(
+        adapter,
+        "get_model_list",
+        MagicMock(side_effect=adapter.get_model_list),
+    ) as mock_get_model_list:
+        first_model, second_model = asyncio.run(get_model_twice())
+
+        mock_get_model_by_id.assert_not_called()
+        mock_get_model_list.assert_called_once()
+        assert first_model.id == "629f992d45cda830033cf4cd"
+        assert first_model is second_model
+        assert database_port.get_model_registry_stats() == ModelRegistryStats(
+            hits=2, misses=0, size=2, refreshes=1, invalidations=0
+        )
+
+
+def test_get_model_by_id_missing_from_model_registry():
+    adapter = MongoMock()
+    database_port = DatabasePort(adapter, model_registry_ttl=60)
+
+    with patch.object(
+        adapter,
+        "get_model_by_id",
+        MagicMock(side_effect=adapter.get_model_by_id),
+    ) as mock_get_model_by_id:
+        model = asyncio.run(database_port.get_model_by_id("629f992d45cda830033cf4ce"))
+
+        mock_get_model_by_id.assert_called_once_with("629f992d45cda830033cf4ce")
+        assert model is None
+        with pytest.raises(Exception):
+            asyncio.run(database_port.get_model_by_id("invalid_id"))
+        assert database_port.get_model_registry_stats().misses == 2
+
+
+def test_get_model_list_from_model_registry():
+    adapter = MongoMock()
+    database_port = DatabasePort(adapter, model_registry_ttl=60)
+
+    with patch.object(
+        adapter,
+        "get_model_list",
+        MagicMock(side_effect=adapter.get_model_list),
+    ) as mock_get_model_list:
+        asyncio.run(database_port.refresh_models())
+        models = asyncio.run(database_port.get_model_list())
+
+        mock_get_model_list.assert_called_once()
+        assert [model.id for model in models] == [
+            "629f992d45cda830033cf4cd",
+            "629f994245cda830033cf4cf",
+        ]
+
+
+def test_model_registry_expiration():
+    adapter = MongoMock()
+    database_port = DatabasePort(adapter, model_registry_ttl=60)
+
+    with patch.object(
+        adapter,
+        "get_model_list",
+        MagicMock(side_effect=adapter.get_model_list),
+    ) as mock_get_model_list:
+        asyncio.run(database_port.get_model_list())
+        with patch(
+            "core.ports.database_port.time.monotonic",
+            MagicMock(return_value=database_port._model_registry_loaded_at + 61),
+        ):
+            asyncio.run(database_port.get_model_list())
+
+        assert mock_get_model_list.call_count == 2
+        assert database_port.get_model_registry_stats().refreshes == 2
+
+
+def test_model_registry_invalidation():
+    adapter = MongoMock()
+    database_port = DatabasePort(adapter, model_registry_ttl=60)
+
+    with patch.object(
+        adapter,
+        "get_model_list",
+        MagicMock(side_effect=adapter.get_model_list),
+    ) as mock_get_model_list:
+        asyncio.run(database_port.get_model_list())
+        database_port.invalidate_models()
+        asyncio.run(database_port.get_model_list())
+
+        assert mock_get_model_list.call_count == 2
+        assert database_port.get_model_registry_stats().invalidations == 1
+
+
+def test_watch_model_changes_invalidates_model_registry():
+    adapter = MongoMock()
+    database_port = DatabasePort(adapter, model_registry_ttl=60)
+
+    async def watch_model_changes():
+        yield {"operationType": "update"}
+        yield {"operationType": "delete"}
+
+    with patch.object(
+        adapter,
+        "watch_model_changes",
+        MagicMock(side_effect=watch_model_changes),
+    ):
+        asyncio.run(database_port.watch_model_changes())
+
+        assert database_port.get_model_registry_stats().invalidations == 2
+
+
+def test_refresh_models_disabled_model_registry(database_port: DatabasePort):
+    with patch.object(
+        adapter_instance, "get_model_list", AsyncMock()
+    ) as mock_get_model_list:
+        asyncio.run(database_port.refresh_models())
+
+        mock_get_model_list.assert_not_called()
+
+
 def test_get_result_by_inference_id(database_port: DatabasePort):
-    def get_result_by_inference_id(inference_id):
+    async def get_result_by_inference_id(inference_id):
         return {
             "_id": ObjectId("62abf2cd154f18493d74fcd2"),
             "inference_id": "629f815d6abaa3c5e6cf7c16",
@@ -353,7 +698,9 @@ def test_get_result_by_inference_id(database_port: DatabasePort):
         "get_result_by_inference_id",
         MagicMock(side_effect=get_result_by_inference_id),
     ) as mock_get_result_by_inference_id:
-        result = database_port.get_result_by_inference_id("629f815d6abaa3c5e6cf7c16")
+        result = asyncio.run(
+            database_port.get_result_by_inference_id("629f815d6abaa3c5e6cf7c16")
+        )
 
         mock_get_result_by_inference_id.assert_called_once_with(
             "629f815d6abaa3c5e6cf7c16"
@@ -368,8 +715,137 @@ def test_get_result_by_inference_id(database_port: DatabasePort):
         )
 
 
+def test_get_inference_with_result(database_port: DatabasePort):
+    async def get_inference_with_result(inference_id, user_id):
+        return {
+            "_id": ObjectId("629f815d6abaa3c5e6cf7c16"),
+            "sex": "M",
+            "age": 23,
+            "rgh": "fake_rgh",
+            "covid_status": "Sim",
+            "mask_type": "None",
+            "user_id": "507f191e810c19729de860ea",
+            "model_id": "629f992d45cda830033cf4cd",
+            "status": "processing",
+            "created_in": "2022-07-18 17:07:16.954632",
+            "result": [
+                {
+                    "_id": ObjectId("62abf2cd154f18493d74fcd2"),
+                    "inference_id": "629f815d6abaa3c5e6cf7c16",
+                    "output": 0.98765,
+                    "diagnosis": "positive",
+                }
+            ],
+        }
+
+    with patch.object(
+        adapter_instance,
+        "get_inference_with_result",
+        MagicMock(side_effect=get_inference_with_result),
+    ) as mock_get_inference_with_result:
+        inference, result = asyncio.run(
+            database_port.get_inference_with_result(
+                "629f815d6abaa3c5e6cf7c16", "507f191e810c19729de860ea"
+            )
+        )
+
+        mock_get_inference_with_result.assert_called_once_with(
+            "629f815d6abaa3c5e6cf7c16", "507f191e810c19729de860ea"
+        )
+        assert inference == Inference(
+            **{
+                "id": "629f815d6abaa3c5e6cf7c16",
+                "sex": "M",
+                "age": 23,
+                "rgh": "fake_rgh",
+                "covid_status": "Sim",
+                "mask_type": "None",
+                "user_id": "507f191e810c19729de860ea",
+                "model_id": "629f992d45cda830033cf4cd",
+                "status": "processing",
+                "created_in": "2022-07-18 17:07:16.954632",
+            }
+        )
+        assert result == Result(
+            **{
+                "id": "62abf2cd154f18493d74fcd2",
+                "inference_id": "629f815d6abaa3c5e6cf7c16",
+                "output": 0.98765,
+                "diagnosis": "positive",
+            }
+        )
+
+
+def test_get_inference_with_result_not_found(database_port: DatabasePort):
+    async def get_inference_with_result(inference_id, user_id):
+        return None
+
+    with patch.object(
+        adapter_instance,
+        "get_inference_with_result",
+        MagicMock(side_effect=get_inference_with_result),
+    ):
+        inference_with_result = asyncio.run(
+            database_port.get_inference_with_result(
+                "629f815d6abaa3c5e6cf7c16", "507f191e810c19729de860ea"
+            )
+        )
+
+        assert inference_with_result is None
+
+
+def test_get_results_by_inference_ids():
+    database_port = DatabasePort(MongoMock(), inference_cache_size=10)
+    asyncio.run(
+        database_port.get_inference_with_result(
+            "629f815d6abaa3c5e6cf7c16", "507f191e810c19729de860ea"
+        )
+    )
+
+    with patch.object(
+        database_port._database_adapter,
+        "get_results_by_inference_ids",
+        MagicMock(
+            side_effect=database_port._database_adapter.get_results_by_inference_ids
+        ),
+    ) as mock_get_results_by_inference_ids:
+        inferences_with_results = asyncio.run(
+            database_port.get_results_by_inference_ids(
+                [
+                    "629f815d6abaa3c5e6cf7c16",
+                    "629f81986abaa3c5e6cf7c17",
+                    "629e4f781ed5308d4b8212bc",
+                ],
+                "507f191e810c19729de860ea",
+            )
+        )
+
+        # the cached inference is not read again
+        mock_get_results_by_inference_ids.assert_called_once_with(
+            ["629f81986abaa3c5e6cf7c17", "629e4f781ed5308d4b8212bc"],
+            "507f191e810c19729de860ea",
+        )
+    assert sorted(inferences_with_results) == [
+        "629f815d6abaa3c5e6cf7c16",
+        "629f81986abaa3c5e6cf7c17",
+    ]
+    inference, result = inferences_with_results["629f815d6abaa3c5e6cf7c16"]
+    assert inference.status == "processing"
+    assert result == Result(
+        **{
+            "id": "62abf2cd154f18493d74fcd2",
+            "inference_id": "629f815d6abaa3c5e6cf7c16",
+            "output": 0.98765,
+            "diagnosis": "positive",
+        }
+    )
+    inference, result = inferences_with_results["629f81986abaa3c5e6cf7c17"]
+    assert inference.id == "629f81986abaa3c5e6cf7c17"
+    assert result is None
+
+
 def test_insert_result(database_port: DatabasePort):
-    def fake_adapter_insert(result):
+    async def fake_adapter_insert(result):
         pass
 
     new_result = ResultCreation(
@@ -378,13 +854,13 @@ def test_insert_result(database_port: DatabasePort):
     with patch.object(
         adapter_instance, "insert_result", MagicMock(side_effect=fake_adapter_insert)
     ) as fake_adapter_insert:
-        database_port.insert_result(new_result)
+        asyncio.run(database_port.insert_result(new_result))
 
         fake_adapter_insert.assert_called_once_with(new_result)
 
 
 def test_result_update(database_port: DatabasePort):
-    def fake_adapter_update(result_update):
+    async def fake_adapter_update(result_update):
         pass
 
     with patch.object(
@@ -395,6 +871,231 @@ def test_result_update(database_port: DatabasePort):
         result_update = ResultUpdate(
             inference_id="629f815d6abaa3c5e6cf7c16", output=0.323, diagnosis="negative"
         )
-        database_port.update_result(result_update)
+        asyncio.run(database_port.update_result(result_update))
 
         fake_adapter_update.assert_called_once_with(result_update)
+
+
+def test_results_update(database_port: DatabasePort):
+    async def fake_adapter_update(result_updates):
+        pass
+
+    with patch.object(
+        adapter_instance,
+        "update_results",
+        MagicMock(side_effect=fake_adapter_update),
+    ) as fake_adapter_update:
+        result_updates = [
+            ResultUpdate(
+                inference_id="629f815d6abaa3c5e6cf7c16",
+                output=0.323,
+                diagnosis="negative",
+            ),
+            ResultUpdate(
+                inference_id="629f81986abaa3c5e6cf7c17",
+                output=0.876,
+                diagnosis="positive",
+            ),
+        ]
+        asyncio.run(database_port.update_results(result_updates))
+
+        fake_adapter_update.assert_called_once_with(result_updates)
+
+
+def test_ensure_indexes(database_port: DatabasePort):
+    with patch.object(
+        adapter_instance, "ensure_indexes", AsyncMock()
+    ) as fake_adapter_ensure, patch.object(
+        adapter_instance,
+        "get_missing_indexes",
+        AsyncMock(return_value={"users": ["email_1"]}),
+    ) as fake_adapter_get_missing:
+        missing_indexes = asyncio.run(database_port.ensure_indexes())
+
+        fake_adapter_ensure.assert_called_once_with()
+        fake_adapter_get_missing.assert_called_once_with()
+        assert missing_indexes == {"users": ["email_1"]}
+
+
+def test_get_missing_indexes(database_port: DatabasePort):
+    with patch.object(
+        adapter_instance,
+        "get_missing_indexes",
+        AsyncMock(return_value={}),
+    ) as fake_adapter_get_missing:
+        assert asyncio.run(database_port.get_missing_indexes()) == {}
+
+        fake_adapter_get_missing.assert_called_once_with()
+
+
+def test_inference_cache_serves_repeated_reads():
+    database_port = DatabasePort(MongoMock(), inference_cache_size=10)
+
+    with patch.object(
+        database_port._database_adapter,
+        "get_inference_with_result",
+        MagicMock(
+            side_effect=database_port._database_adapter.get_inference_with_result
+        ),
+    ) as mock_get_inference_with_result, patch.object(
+        database_port._database_adapter,
+        "get_inference_by_id",
+        MagicMock(side_effect=database_port._database_adapter.get_inference_by_id),
+    ) as mock_get_inference_by_id:
+        for _ in range(3):
+            inference, result = asyncio.run(
+                database_port.get_inference_with_result(
+                    "629f815d6abaa3c5e6cf7c16", "507f191e810c19729de860ea"
+                )
+            )
+            inference = asyncio.run(
+                database_port.get_inference_by_id(
+                    "629f815d6abaa3c5e6cf7c16", "507f191e810c19729de860ea"
+                )
+            )
+        # another user does not get the cached inference
+        assert (
+            asyncio.run(
+                database_port.get_inference_by_id(
+                    "629f815d6abaa3c5e6cf7c16", "507f1f77bcf86cd799439011"
+                )
+            )
+            is None
+        )
+
+        mock_get_inference_with_result.assert_called_once()
+        mock_get_inference_by_id.assert_called_once_with(
+            "629f815d6abaa3c5e6cf7c16", "507f1f77bcf86cd799439011"
+        )
+    assert inference.id == "629f815d6abaa3c5e6cf7c16"
+    assert result.inference_id == "629f815d6abaa3c5e6cf7c16"
+    assert database_port.get_inference_cache_stats() == InferenceCacheStats(
+        hits=5, misses=2, size=1
+    )
+
+
+def test_inference_cache_write_through():
+    database_port = DatabasePort(MongoMock(), inference_cache_size=10)
+    result_update = ResultUpdate(
+        inference_id="629f815d6abaa3c5e6cf7c16", output=0.5, diagnosis="negative"
+    )
+    asyncio.run(
+        database_port.get_inference_with_result(
+            "629f815d6abaa3c5e6cf7c16", "507f191e810c19729de860ea"
+        )
+    )
+
+    asyncio.run(database_port.update_results([result_update]))
+    asyncio.run(
+        database_port.update_inference_statuses(
+            ["629f815d6abaa3c5e6cf7c16"], Status.completed_status
+        )
+    )
+
+    with patch.object(
+        database_port._database_adapter, "get_inference_with_result", AsyncMock()
+    ) as mock_get_inference_with_result:
+        inference, result = asyncio.run(
+            database_port.get_inference_with_result(
+                "629f815d6abaa3c5e6cf7c16", "507f191e810c19729de860ea"
+            )
+        )
+
+        mock_get_inference_with_result.assert_not_called()
+    assert inference.status == Status.completed_status
+    assert (result.output, result.diagnosis) == (0.5, "negative")
+
+
+def test_inference_cache_result_update_of_another_process():
+    database_port = DatabasePort(MongoMock(), inference_cache_size=10)
+    asyncio.run(
+        database_port.get_inference_with_result(
+            "629f815d6abaa3c5e6cf7c16", "507f191e810c19729de860ea"
+        )
+    )
+
+    database_port.cache_result_update(
+        ResultUpdate(
+            inference_id="629f815d6abaa3c5e6cf7c16", output=0.5, diagnosis="negative"
+        )
+    )
+
+    inference, result = asyncio.run(
+        database_port.get_inference_with_result(
+            "629f815d6abaa3c5e6cf7c16", "507f191e810c19729de860ea"
+        )
+    )
+    assert inference.status == Status.completed_status
+    assert (result.output, result.diagnosis) == (0.5, "negative")
+    assert database_port.get_inference_cache_stats().hits == 1
+
+
+def test_inference_cache_status_update_of_another_process():
+    database_port = DatabasePort(MongoMock(), inference_cache_size=10)
+    asyncio.run(
+        database_port.get_inference_by_id(
+            "629f81986abaa3c5e6cf7c17", "507f191e810c19729de860ea"
+        )
+    )
+
+    database_port.cache_status_update(
+        InferenceStatusUpdate(
+            inference_id="629f81986abaa3c5e6cf7c17", status=Status.error_status
+        )
+    )
+
+    inference = asyncio.run(
+        database_port.get_inference_by_id(
+            "629f81986abaa3c5e6cf7c17", "507f191e810c19729de860ea"
+        )
+    )
+    assert inference.status == Status.error_status
+    assert database_port.get_inference_cache_stats().hits == 1
+
+
+def test_inference_cache_read_updated_in_flight():
+    database_port = DatabasePort(MongoMock(), inference_cache_size=10)
+    read_inference = database_port._database_adapter.get_inference_by_id
+
+    async def get_inference_updated_in_flight(inference_id: str, user_id: str):
+        inference = await read_inference(inference_id, user_id)
+        # written while the stale document is on its way back
+        await database_port.update_inference_status(
+            inference_id, Status.completed_status
+        )
+        return inference
+
+    with patch.object(
+        database_port._database_adapter,
+        "get_inference_by_id",
+        MagicMock(side_effect=get_inference_updated_in_flight),
+    ):
+        inference = asyncio.run(
+            database_port.get_inference_by_id(
+                "629f815d6abaa3c5e6cf7c16", "507f191e810c19729de860ea"
+            )
+        )
+
+    assert inference.status == Status.processing_status
+    # the stale inference was not cached
+    assert database_port.get_inference_cache_stats().size == 0
+
+
+def test_inference_cache_bounds():
+    database_port = DatabasePort(
+        MongoMock(), inference_cache_size=1, inference_cache_ttl=60
+    )
+    for inference_id in ["629f815d6abaa3c5e6cf7c16", "629f81986abaa3c5e6cf7c17"]:
+        asyncio.run(
+            database_port.get_inference_by_id(inference_id, "507f191e810c19729de860ea")
+        )
+    assert database_port.get_inference_cache_stats().size == 1
+
+    with patch("time.monotonic", MagicMock(return_value=time.monotonic() + 61)):
+        asyncio.run(
+            database_port.get_inference_by_id(
+                "629f81986abaa3c5e6cf7c17", "507f191e810c19729de860ea"
+            )
+        )
+    # the expired inference was read again
+    assert database_port.get_inference_cache_stats().hits == 0
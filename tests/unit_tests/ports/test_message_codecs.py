@@ -0,0 +1,53 @@
+import pytest
+from core.ports.message_codecs import (
+    JSONCodec,
+    MessageCodec,
+    MsgpackCodec,
+    OrjsonCodec,
+    create_codec,
+)
+
+
+@pytest.mark.parametrize("codec_name", ["json", "orjson", "msgpack"])
+def test_encode_and_decode(codec_name: str):
+    codec = create_codec(codec_name)
+    content = {
+        "inference_id": "629f815d6abaa3c5e6cf7c16",
+        "output": 0.987,
+        "diagnosis": "positive",
+        "age": 23,
+        "mask_type": None,
+    }
+
+    message = codec.encode(content)
+
+    assert isinstance(message, bytes)
+    assert codec.decode(message) == content
+
+
+def test_json_codecs_are_compatible():
+    content = {"inference_id": "629f815d6abaa3c5e6cf7c16", "output": 0.5}
+
+    assert OrjsonCodec.content_type == JSONCodec.content_type
+    assert OrjsonCodec().decode(JSONCodec().encode(content)) == content
+    assert JSONCodec().decode(OrjsonCodec().encode(content)) == content
+
+
+def test_msgpack_content_type():
+    assert MsgpackCodec.content_type == "application/msgpack"
+
+
+def test_create_unknown_codec_exception():
+    with pytest.raises(ValueError):
+        create_codec("unknown")
+
+
+def test_incomplete_codec_exception():
+    class EncodeOnlyCodec(MessageCodec):
+        content_type = "application/fake"
+
+        def encode(self, content: dict) -> bytes:
+            return b""
+
+    with pytest.raises(TypeError):
+        EncodeOnlyCodec()
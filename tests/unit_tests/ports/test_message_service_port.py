@@ -1,12 +1,13 @@
 import datetime
 import json
-from mock import ANY, MagicMock, call, patch
+from mock import ANY, AsyncMock, MagicMock, call, patch
 from pydantic import BaseModel
 from adapters.message_service.nats_adapter import NATSAdapter
 from core.model.constants import Status
 from core.model.inference import InferenceCreation
-from core.model.message_service import RequestLetter
-from core.model.result import ResultUpdate
+from core.model.message_service import DurableSubscription, RequestLetter
+from core.model.result import InferenceStatusUpdate, ResultUpdate
+from core.ports.message_codecs import MsgpackCodec
 from core.ports.message_service_port import MessageServicePort
 from tests.mocks.nats_mock import NATSMock
 import pytest
@@ -22,7 +23,7 @@ def message_service_port():
 
 
 def test_send_message(message_service_port: MessageServicePort):
-    async def fake_send_message(topic: str, message: bytes):
+    async def fake_send_message(message: bytes, topic: str, content_type: str):
         pass
 
     with patch.object(
@@ -61,13 +62,201 @@ def test_send_message(message_service_port: MessageServicePort):
                     "user_id": "fake_user_id",
                     "created_in": "2022-07-18 17:07:16.954632",
                 }
+            ).encode("utf-8"),
+            "fake_topic",
+            "application/json",
+        )
+
+
+def test_send_message_with_codec():
+    message_service_port = MessageServicePort(adapter_instance, MsgpackCodec())
+    inference = InferenceCreation(
+        age=30,
+        sex="M",
+        rgh="fake_rgh",
+        covid_status="Sim",
+        mask_type="None",
+        model_id="fake_model_id",
+        status=Status.processing_status,
+        user_id="fake_user_id",
+        created_in="2022-07-18 17:07:16.954632",
+    )
+
+    with patch.object(adapter_instance, "send_message", AsyncMock()) as mock_method:
+        asyncio.run(
+            message_service_port.send_message(
+                RequestLetter(content=inference, publishing_channel="fake_topic")
+            )
+        )
+        mock_method.assert_called_once_with(
+            MsgpackCodec().encode(inference.dict()),
+            "fake_topic",
+            "application/msgpack",
+        )
+
+
+@pytest.mark.parametrize(
+    "content_type,message",
+    [
+        (
+            None,
+            b'{"inference_id": "fake_inference_id", "output": 0.5, "diagnosis": ""}',
+        ),
+        (
+            "application/json",
+            b'{"inference_id": "fake_inference_id", "output": 0.5, "diagnosis": ""}',
+        ),
+        (
+            "application/msgpack",
+            MsgpackCodec().encode(
+                {"inference_id": "fake_inference_id", "output": 0.5, "diagnosis": ""}
             ),
+        ),
+    ],
+)
+def test_subscribe_decodes_by_content_type(
+    message_service_port: MessageServicePort, content_type, message: bytes
+):
+    received_updates = []
+
+    async def fake_subscribe(topic: str, callback, queue: str):
+        await callback(message, content_type)
+
+    async def fake_callback(result_update: ResultUpdate):
+        received_updates.append(result_update)
+
+    with patch.object(
+        adapter_instance,
+        "subscribe",
+        MagicMock(side_effect=fake_subscribe),
+    ):
+        asyncio.run(message_service_port.subscribe("fake_topic", fake_callback))
+        assert received_updates == [
+            ResultUpdate(inference_id="fake_inference_id", output=0.5, diagnosis="")
+        ]
+
+
+def test_subscribe_unsupported_content_type_exception(
+    message_service_port: MessageServicePort,
+):
+    async def fake_subscribe(topic: str, callback, queue: str):
+        await callback(b"fake_message", "text/plain")
+
+    async def fake_callback(result_update: ResultUpdate):
+        pass
+
+    with patch.object(
+        adapter_instance,
+        "subscribe",
+        MagicMock(side_effect=fake_subscribe),
+    ):
+        with pytest.raises(ValueError):
+            asyncio.run(message_service_port.subscribe("fake_topic", fake_callback))
+
+
+def test_send_result_update(message_service_port: MessageServicePort):
+    result_update = ResultUpdate(
+        inference_id="fake_inference_id", output=0.5, diagnosis="negative"
+    )
+
+    with patch.object(adapter_instance, "send_message", AsyncMock()) as mock_method:
+        asyncio.run(
+            message_service_port.send_result_update("fake_topic", result_update)
+        )
+        mock_method.assert_called_once_with(
+            b'{"inference_id": "fake_inference_id", "output": 0.5, '
+            b'"diagnosis": "negative"}',
             "fake_topic",
+            "application/json",
+        )
+
+
+def test_send_status_update(message_service_port: MessageServicePort):
+    status_update = InferenceStatusUpdate(
+        inference_id="fake_inference_id", status=Status.error_status
+    )
+
+    with patch.object(adapter_instance, "send_message", AsyncMock()) as mock_method:
+        asyncio.run(
+            message_service_port.send_status_update("fake_topic", status_update)
+        )
+        mock_method.assert_called_once_with(
+            b'{"inference_id": "fake_inference_id", "status": "error"}',
+            "fake_topic",
+            "application/json",
+        )
+
+
+def test_subscribe_inference_updates(message_service_port: MessageServicePort):
+    received_updates = []
+
+    async def fake_subscribe(topic: str, callback):
+        await callback(
+            b'{"inference_id": "fake_inference_id", "output": 0.5, '
+            b'"diagnosis": "negative"}',
+            None,
+        )
+        await callback(
+            MsgpackCodec().encode(
+                {"inference_id": "fake_inference_id", "status": "error"}
+            ),
+            MsgpackCodec.content_type,
+        )
+
+    async def fake_callback(inference_update):
+        received_updates.append(inference_update)
+
+    with patch.object(
+        adapter_instance,
+        "subscribe",
+        MagicMock(side_effect=fake_subscribe),
+    ) as mock_method:
+        asyncio.run(
+            message_service_port.subscribe_inference_updates(
+                "fake_topic", fake_callback
+            )
         )
 
+        mock_method.assert_called_once_with("fake_topic", ANY)
+        assert received_updates == [
+            ResultUpdate(
+                inference_id="fake_inference_id", output=0.5, diagnosis="negative"
+            ),
+            InferenceStatusUpdate(inference_id="fake_inference_id", status="error"),
+        ]
+
+
+def test_connect(message_service_port: MessageServicePort):
+    async def fake_connect():
+        pass
+
+    with patch.object(
+        adapter_instance,
+        "connect",
+        MagicMock(side_effect=fake_connect),
+    ) as mock_method:
+        asyncio.run(message_service_port.connect())
+        mock_method.assert_called_once_with()
+
+
+def test_close(message_service_port: MessageServicePort):
+    async def fake_close():
+        pass
+
+    with patch.object(
+        adapter_instance,
+        "close",
+        MagicMock(side_effect=fake_close),
+    ) as mock_method:
+        asyncio.run(message_service_port.close())
+        mock_method.assert_called_once_with()
+
 
 def test_subscribe(message_service_port: MessageServicePort):
-    async def fake_subscribe(topic: str):
+    async def fake_subscribe(topic: str, callback, queue: str):
+        pass
+
+    async def fake_callback(result_update: ResultUpdate):
         pass
 
     with patch.object(
@@ -75,30 +264,121 @@ def test_subscribe(message_service_port: MessageServicePort):
         "subscribe",
         MagicMock(side_effect=fake_subscribe),
     ) as mock_method:
-        asyncio.run(message_service_port.subscribe("fake_topic"))
-        mock_method.assert_called_once_with("fake_topic")
+        asyncio.run(
+            message_service_port.subscribe(
+                "fake_topic", fake_callback, "fake_queue_group"
+            )
+        )
+        mock_method.assert_called_once_with("fake_topic", ANY, "fake_queue_group")
+
+
+def test_subscribe_deserializes_messages(message_service_port: MessageServicePort):
+    received_updates = []
+
+    async def fake_subscribe(topic: str, callback, queue: str):
+        await callback(
+            json.dumps(
+                {
+                    "inference_id": "fake_inference_id",
+                    "output": 0.777,
+                    "diagnosis": "positive",
+                }
+            ).encode("utf-8"),
+            None,
+        )
+
+    async def fake_callback(result_update: ResultUpdate):
+        received_updates.append(result_update)
+
+    with patch.object(
+        adapter_instance,
+        "subscribe",
+        MagicMock(side_effect=fake_subscribe),
+    ):
+        asyncio.run(message_service_port.subscribe("fake_topic", fake_callback))
+        assert received_updates == [
+            ResultUpdate(
+                **{
+                    "inference_id": "fake_inference_id",
+                    "output": 0.777,
+                    "diagnosis": "positive",
+                }
+            )
+        ]
+
+
+def test_subscribe_notifications(message_service_port: MessageServicePort):
+    notifications = []
+
+    async def fake_subscribe(topic: str, callback):
+        await callback(b"ignored content", None)
+
+    async def fake_callback():
+        notifications.append(True)
+
+    with patch.object(
+        adapter_instance,
+        "subscribe",
+        MagicMock(side_effect=fake_subscribe),
+    ) as mock_method:
+        asyncio.run(
+            message_service_port.subscribe_notifications("fake_topic", fake_callback)
+        )
+        mock_method.assert_called_once_with("fake_topic", ANY)
+        assert notifications == [True]
+
 
+def test_subscribe_durable(message_service_port: MessageServicePort):
+    received_updates = []
 
-def test_wait_for_message(message_service_port: MessageServicePort):
-    async def fake_wait_for_message(topic: str):
-        return json.dumps(
-            {
-                "inference_id": "fake_inference_id",
-                "output": 0.777,
-                "diagnosis": "positive",
-            }
+    async def fake_subscribe_durable(topic: str, callback, *args):
+        await callback(
+            json.dumps(
+                {
+                    "inference_id": "fake_inference_id",
+                    "output": 0.777,
+                    "diagnosis": "positive",
+                }
+            ).encode("utf-8"),
+            "application/json",
         )
 
+    async def fake_callback(result_update: ResultUpdate):
+        received_updates.append(result_update)
+
     with patch.object(
         adapter_instance,
-        "wait_for_message",
-        MagicMock(side_effect=fake_wait_for_message),
+        "subscribe_durable",
+        MagicMock(side_effect=fake_subscribe_durable),
     ) as mock_method:
-        return_value = asyncio.run(message_service_port.wait_for_message("fake_topic"))
-        assert return_value == ResultUpdate(
-            **{
-                "inference_id": "fake_inference_id",
-                "output": 0.777,
-                "diagnosis": "positive",
-            }
+        asyncio.run(
+            message_service_port.subscribe_durable(
+                "fake_topic",
+                fake_callback,
+                DurableSubscription(
+                    stream_name="fake_stream",
+                    durable_name="fake_durable",
+                    max_deliveries=5,
+                    ack_wait=30,
+                    max_ack_pending=32,
+                    dead_letter_channel="fake_dead_letter_channel",
+                    stream_max_age=3600,
+                ),
+            )
         )
+        mock_method.assert_called_once_with(
+            "fake_topic",
+            ANY,
+            "fake_stream",
+            "fake_durable",
+            5,
+            30,
+            32,
+            "fake_dead_letter_channel",
+            3600,
+        )
+        assert received_updates == [
+            ResultUpdate(
+                inference_id="fake_inference_id", output=0.777, diagnosis="positive"
+            )
+        ]
@@ -1,6 +1,9 @@
+import asyncio
+import threading
+import time
 from io import BytesIO
 from fastapi import UploadFile
-from mock import ANY, MagicMock, patch
+from mock import MagicMock, call, patch
 import pytest
 from core.model.inference import UploadAudio
 from core.ports.simple_storage_port import SimpleStoragePort
@@ -23,7 +26,7 @@ def test_store_inference_file(simple_storage_port: SimpleStoragePort):
         pass
 
     file = UploadAudio(
-        content=UploadFile("tests/mocks/audio_files/audio1.wav").file.read(),
+        file=UploadFile("tests/mocks/audio_files/audio1.wav").file,
         filename="tests/mocks/audio_files/audio1.wav",
     )
 
@@ -42,10 +45,123 @@ def test_store_inference_file(simple_storage_port: SimpleStoragePort):
             "507f191e810c19729de860ea",
             "fake_file_type",
             ".wav",
-            ANY,
+            file.file,
         )
 
 
+def test_store_inference_files(simple_storage_port: SimpleStoragePort):
+    def store_inference_file(
+        inference_id: str, file_type: str, extension: str, file: BytesIO
+    ) -> None:
+        pass
+
+    files = {
+        "aceite": UploadAudio(file=BytesIO(b"aceite"), filename="aceite.wav"),
+        "frase": UploadAudio(file=BytesIO(b"frase"), filename="frase.ogg"),
+    }
+
+    with patch.object(
+        adapter_instance,
+        "store_inference_file",
+        MagicMock(side_effect=store_inference_file),
+    ) as mock_store_inference_file, patch.object(
+        adapter_instance, "remove_inference_directory", MagicMock()
+    ) as mock_remove_inference_directory:
+        asyncio.run(
+            simple_storage_port.store_inference_files("507f191e810c19729de860ea", files)
+        )
+
+        mock_store_inference_file.assert_has_calls(
+            [
+                call(
+                    "507f191e810c19729de860ea",
+                    "aceite",
+                    ".wav",
+                    files["aceite"].file,
+                ),
+                call(
+                    "507f191e810c19729de860ea",
+                    "frase",
+                    ".ogg",
+                    files["frase"].file,
+                ),
+            ],
+            any_order=True,
+        )
+        mock_remove_inference_directory.assert_not_called()
+
+
+def test_store_inference_files_exception(simple_storage_port: SimpleStoragePort):
+    def store_inference_file(
+        inference_id: str, file_type: str, extension: str, file: BytesIO
+    ) -> None:
+        if file_type == "frase":
+            raise IOError("upload failed")
+
+    files = {
+        "aceite": UploadAudio(file=BytesIO(b"aceite"), filename="aceite.wav"),
+        "frase": UploadAudio(file=BytesIO(b"frase"), filename="frase.wav"),
+    }
+
+    with patch.object(
+        adapter_instance,
+        "store_inference_file",
+        MagicMock(side_effect=store_inference_file),
+    ) as mock_store_inference_file, patch.object(
+        adapter_instance, "remove_inference_directory", MagicMock()
+    ) as mock_remove_inference_directory:
+        try:
+            asyncio.run(
+                simple_storage_port.store_inference_files(
+                    "507f191e810c19729de860ea", files
+                )
+            )
+            assert False
+        except IOError as e:
+            assert str(e) == "upload failed"
+
+        assert mock_store_inference_file.call_count == 2
+        mock_remove_inference_directory.assert_called_once_with(
+            "507f191e810c19729de860ea"
+        )
+
+
+def test_store_inference_files_bounded_per_request():
+    simple_storage_port = SimpleStoragePort(
+        adapter_instance, upload_workers=2, upload_pool_size=8
+    )
+    lock = threading.Lock()
+    uploading = [0]
+    max_uploading = [0]
+
+    def store_inference_file(
+        inference_id: str, file_type: str, extension: str, file: BytesIO
+    ) -> None:
+        with lock:
+            uploading[0] += 1
+            max_uploading[0] = max(max_uploading[0], uploading[0])
+        time.sleep(0.02)
+        with lock:
+            uploading[0] -= 1
+
+    files = {
+        file_type: UploadAudio(file=BytesIO(b"audio"), filename="audio.wav")
+        for file_type in ("aceite", "vogal_sustentada", "parlenda_ritmada", "frase")
+    }
+
+    with patch.object(
+        adapter_instance,
+        "store_inference_file",
+        MagicMock(side_effect=store_inference_file),
+    ) as mock_store_inference_file:
+        asyncio.run(
+            simple_storage_port.store_inference_files("507f191e810c19729de860ea", files)
+        )
+
+        assert mock_store_inference_file.call_count == 4
+    assert max_uploading[0] == 2
+
+
 def test_remove_inference_directory(simple_storage_port: SimpleStoragePort):
     def remove_inference_directory(inference_id) -> None:
         pass
@@ -1,11 +1,21 @@
-from fastapi import UploadFile
+import asyncio
+from io import BytesIO
+from fastapi import UploadFile, status
 from h11 import Data
-from mock import MagicMock, patch, call
+from mock import AsyncMock, MagicMock, patch, call
 import pytest
-from core.model.inference import InferenceFiles, UploadAudio
+from core.model.exception import LogicException
+from core.model.inference import InferenceCreationForm, InferenceFiles, UploadAudio
+from core.model.result import ResultCreation
+from core.model.token import Token
+from core.ports.authentication_port import AuthenticationPort
+from core.ports.database_port import DatabasePort
 from core.ports.simple_storage_port import SimpleStoragePort
-from core.services.inference_service import _store_files
+from core.services.inference_service import _store_files, create_new_inference
+from core.services.request_context import RequestContext
+from tests.mocks.authentication_mock import AuthenticationMock
 from tests.mocks.minio_mock import MinioMock
+from tests.mocks.mongo_mock import MongoMock
 
 
 @pytest.fixture()
@@ -30,16 +40,18 @@ def test_store_files_success(simple_storage_port: SimpleStoragePort):
         aceite = UploadFile("tests/mocks/audio_files/audio4.wav")
 
         inference_files = InferenceFiles(
-            aceite=UploadAudio(content=aceite.file.read(), filename=aceite.filename),
+            aceite=UploadAudio(file=aceite.file, filename=aceite.filename),
             vogal_sustentada=UploadAudio(
-                content=vogal_sustentada.file.read(), filename=vogal_sustentada.filename
+                file=vogal_sustentada.file, filename=vogal_sustentada.filename
             ),
             parlenda_ritmada=UploadAudio(
-                content=parlenda_ritmada.file.read(), filename=parlenda_ritmada.filename
+                file=parlenda_ritmada.file, filename=parlenda_ritmada.filename
             ),
-            frase=UploadAudio(content=frase.file.read(), filename=frase.filename),
+            frase=UploadAudio(file=frase.file, filename=frase.filename),
+        )
+        asyncio.run(
+            _store_files(simple_storage_port, inference_files, "fake_inference_id")
         )
-        _store_files(simple_storage_port, inference_files, "fake_inference_id")
         calls = [
             call(
                 "fake_inference_id",
@@ -58,4 +70,142 @@ def test_store_files_success(simple_storage_port: SimpleStoragePort):
             ),
             call("fake_inference_id", "frase", inference_files.frase),
         ]
-        mock_store_inference_file.assert_has_calls(calls)
+        mock_store_inference_file.assert_has_calls(calls, any_order=True)
+        assert mock_store_inference_file.call_count == 4
+
+
+def test_store_files_exception(simple_storage_port: SimpleStoragePort):
+    def fake_store_inference_file(inference_id, file_type, file) -> None:
+        if file_type == "frase":
+            raise Exception()
+
+    def fake_remove_inference_directory(inference_id) -> None:
+        pass
+
+    with patch.object(
+        simple_storage_port,
+        "store_inference_file",
+        MagicMock(side_effect=fake_store_inference_file),
+    ) as mock_store_inference_file, patch.object(
+        simple_storage_port,
+        "remove_inference_directory",
+        MagicMock(side_effect=fake_remove_inference_directory),
+    ) as mock_remove_inference_directory:
+        inference_files = InferenceFiles(
+            aceite=UploadAudio(file=BytesIO(), filename="audio4.wav"),
+            vogal_sustentada=UploadAudio(file=BytesIO(), filename="audio1.wav"),
+            parlenda_ritmada=UploadAudio(file=BytesIO(), filename="audio2.wav"),
+            frase=UploadAudio(file=BytesIO(), filename="audio3.wav"),
+        )
+        try:
+            asyncio.run(
+                _store_files(simple_storage_port, inference_files, "fake_inference_id")
+            )
+            assert False
+        except LogicException as e:
+            assert e.message == "could not store the audio files"
+            assert e.error_status == status.HTTP_500_INTERNAL_SERVER_ERROR
+
+        assert mock_store_inference_file.call_count == 4
+        mock_remove_inference_directory.assert_called_once_with("fake_inference_id")
+
+
+def test_create_new_inference_inserts_placeholder_result(
+    simple_storage_port: SimpleStoragePort,
+):
+    database_port = DatabasePort(MongoMock())
+    context = RequestContext(
+        AuthenticationPort(AuthenticationMock()),
+        database_port,
+        Token(content="fake_token"),
+    )
+    inference_files = InferenceFiles(
+        **{
+            file_type: UploadAudio(file=BytesIO(b"fake_audio"), filename="audio.wav")
+            for file_type in InferenceFiles.__fields__.keys()
+        }
+    )
+
+    with patch.object(
+        database_port, "insert_inference_with_outbox", AsyncMock()
+    ) as mock_insert_inference_with_outbox, patch.object(
+        simple_storage_port, "store_inference_files", AsyncMock()
+    ):
+        inference_id = asyncio.run(
+            create_new_inference(
+                simple_storage_port,
+                context,
+                database_port,
+                "507f191e810c19729de860ea",
+                InferenceCreationForm(
+                    rgh="fake_rgh",
+                    age=20,
+                    sex="F",
+                    covid_status="Sim",
+                    mask_type="None",
+                    model_id="629f992d45cda830033cf4cd",
+                ),
+                inference_files,
+            )
+        )
+
+        # the result is inserted with the outbox message, so it exists
+        # before the message is sent and its update always finds it
+        (
+            _,
+            _,
+            new_result,
+            publishing_channel,
+        ) = mock_insert_inference_with_outbox.call_args.args
+        assert new_result == ResultCreation(
+            inference_id=inference_id, output=-1, diagnosis="not available"
+        )
+        assert publishing_channel == "fake_channel_1"
+
+
+def test_create_new_inference_insert_exception(simple_storage_port: SimpleStoragePort):
+    database_port = DatabasePort(MongoMock())
+    context = RequestContext(
+        AuthenticationPort(AuthenticationMock()),
+        database_port,
+        Token(content="fake_token"),
+    )
+    inference_files = InferenceFiles(
+        **{
+            file_type: UploadAudio(file=BytesIO(b"fake_audio"), filename="audio.wav")
+            for file_type in InferenceFiles.__fields__.keys()
+        }
+    )
+
+    with patch.object(
+        database_port,
+        "insert_inference_with_outbox",
+        AsyncMock(side_effect=Exception("fake_exception")),
+    ), patch.object(
+        simple_storage_port, "store_inference_files", AsyncMock()
+    ) as mock_store_inference_files, patch.object(
+        simple_storage_port, "remove_inference_directory", MagicMock()
+    ) as mock_remove_inference_directory:
+        with pytest.raises(LogicException) as e:
+            asyncio.run(
+                create_new_inference(
+                    simple_storage_port,
+                    context,
+                    database_port,
+                    "507f191e810c19729de860ea",
+                    InferenceCreationForm(
+                        rgh="fake_rgh",
+                        age=20,
+                        sex="F",
+                        covid_status="Sim",
+                        mask_type="None",
+                        model_id="629f992d45cda830033cf4cd",
+                    ),
+                    inference_files,
+                )
+            )
+
+        assert e.value.error_status == status.HTTP_500_INTERNAL_SERVER_ERROR
+        # the files of an inference that was not inserted are removed
+        inference_id = mock_store_inference_files.call_args.args[0]
+        mock_remove_inference_directory.assert_called_once_with(inference_id)
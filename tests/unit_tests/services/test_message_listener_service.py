@@ -1,6 +1,9 @@
-from mock import MagicMock, patch
+from typing import List
+from mock import ANY, AsyncMock, MagicMock, call, patch
 import pytest
 import asyncio
+import threading
+import time
 from core.model.constants import Status
 from core.model.result import ResultUpdate
 from core.ports.database_port import DatabasePort
@@ -8,11 +11,21 @@ from core.ports.message_service_port import MessageServicePort
 
 from core.ports.simple_storage_port import SimpleStoragePort
 from tests.mocks.minio_mock import MinioMock
-from core.services.message_listener_service import listen_for_messages_and_update
+from core.model.exception import LogicException
+from core.model.message_service import DurableSubscription
+from core.services.message_listener_service import (
+    listen_for_messages_and_update,
+    subscribe_to_channel,
+)
 from tests.mocks.mongo_mock import MongoMock
 from tests.mocks.nats_mock import NATSMock
 
 
+async def wait_for_updates():
+    pending_updates = asyncio.all_tasks() - {asyncio.current_task()}
+    await asyncio.gather(*pending_updates)
+
+
 @pytest.fixture()
 def simple_storage_port():
     port = SimpleStoragePort(MinioMock())
@@ -36,36 +49,155 @@ def test_listen_for_messages_and_update(
     simple_storage_port: SimpleStoragePort,
     message_service_port: MessageServicePort,
 ):
-    async def fake_wait_for_message(central_channel: str):
-        return ResultUpdate(
-            inference_id="fake_inference_id", output=0.999, diagnosis="positive"
+    async def fake_subscribe(central_channel: str, callback, queue_group: str):
+        await callback(
+            ResultUpdate(
+                inference_id="fake_inference_id", output=0.999, diagnosis="positive"
+            )
         )
+        await wait_for_updates()
 
     def fake_remove_inference_directory(inference_id: str):
         pass
 
-    def fake_update_result(result_update: ResultUpdate):
+    async def fake_update_results(result_updates: List[ResultUpdate]):
         pass
 
-    def fake_update_inference_status(inference_id: str, status: str):
+    async def fake_update_inference_statuses(inference_ids: List[str], status: str):
         pass
 
     with patch.object(
         message_service_port,
-        "wait_for_message",
-        MagicMock(side_effect=fake_wait_for_message),
-    ) as mock_wait_for_message, patch.object(
+        "subscribe",
+        MagicMock(side_effect=fake_subscribe),
+    ) as mock_subscribe, patch.object(
         simple_storage_port,
         "remove_inference_directory",
         MagicMock(side_effect=fake_remove_inference_directory),
     ) as mock_remove_inference_directory, patch.object(
+        database_port,
+        "update_results",
+        MagicMock(side_effect=fake_update_results),
+    ) as mock_update_results, patch.object(
+        database_port,
+        "update_inference_statuses",
+        MagicMock(side_effect=fake_update_inference_statuses),
+    ) as mock_update_inference_statuses:
+        asyncio.run(
+            listen_for_messages_and_update(
+                simple_storage_port,
+                message_service_port,
+                database_port,
+                "fake_central_channel",
+            )
+        )
+        mock_subscribe.assert_called_once_with("fake_central_channel", ANY, "")
+        mock_update_results.assert_called_once_with(
+            [
+                ResultUpdate(
+                    inference_id="fake_inference_id", output=0.999, diagnosis="positive"
+                )
+            ]
+        )
+        mock_update_inference_statuses.assert_called_once_with(
+            ["fake_inference_id"], Status.completed_status
+        )
+        mock_remove_inference_directory.assert_called_once_with("fake_inference_id")
+
+
+def test_listen_for_messages_and_update_in_batch(
+    database_port: DatabasePort,
+    simple_storage_port: SimpleStoragePort,
+    message_service_port: MessageServicePort,
+):
+    result_updates = [
+        ResultUpdate(inference_id="inference_%d" % index, output=0.5, diagnosis="")
+        for index in range(5)
+    ]
+
+    async def fake_subscribe(central_channel: str, callback, queue_group: str):
+        for result_update in result_updates:
+            await callback(result_update)
+        await wait_for_updates()
+
+    with patch.object(
+        message_service_port,
+        "subscribe",
+        MagicMock(side_effect=fake_subscribe),
+    ), patch.object(
+        simple_storage_port, "remove_inference_directory", MagicMock()
+    ) as mock_remove_inference_directory, patch.object(
+        database_port, "update_results", AsyncMock()
+    ) as mock_update_results, patch.object(
+        database_port, "update_inference_statuses", AsyncMock()
+    ) as mock_update_inference_statuses, patch.object(
+        database_port, "update_result", AsyncMock()
+    ) as mock_update_result:
+        asyncio.run(
+            listen_for_messages_and_update(
+                simple_storage_port,
+                message_service_port,
+                database_port,
+                "fake_central_channel",
+                max_concurrent_updates=10,
+                batch_size=3,
+                batch_window=0.05,
+            )
+        )
+
+        # a full batch is written at once, the rest after the batch window
+        assert mock_update_results.call_args_list == [
+            call(result_updates[:3]),
+            call(result_updates[3:]),
+        ]
+        assert mock_update_inference_statuses.call_args_list == [
+            call(
+                ["inference_0", "inference_1", "inference_2"],
+                Status.completed_status,
+            ),
+            call(["inference_3", "inference_4"], Status.completed_status),
+        ]
+        mock_update_result.assert_not_called()
+        assert mock_remove_inference_directory.call_count == 5
+
+
+def test_listen_for_messages_and_update_exception(
+    database_port: DatabasePort,
+    simple_storage_port: SimpleStoragePort,
+    message_service_port: MessageServicePort,
+):
+    async def fake_subscribe(central_channel: str, callback, queue_group: str):
+        await callback(
+            ResultUpdate(inference_id="first_id", output=0.999, diagnosis="positive")
+        )
+        await callback(
+            ResultUpdate(inference_id="second_id", output=0.111, diagnosis="negative")
+        )
+        await wait_for_updates()
+
+    async def fake_update_results(result_updates: List[ResultUpdate]):
+        raise Exception()
+
+    async def fake_update_result(result_update: ResultUpdate):
+        if result_update.inference_id == "first_id":
+            raise Exception()
+
+    with patch.object(
+        message_service_port,
+        "subscribe",
+        MagicMock(side_effect=fake_subscribe),
+    ), patch.object(
+        simple_storage_port, "remove_inference_directory", MagicMock()
+    ) as mock_remove_inference_directory, patch.object(
+        database_port,
+        "update_results",
+        MagicMock(side_effect=fake_update_results),
+    ), patch.object(
         database_port,
         "update_result",
         MagicMock(side_effect=fake_update_result),
     ) as mock_update_result, patch.object(
-        database_port,
-        "update_inference_status",
-        MagicMock(side_effect=fake_update_inference_status),
+        database_port, "update_inference_status", AsyncMock()
     ) as mock_update_inference_status:
         asyncio.run(
             listen_for_messages_and_update(
@@ -73,15 +205,228 @@ def test_listen_for_messages_and_update(
                 message_service_port,
                 database_port,
                 "fake_central_channel",
+                max_concurrent_updates=2,
+                batch_size=2,
             )
         )
-        mock_wait_for_message.assert_called_once_with("fake_central_channel")
-        mock_update_result.assert_called_once_with(
-            ResultUpdate(
-                inference_id="fake_inference_id", output=0.999, diagnosis="positive"
+        # the failed batch is retried one update at a time
+        assert mock_update_result.call_count == 2
+        mock_update_inference_status.assert_called_once_with(
+            "second_id", Status.completed_status
+        )
+        mock_remove_inference_directory.assert_called_once_with("second_id")
+
+
+def test_listen_for_messages_and_update_concurrency(
+    database_port: DatabasePort,
+    simple_storage_port: SimpleStoragePort,
+    message_service_port: MessageServicePort,
+):
+    lock = threading.Lock()
+    running = {"now": 0, "max": 0}
+    applied_updates = []
+
+    async def fake_subscribe(central_channel: str, callback, queue_group: str):
+        for index in range(4):
+            await callback(
+                ResultUpdate(
+                    inference_id="inference_%d" % (index % 2),
+                    output=index,
+                    diagnosis="positive",
+                )
+            )
+        await wait_for_updates()
+
+    async def fake_update_results(result_updates: List[ResultUpdate]):
+        applied_updates.extend(result_updates)
+
+    def fake_remove_inference_directory(inference_id: str):
+        with lock:
+            running["now"] += 1
+            running["max"] = max(running["max"], running["now"])
+        time.sleep(0.05)
+        with lock:
+            running["now"] -= 1
+
+    with patch.object(
+        message_service_port,
+        "subscribe",
+        MagicMock(side_effect=fake_subscribe),
+    ), patch.object(
+        simple_storage_port,
+        "remove_inference_directory",
+        MagicMock(side_effect=fake_remove_inference_directory),
+    ), patch.object(
+        database_port,
+        "update_results",
+        MagicMock(side_effect=fake_update_results),
+    ), patch.object(
+        database_port, "update_inference_statuses", AsyncMock()
+    ):
+        asyncio.run(
+            listen_for_messages_and_update(
+                simple_storage_port,
+                message_service_port,
+                database_port,
+                "fake_central_channel",
+                max_concurrent_updates=2,
             )
         )
-        mock_update_inference_status.assert_called_once_with(
-            "fake_inference_id", Status.completed_status
+
+        # two different inferences run in parallel, never more than the limit
+        assert running["max"] == 2
+        # updates of the same inference keep their arrival order
+        assert [
+            update.output
+            for update in applied_updates
+            if update.inference_id == "inference_0"
+        ] == [0, 2]
+        assert [
+            update.output
+            for update in applied_updates
+            if update.inference_id == "inference_1"
+        ] == [1, 3]
+
+
+def test_subscribe_to_channel_exception(message_service_port: MessageServicePort):
+    async def fake_subscribe(central_channel: str, callback, queue_group: str):
+        raise Exception()
+
+    async def fake_handler(result_update: ResultUpdate):
+        pass
+
+    with patch.object(
+        message_service_port,
+        "subscribe",
+        MagicMock(side_effect=fake_subscribe),
+    ):
+        try:
+            asyncio.run(
+                subscribe_to_channel(
+                    message_service_port, "fake_central_channel", fake_handler
+                )
+            )
+            assert False
+        except LogicException as e:
+            assert e.message == "cound not subscribe to channel"
+
+
+def test_listen_for_messages_in_queue_group(
+    database_port: DatabasePort,
+    simple_storage_port: SimpleStoragePort,
+    message_service_port: MessageServicePort,
+):
+    with patch.object(message_service_port, "subscribe", AsyncMock()) as mock_subscribe:
+        asyncio.run(
+            listen_for_messages_and_update(
+                simple_storage_port,
+                message_service_port,
+                database_port,
+                "fake_central_channel",
+                queue_group="fake_queue_group",
+            )
+        )
+
+        mock_subscribe.assert_called_once_with(
+            "fake_central_channel", ANY, "fake_queue_group"
+        )
+
+
+def test_listen_for_messages_and_update_durable(
+    database_port: DatabasePort,
+    simple_storage_port: SimpleStoragePort,
+    message_service_port: MessageServicePort,
+):
+    durable_subscription = DurableSubscription(
+        stream_name="fake_stream",
+        durable_name="fake_durable",
+        max_deliveries=3,
+        ack_wait=30,
+        max_ack_pending=32,
+        dead_letter_channel="fake_dead_letter_channel",
+        stream_max_age=3600,
+    )
+    result_update = ResultUpdate(
+        inference_id="fake_inference_id", output=0.999, diagnosis="positive"
+    )
+    deliveries = []
+
+    async def fake_subscribe_durable(central_channel: str, callback, subscription):
+        # acknowledges the message when the callback returns, redelivers otherwise
+        for _ in range(subscription.max_deliveries):
+            try:
+                await callback(result_update)
+            except LogicException:
+                deliveries.append("not acknowledged")
+                continue
+            deliveries.append("acknowledged")
+            break
+
+    with patch.object(
+        message_service_port,
+        "subscribe_durable",
+        MagicMock(side_effect=fake_subscribe_durable),
+    ) as mock_subscribe_durable, patch.object(
+        simple_storage_port, "remove_inference_directory", MagicMock()
+    ) as mock_remove_inference_directory, patch.object(
+        database_port, "update_results", AsyncMock(side_effect=[Exception(), None])
+    ), patch.object(
+        database_port, "update_result", AsyncMock(side_effect=Exception())
+    ), patch.object(
+        database_port, "update_inference_statuses", AsyncMock()
+    ):
+        asyncio.run(
+            listen_for_messages_and_update(
+                simple_storage_port,
+                message_service_port,
+                database_port,
+                "fake_central_channel",
+                durable_subscription=durable_subscription,
+            )
         )
+
+        mock_subscribe_durable.assert_called_once_with(
+            "fake_central_channel", ANY, durable_subscription
+        )
+        assert deliveries == ["not acknowledged", "acknowledged"]
         mock_remove_inference_directory.assert_called_once_with("fake_inference_id")
+
+
+def test_listen_for_messages_and_update_sends_result_updates(
+    database_port: DatabasePort,
+    simple_storage_port: SimpleStoragePort,
+    message_service_port: MessageServicePort,
+):
+    result_updates = [
+        ResultUpdate(inference_id="629f815d6abaa3c5e6cf7c16", output=0.5, diagnosis=""),
+        ResultUpdate(inference_id="invalid_id", output=0.5, diagnosis=""),
+    ]
+
+    async def fake_subscribe(central_channel: str, callback, queue_group: str):
+        for result_update in result_updates:
+            await callback(result_update)
+        await wait_for_updates()
+
+    with patch.object(
+        message_service_port,
+        "subscribe",
+        MagicMock(side_effect=fake_subscribe),
+    ), patch.object(
+        message_service_port, "send_result_update", AsyncMock()
+    ) as mock_send_result_update, patch.object(
+        simple_storage_port, "remove_inference_directory", MagicMock()
+    ):
+        asyncio.run(
+            listen_for_messages_and_update(
+                simple_storage_port,
+                message_service_port,
+                database_port,
+                "fake_central_channel",
+                result_update_channel="fake_result_update_channel",
+            )
+        )
+
+        # only the written update is sent
+        mock_send_result_update.assert_called_once_with(
+            "fake_result_update_channel", result_updates[0]
+        )
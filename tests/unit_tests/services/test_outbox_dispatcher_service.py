@@ -0,0 +1,217 @@
+from mock import AsyncMock, MagicMock, call, patch
+import pytest
+import asyncio
+from bson import ObjectId
+from core.model.constants import Status
+from core.model.exception import LogicException
+from core.model.inference import InferenceCreation
+from core.model.message_service import OutboxDispatch, RequestLetter
+from core.model.result import InferenceStatusUpdate, ResultCreation
+from core.ports.database_port import DatabasePort
+from core.ports.message_service_port import MessageServicePort
+from core.services.outbox_dispatcher_service import dispatch_outbox_messages
+from tests.mocks.mongo_mock import MongoMock
+from tests.mocks.nats_mock import NATSMock
+
+
+@pytest.fixture()
+def message_service_port():
+    port = MessageServicePort(NATSMock())
+    return port
+
+
+@pytest.fixture()
+def database_port():
+    port = DatabasePort(MongoMock())
+    return port
+
+
+@pytest.fixture()
+def outbox_dispatch():
+    return OutboxDispatch(
+        batch_size=10,
+        poll_interval=1,
+        lease=30,
+        retry_base_delay=0.5,
+        retry_max_delay=60,
+        max_attempts=3,
+    )
+
+
+def _new_inference() -> InferenceCreation:
+    return InferenceCreation(
+        age=20,
+        sex="F",
+        user_id="507f191e810c19729de860ea",
+        rgh="fake_rgh",
+        covid_status="Sim",
+        mask_type="None",
+        model_id="629f994245cda830033cf4cf",
+        status=Status.processing_status,
+        created_in="2022-07-18 17:07:16.954632",
+    )
+
+
+def _insert_inferences(database_port: DatabasePort, count: int):
+    inference_ids = [database_port.create_inference_id() for _ in range(count)]
+    for inference_id in inference_ids:
+        asyncio.run(
+            database_port.insert_inference_with_outbox(
+                inference_id,
+                _new_inference(),
+                ResultCreation(
+                    inference_id=inference_id, output=-1, diagnosis="not available"
+                ),
+                "fake_channel",
+            )
+        )
+    return inference_ids
+
+
+def _get_outbox(database_port: DatabasePort):
+    return asyncio.run(
+        database_port._database_adapter._outbox.find().to_list(length=None)
+    )
+
+
+def test_dispatch_outbox_messages_sent(
+    message_service_port: MessageServicePort,
+    database_port: DatabasePort,
+    outbox_dispatch: OutboxDispatch,
+):
+    _insert_inferences(database_port, 2)
+
+    with patch.object(
+        message_service_port, "send_message", AsyncMock()
+    ) as mock_send_message:
+        claimed = asyncio.run(
+            dispatch_outbox_messages(
+                message_service_port, database_port, outbox_dispatch
+            )
+        )
+
+        assert claimed == 2
+        assert mock_send_message.call_count == 2
+        letter = mock_send_message.call_args.args[0]
+        assert RequestLetter(
+            content=letter.content, publishing_channel=letter.publishing_channel
+        ) == RequestLetter(content=_new_inference(), publishing_channel="fake_channel")
+    assert _get_outbox(database_port) == []
+
+
+def test_dispatch_outbox_messages_rescheduled(
+    message_service_port: MessageServicePort,
+    database_port: DatabasePort,
+    outbox_dispatch: OutboxDispatch,
+):
+    with patch.object(
+        message_service_port,
+        "send_message",
+        AsyncMock(side_effect=Exception("fake_exception")),
+    ), patch("time.time", MagicMock(return_value=10.0)):
+        (inference_id,) = _insert_inferences(database_port, 1)
+        asyncio.run(
+            dispatch_outbox_messages(
+                message_service_port, database_port, outbox_dispatch
+            )
+        )
+
+    outbox = _get_outbox(database_port)
+    assert len(outbox) == 1
+    assert outbox[0]["_id"] == ObjectId(inference_id)
+    assert outbox[0]["attempts"] == 1
+    assert outbox[0]["available_at"] == 10.5
+
+
+def test_dispatch_outbox_messages_given_up(
+    message_service_port: MessageServicePort,
+    database_port: DatabasePort,
+    outbox_dispatch: OutboxDispatch,
+):
+    (inference_id,) = _insert_inferences(database_port, 1)
+    asyncio.run(
+        database_port._database_adapter._outbox.update_one(
+            {"_id": ObjectId(inference_id)}, {"$set": {"attempts": 2}}
+        )
+    )
+
+    with patch.object(
+        message_service_port,
+        "send_message",
+        AsyncMock(side_effect=Exception("fake_exception")),
+    ):
+        asyncio.run(
+            dispatch_outbox_messages(
+                message_service_port, database_port, outbox_dispatch
+            )
+        )
+
+    assert _get_outbox(database_port) == []
+    inference = asyncio.run(
+        database_port.get_inference_by_id(inference_id, "507f191e810c19729de860ea")
+    )
+    assert inference.status == Status.error_status
+
+
+def test_dispatch_outbox_messages_given_up_status_sent(
+    message_service_port: MessageServicePort,
+    database_port: DatabasePort,
+    outbox_dispatch: OutboxDispatch,
+):
+    inference_ids = _insert_inferences(database_port, 2)
+    asyncio.run(
+        database_port._database_adapter._outbox.update_many(
+            {}, {"$set": {"attempts": 2}}
+        )
+    )
+
+    with patch.object(
+        message_service_port,
+        "send_message",
+        AsyncMock(side_effect=Exception("fake_exception")),
+    ), patch.object(
+        message_service_port,
+        "send_status_update",
+        AsyncMock(side_effect=[None, Exception("fake_exception")]),
+    ) as mock_send_status_update:
+        asyncio.run(
+            dispatch_outbox_messages(
+                message_service_port,
+                database_port,
+                outbox_dispatch,
+                "fake_result_update_channel",
+            )
+        )
+
+        # a status update that could not be sent is only reported
+        mock_send_status_update.assert_has_calls(
+            [
+                call(
+                    "fake_result_update_channel",
+                    InferenceStatusUpdate(
+                        inference_id=inference_id, status=Status.error_status
+                    ),
+                )
+                for inference_id in inference_ids
+            ],
+            any_order=True,
+        )
+    assert _get_outbox(database_port) == []
+
+
+def test_dispatch_outbox_messages_exception(
+    message_service_port: MessageServicePort,
+    database_port: DatabasePort,
+    outbox_dispatch: OutboxDispatch,
+):
+    with patch.object(
+        database_port,
+        "claim_outbox_messages",
+        AsyncMock(side_effect=Exception("fake_exception")),
+    ):
+        with pytest.raises(LogicException):
+            asyncio.run(
+                dispatch_outbox_messages(
+                    message_service_port, database_port, outbox_dispatch
+                )
+            )
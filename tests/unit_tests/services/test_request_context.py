@@ -0,0 +1,143 @@
+import asyncio
+from fastapi import status
+from mock import AsyncMock, MagicMock, patch
+import pytest
+from core.model.exception import LogicException
+from core.model.token import Token, TokenData
+from core.ports.authentication_port import AuthenticationPort
+from core.ports.database_port import DatabasePort
+from core.services.request_context import RequestContext
+from tests.mocks.authentication_mock import AuthenticationMock
+from tests.mocks.mongo_mock import MongoMock
+
+
+@pytest.fixture()
+def authentication_port():
+    port = AuthenticationPort(AuthenticationMock())
+    return port
+
+
+@pytest.fixture()
+def database_port():
+    port = DatabasePort(MongoMock())
+    return port
+
+
+def test_authenticate_user_with_user_id_claim(
+    authentication_port: AuthenticationPort, database_port: DatabasePort
+):
+    context = RequestContext(
+        authentication_port, database_port, Token(content="fake_token")
+    )
+    with patch.object(
+        database_port, "get_user_by_username", AsyncMock()
+    ) as mock_get_user_by_username, patch.object(
+        database_port, "is_user_enabled", AsyncMock()
+    ) as mock_is_user_enabled:
+        asyncio.run(context.authenticate_user("507f191e810c19729de860ea"))
+
+        mock_get_user_by_username.assert_not_called()
+        mock_is_user_enabled.assert_not_called()
+
+
+def test_authenticate_user_without_user_id_claim(
+    authentication_port: AuthenticationPort, database_port: DatabasePort
+):
+    context = RequestContext(
+        authentication_port, database_port, Token(content="fake_token")
+    )
+    with patch.object(
+        authentication_port,
+        "decode_token",
+        MagicMock(return_value=TokenData(username="test_username")),
+    ), patch.object(
+        database_port,
+        "get_user_by_username",
+        MagicMock(side_effect=database_port.get_user_by_username),
+    ) as mock_get_user_by_username:
+        asyncio.run(context.authenticate_user("507f191e810c19729de860ea"))
+
+        mock_get_user_by_username.assert_called_once_with("test_username")
+
+
+def test_authenticate_user_of_another_user_exception(
+    authentication_port: AuthenticationPort, database_port: DatabasePort
+):
+    context = RequestContext(
+        authentication_port, database_port, Token(content="fake_token")
+    )
+    try:
+        asyncio.run(context.authenticate_user("629d34d2663c15eb2ed15494"))
+        assert False
+    except LogicException as e:
+        assert e.error_status == status.HTTP_403_FORBIDDEN
+
+
+def test_authenticate_user_revoked_exception(database_port: DatabasePort):
+    authentication_port = AuthenticationPort(
+        AuthenticationMock(), check_revoked_users=True
+    )
+    context = RequestContext(
+        authentication_port, database_port, Token(content="fake_token")
+    )
+
+    with patch.object(
+        database_port, "is_user_enabled", AsyncMock(return_value=False)
+    ) as mock_is_user_enabled:
+        try:
+            asyncio.run(context.authenticate_user("507f191e810c19729de860ea"))
+            assert False
+        except LogicException as e:
+            assert e.error_status == status.HTTP_401_UNAUTHORIZED
+
+        mock_is_user_enabled.assert_called_once_with("507f191e810c19729de860ea")
+
+
+def test_authenticate_user_once_per_request(database_port: DatabasePort):
+    authentication_port = AuthenticationPort(
+        AuthenticationMock(), check_revoked_users=True
+    )
+    context = RequestContext(
+        authentication_port, database_port, Token(content="fake_token")
+    )
+
+    async def authenticate_twice():
+        await context.authenticate_user("507f191e810c19729de860ea")
+        await context.authenticate_user("507f191e810c19729de860ea")
+
+    with patch.object(
+        authentication_port,
+        "decode_token",
+        MagicMock(side_effect=authentication_port.decode_token),
+    ) as mock_decode_token, patch.object(
+        database_port, "is_user_enabled", AsyncMock(return_value=True)
+    ) as mock_is_user_enabled:
+        asyncio.run(authenticate_twice())
+
+        mock_decode_token.assert_called_once()
+        mock_is_user_enabled.assert_called_once_with("507f191e810c19729de860ea")
+
+
+def test_get_model_once_per_request(
+    authentication_port: AuthenticationPort, database_port: DatabasePort
+):
+    context = RequestContext(
+        authentication_port, database_port, Token(content="fake_token")
+    )
+
+    async def get_model_twice():
+        return (
+            await context.get_model("629f992d45cda830033cf4cd"),
+            await context.get_model("629f992d45cda830033cf4cd"),
+        )
+
+    with patch.object(
+        database_port,
+        "get_model_by_id",
+        MagicMock(side_effect=database_port.get_model_by_id),
+    ) as mock_get_model_by_id:
+        first_model, second_model = asyncio.run(get_model_twice())
+
+        assert first_model is second_model
+        assert first_model.id == "629f992d45cda830033cf4cd"
+        mock_get_model_by_id.assert_called_once_with("629f992d45cda830033cf4cd")
@@ -0,0 +1,65 @@
+import asyncio
+from core.model.result import ResultUpdate
+from core.services.result_hub import ResultHub
+
+
+def test_publish_to_subscriptions():
+    result_hub = ResultHub()
+    first = result_hub.subscribe(["fake_inference_id_1", "fake_inference_id_2"])
+    second = result_hub.subscribe(["fake_inference_id_2"])
+    result_update = ResultUpdate(
+        inference_id="fake_inference_id_2", output=0.5, diagnosis="negative"
+    )
+
+    async def publish_and_get():
+        await result_hub.publish(result_update)
+        return await first.get(1), await second.get(1)
+
+    assert asyncio.run(publish_and_get()) == (result_update, result_update)
+
+
+def test_get_timeout():
+    result_hub = ResultHub()
+    subscription = result_hub.subscribe(["fake_inference_id_1"])
+
+    async def publish_and_get():
+        await result_hub.publish(
+            ResultUpdate(
+                inference_id="fake_inference_id_2", output=0.5, diagnosis="negative"
+            )
+        )
+        return await subscription.get(0.01)
+
+    assert asyncio.run(publish_and_get()) is None
+
+
+def test_close_subscription():
+    result_hub = ResultHub()
+    first = result_hub.subscribe(["fake_inference_id_1", "fake_inference_id_2"])
+    second = result_hub.subscribe(["fake_inference_id_2"])
+    assert result_hub.get_followed_inference_count() == 2
+
+    first.close()
+    assert result_hub.get_followed_inference_count() == 1
+    second.close()
+    assert result_hub.get_followed_inference_count() == 0
+
+
+def test_publish_resolves_waiters():
+    result_hub = ResultHub()
+    result_update = ResultUpdate(
+        inference_id="fake_inference_id_1", output=0.5, diagnosis="negative"
+    )
+
+    async def wait_and_publish():
+        waiter = result_hub.add_waiter("fake_inference_id_1")
+        other_waiter = result_hub.add_waiter("fake_inference_id_2")
+        await result_hub.publish(result_update)
+        received = await result_hub.wait(waiter, 1)
+        result_hub.remove_waiter("fake_inference_id_1", waiter)
+        timed_out = await result_hub.wait(other_waiter, 0.01)
+        result_hub.remove_waiter("fake_inference_id_2", other_waiter)
+        return received, timed_out
+
+    assert asyncio.run(wait_and_publish()) == (result_update, None)
+    assert result_hub.get_waiter_count() == 0
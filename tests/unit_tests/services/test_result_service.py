@@ -0,0 +1,210 @@
+import asyncio
+import time
+from fastapi import status
+import pytest
+from core.model.exception import LogicException
+from core.model.token import Token
+from core.ports.authentication_port import AuthenticationPort
+from core.ports.database_port import DatabasePort
+from core.services.request_context import RequestContext
+from core.services.result_hub import ResultHub
+from core.model.result import ResultUpdate
+from core.services.result_service import (
+    batch_get_inference_results,
+    get_inference_result,
+    subscribe_to_inference_results,
+)
+from tests.mocks.authentication_mock import AuthenticationMock
+from tests.mocks.mongo_mock import MongoMock
+
+
+@pytest.fixture()
+def database_port():
+    port = DatabasePort(MongoMock())
+    return port
+
+
+@pytest.fixture()
+def context(database_port: DatabasePort):
+    return RequestContext(
+        AuthenticationPort(AuthenticationMock()),
+        database_port,
+        Token(content="fake_token"),
+    )
+
+
+def test_batch_get_inference_results(
+    context: RequestContext, database_port: DatabasePort
+):
+    inference_results = asyncio.run(
+        batch_get_inference_results(
+            context,
+            database_port,
+            "507f191e810c19729de860ea",
+            ["629f815d6abaa3c5e6cf7c16", "629f815d6abaa3c5e6cf7c16"],
+        )
+    )
+
+    assert [(inference.id, result.id) for inference, result in inference_results] == [
+        ("629f815d6abaa3c5e6cf7c16", "62abf2cd154f18493d74fcd2")
+    ]
+
+
+@pytest.mark.parametrize(
+    "inference_id,error_status,message",
+    [
+        ("629f815d6abaa3c5e6cf7c99", status.HTTP_404_NOT_FOUND, "inference not found"),
+        # the seeded inference has no result
+        ("629f81986abaa3c5e6cf7c17", status.HTTP_404_NOT_FOUND, "result not found"),
+        (
+            "invalid_id",
+            status.HTTP_422_UNPROCESSABLE_ENTITY,
+            "inference id is not valid",
+        ),
+    ],
+)
+def test_batch_get_inference_results_exception(
+    context: RequestContext,
+    database_port: DatabasePort,
+    inference_id: str,
+    error_status: int,
+    message: str,
+):
+    with pytest.raises(LogicException) as e:
+        asyncio.run(
+            batch_get_inference_results(
+                context,
+                database_port,
+                "507f191e810c19729de860ea",
+                ["629f815d6abaa3c5e6cf7c16", inference_id],
+            )
+        )
+
+    assert e.value.error_status == error_status
+    assert e.value.message == message
+
+
+def test_subscribe_to_inference_results(
+    context: RequestContext, database_port: DatabasePort
+):
+    result_hub = ResultHub()
+    asyncio.run(
+        database_port.update_inference_status("629f815d6abaa3c5e6cf7c16", "completed")
+    )
+    # finished without a result
+    asyncio.run(
+        database_port.update_inference_status("629f81986abaa3c5e6cf7c17", "error")
+    )
+
+    subscription, finished = asyncio.run(
+        subscribe_to_inference_results(
+            context,
+            database_port,
+            result_hub,
+            "507f191e810c19729de860ea",
+            ["629f815d6abaa3c5e6cf7c16", "629f81986abaa3c5e6cf7c17"],
+        )
+    )
+
+    assert subscription.inference_ids == [
+        "629f815d6abaa3c5e6cf7c16",
+        "629f81986abaa3c5e6cf7c17",
+    ]
+    assert result_hub.get_followed_inference_count() == 2
+    assert [
+        (inference.id, inference.status, result and result.inference_id)
+        for inference, result in finished
+    ] == [
+        ("629f815d6abaa3c5e6cf7c16", "completed", "629f815d6abaa3c5e6cf7c16"),
+        ("629f81986abaa3c5e6cf7c17", "error", None),
+    ]
+
+
+@pytest.mark.parametrize(
+    "inference_id,error_status",
+    [
+        ("629f815d6abaa3c5e6cf7c99", status.HTTP_404_NOT_FOUND),
+        ("invalid_id", status.HTTP_422_UNPROCESSABLE_ENTITY),
+    ],
+)
+def test_subscribe_to_inference_results_exception(
+    context: RequestContext,
+    database_port: DatabasePort,
+    inference_id: str,
+    error_status: int,
+):
+    result_hub = ResultHub()
+
+    with pytest.raises(LogicException) as e:
+        asyncio.run(
+            subscribe_to_inference_results(
+                context,
+                database_port,
+                result_hub,
+                "507f191e810c19729de860ea",
+                [inference_id],
+            )
+        )
+
+    assert e.value.error_status == error_status
+    assert result_hub.get_followed_inference_count() == 0
+
+
+def test_get_inference_result_wait_for_update(
+    context: RequestContext, database_port: DatabasePort
+):
+    result_hub = ResultHub()
+    result_update = ResultUpdate(
+        inference_id="629f815d6abaa3c5e6cf7c16", output=0.5, diagnosis="negative"
+    )
+
+    async def complete_inference():
+        await asyncio.sleep(0.05)
+        await database_port.update_result(result_update)
+        await database_port.update_inference_status(
+            "629f815d6abaa3c5e6cf7c16", "completed"
+        )
+        await result_hub.publish(result_update)
+
+    async def wait_for_result():
+        completion = asyncio.ensure_future(complete_inference())
+        inference_with_result = await get_inference_result(
+            context,
+            database_port,
+            "629f815d6abaa3c5e6cf7c16",
+            "507f191e810c19729de860ea",
+            result_hub,
+            30,
+        )
+        await completion
+        return inference_with_result
+
+    start = time.monotonic()
+    inference, result = asyncio.run(wait_for_result())
+
+    assert time.monotonic() - start < 5
+    assert inference.status == "completed"
+    assert (result.output, result.diagnosis) == (0.5, "negative")
+    assert result_hub.get_waiter_count() == 0
+
+
+def test_get_inference_result_wait_timeout(
+    context: RequestContext, database_port: DatabasePort
+):
+    result_hub = ResultHub()
+
+    inference, result = asyncio.run(
+        get_inference_result(
+            context,
+            database_port,
+            "629f815d6abaa3c5e6cf7c16",
+            "507f191e810c19729de860ea",
+            result_hub,
+            0.01,
+        )
+    )
+
+    # the current state is returned
+    assert inference.status == "processing"
+    assert result.inference_id == "629f815d6abaa3c5e6cf7c16"
+    assert result_hub.get_waiter_count() == 0
@@ -1,3 +1,4 @@
+import asyncio
 import pytest
 from unittest.mock import MagicMock, patch
 from fastapi import status
@@ -18,7 +19,7 @@ def database_port():
 
 
 def test_user_validation_success_1(database_port: DatabasePort):
-    def fake_get_user_by_username(username):
+    async def fake_get_user_by_username(username):
         return None
 
     user_form = UserCreationForm(
@@ -37,7 +38,7 @@ def test_user_validation_success_1(database_port: DatabasePort):
     ) as mock_get_user_by_username:
 
         try:
-            _validate_new_user(database_port, user_form)
+            asyncio.run(_validate_new_user(database_port, user_form))
             assert True
         except:
             assert False
@@ -45,7 +46,7 @@ def test_user_validation_success_1(database_port: DatabasePort):
 
 
 def test_user_validation_success_2(database_port: DatabasePort):
-    def fake_get_user_by_username(username):
+    async def fake_get_user_by_username(username):
         return None
 
     user_form = UserCreationForm(
@@ -63,14 +64,14 @@ def test_user_validation_success_2(database_port: DatabasePort):
         MagicMock(side_effect=fake_get_user_by_username),
     ) as mock_get_user_by_username:
         try:
-            _validate_new_user(database_port, user_form)
+            asyncio.run(_validate_new_user(database_port, user_form))
             assert True
         except:
             assert False
 
 
 def test_user_validation_success_3(database_port: DatabasePort):
-    def fake_get_user_by_username(username):
+    async def fake_get_user_by_username(username):
         return None
 
     user_form = UserCreationForm(
@@ -88,14 +89,14 @@ def test_user_validation_success_3(database_port: DatabasePort):
         MagicMock(side_effect=fake_get_user_by_username),
     ) as mock_get_user_by_username:
         try:
-            _validate_new_user(database_port, user_form)
+            asyncio.run(_validate_new_user(database_port, user_form))
             assert True
         except:
             assert False
 
 
 def test_user_validation_different_passwords_exception(database_port: DatabasePort):
-    def fake_get_user_by_username(username):
+    async def fake_get_user_by_username(username):
         return None
 
     user_form = UserCreationForm(
@@ -114,7 +115,7 @@ def test_user_validation_different_passwords_exception(database_port: DatabasePo
     ) as mock_get_user_by_username:
 
         try:
-            _validate_new_user(database_port, user_form)
+            asyncio.run(_validate_new_user(database_port, user_form))
             assert False
         except LogicException as e:
             assert True
@@ -128,7 +129,7 @@ def test_user_validation_different_passwords_exception(database_port: DatabasePo
 
 
 def test_user_validation_pre_existent_username_exception(database_port: DatabasePort):
-    def fake_get_user_by_username(username):
+    async def fake_get_user_by_username(username):
         return User(
             **{"id": "fake_id", "username": "test_username", "email": "valid@gmail.com"}
         )
@@ -148,7 +149,7 @@ def test_user_validation_pre_existent_username_exception(database_port: Database
         MagicMock(side_effect=fake_get_user_by_username),
     ) as mock_get_user_by_username:
         try:
-            _validate_new_user(database_port, user_form)
+            asyncio.run(_validate_new_user(database_port, user_form))
             assert False
         except LogicException as e:
             assert True
@@ -162,7 +163,7 @@ def test_user_validation_pre_existent_username_exception(database_port: Database
 
 
 def test_user_validation_pre_existent_email_exception(database_port: DatabasePort):
-    def fake_get_user_by_email(email):
+    async def fake_get_user_by_email(email):
         return User(
             **{"id": "fake_id", "username": "test_username", "email": "valid@gmail.com"}
         )
@@ -182,7 +183,7 @@ def test_user_validation_pre_existent_email_exception(database_port: DatabasePor
         MagicMock(side_effect=fake_get_user_by_email),
     ) as mock_get_user_by_email:
         try:
-            _validate_new_user(database_port, user_form)
+            asyncio.run(_validate_new_user(database_port, user_form))
             assert False
         except LogicException as e:
             assert True
@@ -196,7 +197,7 @@ def test_user_validation_pre_existent_email_exception(database_port: DatabasePor
 
 
 def test_user_validation_invalid_email_exception_1(database_port: DatabasePort):
-    def fake_get_user_by_username(username):
+    async def fake_get_user_by_username(username):
         return None
 
     user_form = UserCreationForm(
@@ -214,7 +215,7 @@ def test_user_validation_invalid_email_exception_1(database_port: DatabasePort):
         MagicMock(side_effect=fake_get_user_by_username),
     ) as mock_get_user_by_username:
         try:
-            _validate_new_user(database_port, user_form)
+            asyncio.run(_validate_new_user(database_port, user_form))
             assert False
         except LogicException as e:
             assert True
@@ -228,7 +229,7 @@ def test_user_validation_invalid_email_exception_1(database_port: DatabasePort):
 
 
 def test_user_validation_invalid_email_exception_2(database_port: DatabasePort):
-    def fake_get_user_by_username(username):
+    async def fake_get_user_by_username(username):
         return None
 
     user_form = UserCreationForm(
@@ -246,7 +247,7 @@ def test_user_validation_invalid_email_exception_2(database_port: DatabasePort):
         MagicMock(side_effect=fake_get_user_by_username),
     ) as mock_get_user_by_username:
         try:
-            _validate_new_user(database_port, user_form)
+            asyncio.run(_validate_new_user(database_port, user_form))
             assert False
         except LogicException as e:
             assert True
@@ -260,7 +261,7 @@ def test_user_validation_invalid_email_exception_2(database_port: DatabasePort):
 
 
 def test_user_validation_invalid_email_exception_3(database_port: DatabasePort):
-    def fake_get_user_by_username(username):
+    async def fake_get_user_by_username(username):
         return None
 
     user_form = UserCreationForm(
@@ -278,7 +279,7 @@ def test_user_validation_invalid_email_exception_3(database_port: DatabasePort):
         MagicMock(side_effect=fake_get_user_by_username),
     ) as mock_get_user_by_username:
         try:
-            _validate_new_user(database_port, user_form)
+            asyncio.run(_validate_new_user(database_port, user_form))
             assert False
         except LogicException as e:
             assert True